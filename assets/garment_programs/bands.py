@@ -32,6 +32,7 @@ class StraightBandPanel(pyg.Panel):
         self.center_x()
 
 
+@pyg.memoize_component
 class StraightWB(BaseBand):
     """Simple 2 panel waistband"""
     def __init__(self, body, design, rise=1.) -> None:
@@ -108,6 +109,7 @@ class StraightWB(BaseBand):
         )
 
 
+@pyg.memoize_component
 class FittedWB(StraightWB):
     """Also known as Yoke: a waistband that ~follows the body curvature,
             and hence sits tight
@@ -150,6 +152,7 @@ class FittedWB(StraightWB):
         )
 
 
+@pyg.memoize_component
 class CuffBand(BaseBand):
     """ Cuff class for sleeves or pants
         band-like piece of fabric with optional "skirt"
@@ -186,6 +189,7 @@ class CuffBand(BaseBand):
         }
 
 
+@pyg.memoize_component
 class CuffSkirt(BaseBand):
     """A skirt-like flared cuff """
 
@@ -226,6 +230,7 @@ class CuffSkirt(BaseBand):
         }
 
 
+@pyg.memoize_component
 class CuffBandSkirt(pyg.Component):
     """ Cuff class for sleeves or pants
         band-like piece of fabric with optional "skirt"
@@ -169,6 +169,7 @@ class BodiceBackHalf(BaseBodicePanel):
     def get_width(self, level):
         return self.width
 
+@pyg.memoize_component
 class BodiceHalf(pyg.Component):
     """Definition of a half of an upper garment with sleeves and collars"""
 
@@ -424,6 +425,7 @@ class BodiceHalf(pyg.Component):
     def length(self):
         return self.btorso.length()
 
+@pyg.memoize_component
 class Shirt(pyg.Component):
     """Panel for the front of upper garments with darts to properly fit it to
     the shape"""
@@ -478,6 +480,7 @@ class Shirt(pyg.Component):
     def length(self):
         return self.right.length()
 
+@pyg.memoize_component
 class FittedShirt(Shirt):
     """Creates fitted shirt
     
@@ -125,6 +125,7 @@ class AsymHalfCirclePanel(pyg.Panel):
     def length(self, *args):
         return self.interfaces['right'].edges.length()
 
+@pyg.memoize_component
 class SkirtCircle(StackableSkirtComponent):
     """Simple circle skirt"""
     def __init__(self, body, design, tag='', length=None, rise=None, slit=True, asymm=False, min_len=5, **kwargs) -> None:
@@ -228,6 +229,7 @@ class SkirtCircle(StackableSkirtComponent):
         return self.front.length()
 
 
+@pyg.memoize_component
 class AsymmSkirtCircle(SkirtCircle):
     """Front/back asymmetric skirt"""
     def __init__(self, body, design, tag='', length=None, rise=None, slit=True, **kwargs):
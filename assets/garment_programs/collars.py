@@ -88,6 +88,7 @@ def Bezier2NeckHalf(depth, width, flip=False, x=0.5, y=0.3, **kwargs):
 
 # # ------ Collars with panels ------
 
+@pyg.memoize_component
 class NoPanelsCollar(pyg.Component):
     """Face collar class that only forms the projected shapes """
     
@@ -127,6 +128,7 @@ class NoPanelsCollar(pyg.Component):
         return 0
 
 
+@pyg.memoize_component
 class Turtle(pyg.Component):
 
     def __init__(self, tag, body, design) -> None:
@@ -199,6 +201,7 @@ class SimpleLapelPanel(pyg.Panel):
         }
 
 
+@pyg.memoize_component
 class SimpleLapel(pyg.Component):
 
     def __init__(self, tag, body, design) -> None:
@@ -327,6 +330,7 @@ class HoodPanel(pyg.Panel):
         self.rotate_by(R.from_euler('XYZ', [0, -90, 0], degrees=True))
         self.translate_by([-width, 0, 0])
 
+@pyg.memoize_component
 class Hood2Panels(pyg.Component):
 
     def __init__(self, tag, body, design) -> None:
@@ -23,6 +23,7 @@ class Insert(pyg.Panel):
         self.center_x()
 
 
+@pyg.memoize_component
 class GodetSkirt(BaseBottoms):
 
     def __init__(self, body, design, rise=None) -> None:
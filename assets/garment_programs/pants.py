@@ -176,6 +176,7 @@ class PantPanel(pyg.Panel):
         return top_edges, int_edges
         
 
+@pyg.memoize_component
 class PantsHalf(BaseBottoms):
     def __init__(self, tag, body, design, rise=None) -> None:
         super().__init__(body, design, tag, rise=rise)
@@ -278,6 +279,7 @@ class PantsHalf(BaseBottoms):
         
         return self.front.length()
 
+@pyg.memoize_component
 class Pants(BaseBottoms):
     def __init__(self, body, design, rise=None) -> None:
         super().__init__(body, design)
@@ -3,6 +3,7 @@ from assets.garment_programs.skirt_paneled import *
 from copy import deepcopy
 
 
+@pyg.memoize_component
 class SkirtLevels(BaseBottoms):
     """Skirt constiting of multuple stitched skirts"""
 
@@ -304,6 +304,7 @@ class FittedSkirtPanel(pyg.Panel):
 
 
 # Full garments - Components
+@pyg.memoize_component
 class PencilSkirt(StackableSkirtComponent):
     def __init__(self, body, design, tag='', length=None, rise=None, slit=True, **kwargs) -> None:
         super().__init__(body, design, tag)
@@ -391,6 +392,7 @@ class PencilSkirt(StackableSkirtComponent):
     def length(self):
         return self.front.length()
 
+@pyg.memoize_component
 class Skirt2(StackableSkirtComponent):
     """Simple 2 panel skirt"""
     def __init__(self, body, design, tag='', length=None, rise=None, slit=True, top_ruffles=True, min_len=5) -> None:
@@ -451,6 +453,7 @@ class Skirt2(StackableSkirtComponent):
         return self.front.length()
 
 
+@pyg.memoize_component
 class SkirtManyPanels(BaseBottoms):
     """Round Skirt with many panels"""
 
@@ -195,6 +195,7 @@ class SleevePanel(pyg.Panel):
         return self.interfaces['bottom'].edges.length()
 
 
+@pyg.memoize_component
 class Sleeve(pyg.Component):
     """Trying to do a proper sleeve"""
     def __init__(self, tag, body, design, front_w, back_w): 
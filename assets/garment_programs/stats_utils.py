@@ -15,7 +15,8 @@ def count_panels(pattern:pattern.BasicPattern, props, verbose=False):
 
 # Type determination
 
-def bottom_length(design):
+def bottom_section(design):
+    """Section of the design parameters defining the bottom garment (None if not present)"""
     meta = design['meta']
     if meta['bottom']['v']:
         bottom_section = None
@@ -38,9 +39,13 @@ def bottom_length(design):
         else:
             raise(ValueError(f'Unknown bottoms type {meta["bottom"]["v"]}'))
 
-        return design[bottom_section]['length']['v']
+        return bottom_section
     else:
-        return 0
+        return None
+
+def bottom_length(design):
+    section = bottom_section(design)
+    return design[section]['length']['v'] if section else 0
 
 def sleeve_length(design):
     # Sleeve length
@@ -62,6 +67,31 @@ def vertical_len(design):
     wb_len = design['waistband']['width']['v'] if design['meta']['wb']['v'] else 0
     return top_length(design) + wb_len + bottom_length(design)
 
+def vertical_len_cm(design, body):
+    """Estimate of the vertical length of the garment (cm) on the given body
+        from the design parameters only, without constructing the garment.
+        
+        NOTE: Follows the length computation of the garment programs, 
+        but ignores the shape details (e.g. flare, asymmetry, darts)
+    """
+    meta = design['meta']
+    top_len = 0
+    if meta['upper']['v'] == 'FittedShirt':
+        top_len = body['waist_line']
+    elif meta['upper']['v'] == 'Shirt':
+        top_len = design['shirt']['length']['v'] * body['waist_line']
+
+    wb_len = design['waistband']['width']['v'] * body['hips_line'] if meta['wb']['v'] else 0
+
+    bottom_len = 0
+    section = bottom_section(design)
+    if section:
+        # NOTE: Full rise for fitted tops, see MetaGarment
+        rise = 1. if meta['upper']['v'] and 'Fitted' in meta['upper']['v'] else design[section]['rise']['v']
+        bottom_len = rise * body['hips_line'] + bottom_length(design) * body['_leg_length']
+
+    return top_len + wb_len + bottom_len
+
 def garment_type(el_name, design, props, verbose=False):
     main_type = None
     add_types = []
@@ -0,0 +1,111 @@
+"""Benchmark of the closed-form quadratic curve fitting in CurveEdgeFactory
+    against the numerical optimization it replaces
+
+    Garments with the components that use CurveEdgeFactory.curve_from_tangents()
+    (pants, pencil skirts, fitted bodices) are constructed for random designs on the
+    average body shapes. Every fitting request is recorded and solved both ways,
+    reporting time per call and the difference between the solutions in cm.
+
+    Usage (from the repository root):
+        python -m benchmarks.curve_fitting --designs 20
+"""
+
+import argparse
+from collections import defaultdict
+import random
+import sys
+import time
+
+import numpy as np
+from numpy.linalg import norm
+
+import pygarment as pyg
+import pygarment.garmentcode.edge_factory as edge_factory
+from pygarment.pattern.utils import abs_to_rel_2d
+from assets.garment_programs.meta_garment import MetaGarment
+from assets.bodies.body_params import BodyParameters
+
+BODIES = [
+    './assets/bodies/mean_all.yaml',
+    './assets/bodies/mean_female.yaml',
+    './assets/bodies/mean_male.yaml',
+]
+# Components using curve_from_tangents()
+UPPER = ['FittedShirt']
+BOTTOMS = ['Pants', 'PencilSkirt', 'SkirtLevels']
+
+
+def get_command_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--designs', '-d', help='number of random designs per garment type', type=int, default=20)
+    parser.add_argument('--seed', '-s', help='random seed', type=int, default=0)
+    return parser.parse_args()
+
+
+def record_tangent_requests(num_designs, seed):
+    """Construct garments and record the curve_from_tangents() requests
+        in relative coordinates, grouped by the calling panel class
+    """
+    requests = defaultdict(list)
+    factory_call = edge_factory.CurveEdgeFactory.curve_from_tangents
+
+    def recording_call(start, end, target_tan0=None, target_tan1=None, initial_guess=None, verbose=False):
+        caller = sys._getframe(1).f_locals.get('self')
+        length = norm(np.asarray(end) - np.asarray(start))
+        tan0, tan1 = [
+            None if tan is None else abs_to_rel_2d(start, end, tan, as_vector=True)
+            for tan in [target_tan0, target_tan1]]
+        tan0, tan1 = [None if tan is None else tan / norm(tan) for tan in [tan0, tan1]]
+        requests[type(caller).__name__].append((tan0, tan1, initial_guess, length))
+        return factory_call(start, end, target_tan0, target_tan1, initial_guess, verbose)
+
+    sampler = pyg.DesignSampler('./assets/design_params/default.yaml')
+    bodies = [BodyParameters(path) for path in BODIES]
+    random.seed(seed)
+    edge_factory.CurveEdgeFactory.curve_from_tangents = staticmethod(recording_call)
+    try:
+        for garment in UPPER + BOTTOMS:
+            for i in range(num_designs):
+                design = sampler.randomize()
+                design['meta']['upper']['v'] = garment if garment in UPPER else None
+                design['meta']['bottom']['v'] = garment if garment in BOTTOMS else None
+                try:
+                    MetaGarment(f'{garment}_{i}', bodies[i % len(bodies)], design)
+                except BaseException:   # e.g. TotalLengthError -- the requests are recorded anyway
+                    pass
+    finally:
+        edge_factory.CurveEdgeFactory.curve_from_tangents = staticmethod(factory_call)
+    return requests
+
+
+def bench_tangents(requests):
+    rows = []
+    for caller, calls in requests.items():
+        closed_time, opt_time, diffs, fallbacks = 0, 0, [], 0
+        for tan0, tan1, initial_guess, length in calls:
+            start = time.perf_counter()
+            cp = edge_factory._solve_tangents(tan0, tan1)
+            if cp is None:
+                fallbacks += 1
+                cp = edge_factory._optimize_tangents(tan0, tan1, initial_guess)
+            closed_time += time.perf_counter() - start
+
+            start = time.perf_counter()
+            opt_cp = edge_factory._optimize_tangents(tan0, tan1, initial_guess)
+            opt_time += time.perf_counter() - start
+
+            diffs.append(norm(np.asarray(cp) - opt_cp) * length)
+        rows.append((caller, len(calls), fallbacks, opt_time, closed_time, diffs))
+    return rows
+
+
+if __name__ == '__main__':
+    args = get_command_args()
+
+    rows = bench_tangents(record_tangent_requests(args.designs, args.seed))
+
+    print(f'{"Caller":<25} {"Calls":>6} {"Fallback":>8} {"Optim, ms":>10} {"Closed, ms":>10} '
+          f'{"Diff median, cm":>16} {"Diff max, cm":>13}')
+    for caller, calls, fallbacks, opt_time, closed_time, diffs in rows:
+        print(f'{caller:<25} {calls:>6} {fallbacks:>8} {opt_time / calls * 1000:>10.3f} '
+              f'{closed_time / calls * 1000:>10.3f} {np.median(diffs):>16.4f} {np.max(diffs):>13.4f}')
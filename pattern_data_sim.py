@@ -16,6 +16,8 @@ from pathlib import Path
 # My modules
 import pygarment.data_config as data_config
 import pygarment.meshgen.datasim_utils as sim
+from pygarment.meshgen.dataset_shards import ShardReader
+from pygarment.data_manifest import DatasetManifest
 
 
 def get_command_args():
@@ -29,16 +31,54 @@ def get_command_args():
     parser.add_argument('--default_body', action='store_true', help='run dataset on default body')
     parser.add_argument('--caching', action='store_true', help='cache intermediate simulation')
     parser.add_argument('--rewrite_config', action='store_true', help='cache intermediate simulation')
+    parser.add_argument('--workers', '-w', help='number of parallel simulation worker processes. '
+                        'If not set, garments are simulated one by one in the current process', type=int, default=None)
+    parser.add_argument('--pipeline', nargs=3, metavar=('MESHGEN', 'SIM', 'RENDER'), 
+                        help='run meshgen, simulation and rendering as pipelined stages '
+                        'with given numbers of workers in each. Takes precedence over --workers', 
+                        type=int, default=None)
+    parser.add_argument('--num_shards', help='number of independent shards (e.g. nodes) simulating the dataset together. '
+                        'Each shard is stored as a separate simulated dataset <data>_shard<id>of<num_shards>', 
+                        type=int, default=1)
+    parser.add_argument('--shard_id', help='index of the shard to simulate in this run (0 <= shard_id < num_shards)', 
+                        type=int, default=0)
+    parser.add_argument('--gallery', help='How to gather renders in the renders folder', 
+                        choices=['copy', 'hardlink', 'symlink'], default='copy')
+    parser.add_argument('--devices', nargs='+', help='devices to distribute between the workers, e.g. cuda:0 cuda:1', 
+                        type=str, default=None)
 
     args = parser.parse_args()
     print(args)
 
+    if not 0 <= args.shard_id < args.num_shards:
+        parser.error(f'--shard_id should be in [0, {args.num_shards})')
+
     return args
 
-def gather_renders(out_data_path: Path, verbose=False):
+def gather_renders(out_data_path: Path, verbose=False, mode='copy'):
+    """Gather renders in one folder. 
+        * mode -- 'copy', 'hardlink' or 'symlink' (only for datasets with manifest)
+    """
     renders_path = out_data_path / 'renders'
     renders_path.mkdir(exist_ok=True)
 
+    def is_render(file):
+        return 'render' in Path(file).name and file.endswith('.png')
+
+    shards_path = out_data_path / 'shards'
+    if shards_path.exists():
+        # Sharded output: extract the renders from the shards
+        with ShardReader(shards_path) as shards:
+            for _, files in shards.stream(files=['.png']):
+                for file, content in files.items():
+                    if is_render(file):
+                        (renders_path / Path(file).name).write_bytes(content)
+
+    manifest = DatasetManifest(out_data_path, sim.SIM_MANIFEST_FILE)
+    if manifest.exists():
+        manifest.gallery(renders_path, is_render, mode=mode)
+        return
+
     render_files = list(out_data_path.glob('**/*render*.png'))
     for file in render_files:
         try: 
@@ -52,6 +92,9 @@ def gather_renders(out_data_path: Path, verbose=False):
 if __name__ == "__main__":
 
     command_args = get_command_args()
+    stage_workers = None
+    if command_args.pipeline is not None:
+        stage_workers = dict(zip(['meshgen', 'sim', 'render'], command_args.pipeline))
     system_config = data_config.Properties('./system.json') 
 
     # ------ Dataset ------
@@ -63,7 +106,12 @@ if __name__ == "__main__":
     body_type = 'default_body' if command_args.default_body else 'random_body'
     datapath = datapath / body_type / 'data' # Overwrite datapath to specific body type
 
-    output_path = Path(system_config['datasets_sim']) / dataset / body_type
+    shard = None
+    out_dataset = dataset
+    if command_args.num_shards > 1:
+        shard = (command_args.shard_id, command_args.num_shards)
+        out_dataset = f'{dataset}_shard{command_args.shard_id}of{command_args.num_shards}'
+    output_path = Path(system_config['datasets_sim']) / out_dataset / body_type
     output_path.mkdir(parents=True, exist_ok=True) 
     dataset_file_body = output_path / f'dataset_properties_{body_type}.yaml'
     if not dataset_file_body.exists():
@@ -78,6 +126,8 @@ if __name__ == "__main__":
 
     # ------- Defining sim props -----
     props.set_basic(data_folder=dataset)  # in case data properties are from other dataset/folder, update info
+    if shard is not None:
+        props.set_basic(sim_shard={'id': shard[0], 'num': shard[1]})
     if command_args.config is not None:
         props.merge(
             Path(system_config['sim_configs_path']) / command_args.config, 
@@ -90,7 +140,11 @@ if __name__ == "__main__":
         props,
         run_default_body=command_args.default_body,
         num_samples=command_args.minibatch,  # run in mini-batch if requested
-        caching=command_args.caching, force_restart=False)
+        caching=command_args.caching, force_restart=False,
+        num_workers=command_args.workers,
+        devices=command_args.devices,
+        stage_workers=stage_workers,
+        shard=shard)
 
     # ----- Try and resim fails once -----
     if finished:
@@ -100,13 +154,17 @@ if __name__ == "__main__":
             output_path, 
             props,
             run_default_body=command_args.default_body,
-            caching=command_args.caching)
+            caching=command_args.caching,
+            num_workers=command_args.workers,
+            devices=command_args.devices,
+            stage_workers=stage_workers,
+            shard=shard)
 
     props.add_sys_info()   # Save system information
     props.serialize(dataset_file)
 
     # ------ Gather renders -------
-    gather_renders(output_path)
+    gather_renders(output_path, mode=command_args.gallery)
 
     # -------- fin --------
     if finished:
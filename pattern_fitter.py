@@ -12,6 +12,7 @@ import argparse
 
 # Custom
 from pygarment.data_config import Properties
+import pygarment as pyg
 from assets.garment_programs.meta_garment import MetaGarment
 from assets.bodies.body_params import BodyParameters
 
@@ -24,7 +25,9 @@ def get_command_args():
     parser.add_argument('--size', '-s', help='size of a sample', type=int, default=10)
     parser.add_argument('--name', '-n', help='Name of the dataset', type=str, default='design_fit')
     parser.add_argument('--replicate', '-re', help='Name of the dataset to re-generate. If set, other arguments are ignored', type=str, default=None)
-    
+    parser.add_argument('--component_cache', 
+                        help='Re-use the garment sub-components that do not depend on the changing body measurements', 
+                        action='store_true')
 
     args = parser.parse_args()
     print('Commandline arguments: ', args)
@@ -134,6 +137,9 @@ def generate(path, properties, sys_paths, verbose=False):
 
     # generate data
     start_time = time.time()
+    # NOTE: Sub-components that do not depend on the changed body measurements are re-used
+    if gen_config.get('component_cache', False):
+        pyg.component_cache.enable()
 
     # Load design 
     with open(properties['design_file'], 'r') as f:
@@ -173,6 +179,8 @@ def generate(path, properties, sys_paths, verbose=False):
 
     elapsed = time.time() - start_time
     gen_stats['generation_time'] = f'{elapsed:.3f} s'
+    if pyg.component_cache.enabled:
+        gen_stats['component_cache'] = pyg.component_cache.stats()
 
     # log properties
     properties.serialize(data_folder / 'dataset_properties.yaml')
@@ -213,7 +221,7 @@ if __name__ == '__main__':
             name=f'{args.name}_{args.size}' if not args.batch_id else f'{args.name}_{args.size}_{args.batch_id}',
             size=args.size,
             to_subfolders=True)
-        props.set_section_config('generator')
+        props.set_section_config('generator', component_cache=args.component_cache)
 
     # Generator
     default_path, body_sample_path = generate(
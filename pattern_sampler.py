@@ -3,6 +3,7 @@
     to a neutral and a random body shape 
 """
 
+from collections import defaultdict, deque
 from datetime import datetime
 from pathlib import Path
 import yaml
@@ -12,13 +13,23 @@ import random
 import string
 import traceback
 import argparse
+import hashlib
+import itertools
+import json
+import numpy as np
 
 # Custom
 from pygarment.data_config import Properties
-from assets.garment_programs.meta_garment import MetaGarment, IncorrectElementConfiguration
+from pygarment.data_manifest import DatasetManifest
+from assets.garment_programs.meta_garment import MetaGarment, IncorrectElementConfiguration, TotalLengthError
 from assets.bodies.body_params import BodyParameters
 import pygarment as pyg
 import assets.garment_programs.stats_utils as stats_utils
+from pygarment.meshgen.worker_pool import WorkerPool
+
+ATTEMPTS_FILE = 'sampling_attempts.jsonl'
+DESIGN_BATCH_SIZE = 16   # Designs drawn at once for the attempts of a sample
+MAX_SAMPLE_RETRIES = 2   # Re-tries of the samples lost with a crashed worker process
 
 def get_command_args():
     """command line arguments to control the run"""
@@ -28,10 +39,33 @@ def get_command_args():
     parser.add_argument('--size', '-s', help='size of a sample', type=int, default=10)
     parser.add_argument('--name', '-n', help='Name of the dataset', type=str, default='data')
     parser.add_argument('--replicate', '-re', help='Name of the dataset to re-generate. If set, other arguments are ignored', type=str, default=None)
+    parser.add_argument('--seed', help='random seed of the dataset. Required to generate it in shards', type=int, default=None)
+    parser.add_argument('--num_shards', help='number of independent shards (e.g. nodes) generating the dataset together', 
+                        type=int, default=1)
+    parser.add_argument('--shard_id', help='index of the shard to generate in this run (0 <= shard_id < num_shards)', 
+                        type=int, default=0)
+    parser.add_argument('--workers', '-w', help='number of processes sampling the patterns (also used with --replicate)', 
+                        type=int, default=1)
+    parser.add_argument('--design_sampling', 
+                        help='How to sample designs: independent random batches or low-discrepancy sequences (Sobol, Latin hypercube)', 
+                        choices=['batch', 'sobol', 'lhs'], default='batch')
+    parser.add_argument('--component_cache', 
+                        help='Re-use the garment sub-components built with the same parameters in earlier samples', 
+                        action='store_true')
+    parser.add_argument('--prefilter', 
+                        help='Reject the designs predicted to exceed the floor length before constructing the garments', 
+                        action='store_true')
+    parser.add_argument('--gallery', help='How to gather pattern images in patterns_vis folder', 
+                        choices=['copy', 'hardlink', 'symlink'], default='copy')
     
     args = parser.parse_args()
     print('Commandline arguments: ', args)
 
+    if args.num_shards > 1 and args.seed is None and args.replicate is None:
+        parser.error('--seed is required when generating the dataset in shards')
+    if not 0 <= args.shard_id < args.num_shards:
+        parser.error(f'--shard_id should be in [0, {args.num_shards})')
+
     return args
 
 # Utils
@@ -80,6 +114,13 @@ def gather_body_options(body_path: Path):
     
     return bodies
 
+def sample_seed(seed, sample_id):
+    """Deterministic random seed of the sample given the dataset seed, 
+        independent of the samples generated before it
+    """
+    return int(hashlib.sha256(f'{seed}_{sample_id}'.encode()).hexdigest()[:16], 16)
+
+
 def _id_generator(size=10, chars=string.ascii_uppercase + string.digits):
         """Generate a random string of a given size, see
         https://stackoverflow.com/questions/2257441/random-string-generation-with-upper-case-letters-and-digits
@@ -125,10 +166,18 @@ def _save_sample(piece, body, new_design, folder, verbose=False):
 def has_pants(design):
     return 'Pants' == design['meta']['bottom']['v']
 
-def gather_visuals(path, verbose=False):
+def gather_visuals(path, verbose=False, mode='copy'):
+    """Gather pattern images in one folder. 
+        * mode -- 'copy', 'hardlink' or 'symlink' (only for datasets with manifest)
+    """
     vis_path = Path(path) / 'patterns_vis'
     vis_path.mkdir(parents=True, exist_ok=True)
 
+    manifest = DatasetManifest(path)
+    if manifest.exists():
+        manifest.gallery(vis_path, lambda file: file.endswith('.png'), mode=mode)
+        return
+
     for p in path.rglob("*.png"):
         try: 
             shutil.copy(p, vis_path)
@@ -184,113 +233,559 @@ def assert_param_combinations(design, filter_belts=True):
                 raise IncorrectElementConfiguration('ERROR::IncorrectParams::Flare skirts + belt')
 
 
+class PredictedLengthError(TotalLengthError):
+    """Total length of the garment is predicted to go beyond the floor length
+    without constructing the garment"""
+    pass
+
+
+class LengthPrefilter():
+    """Rejects designs that would fail MetaGarment.assert_total_length() on a given body
+        from the length estimate of the design parameters (stats_utils.vertical_len_cm()),
+        s.t. most of such samples never construct the garment geometry.
+
+        * margin -- (cm) design is rejected only if its estimated length exceeds the floor length by more than margin.
+            NOTE: The estimate is less accurate for flared and asymmetric skirts, 
+            margin allows to keep the rejected samples invalid
+        * audit_rate -- fraction of the samples constructed regardless of the prediction 
+            to evaluate the precision and recall of the filter against the full construction
+
+        NOTE: Audited samples are selected by the sample name, s.t. the filter does not affect the random state
+    """
+    def __init__(self, enabled=False, margin=15., audit_rate=0.05):
+        self.enabled = enabled
+        self.margin = margin
+        self.audit_rate = audit_rate
+
+        self.stats = dict(
+            checked=0, rejected=0, audited=0,
+            true_pos=0, false_pos=0, true_neg=0, false_neg=0)
+        self._audit = False
+
+    @classmethod
+    def from_config(cls, config):
+        """Filter configuration stored in generator config.
+            Datasets without it are generated without pre-filtering
+        """
+        if not config:
+            return cls(enabled=False)
+        return cls(**config)
+
+    def start_sample(self, name):
+        self._audit = (self.enabled 
+                       and int(hashlib.sha1(name.encode()).hexdigest()[:8], 16) < self.audit_rate * 16 ** 8)
+        if self._audit:
+            self.stats['audited'] += 1
+
+    def check(self, design, body):
+        """Predict length error of the design on the body. 
+            Raises PredictedLengthError for rejected designs. 
+            Returns the prediction (to record the outcome of the construction for audited samples)
+        """
+        if not self.enabled:
+            return None
+
+        length = stats_utils.vertical_len_cm(design, body)
+        floor = body['height'] - body['head_l']
+        predicted = length > floor + self.margin
+        self.stats['checked'] += 1
+        if predicted and not self._audit:
+            self.stats['rejected'] += 1
+            raise PredictedLengthError(
+                f'{self.__class__.__name__}::ERROR::Estimated length {length:.1f} exceeds the floor length {floor:.1f}')
+        return predicted
+
+    def assert_total_length(self, piece: MetaGarment, predicted):
+        """Check the constructed garment, recording the outcome for audited samples"""
+        try:
+            piece.assert_total_length()
+        except TotalLengthError:
+            self._record(predicted, True)
+            raise
+        self._record(predicted, False)
+
+    def _record(self, predicted, failed):
+        if not self._audit or predicted is None:
+            return
+        key = ('true_' if predicted == failed else 'false_') + ('pos' if predicted else 'neg')
+        self.stats[key] += 1
+
+
+def add_prefilter_stats(gen_stats, stats):
+    """Accumulate the pre-filter stats of the sample in the generator stats"""
+    if 'prefilter' not in gen_stats:
+        gen_stats['prefilter'] = {}
+    total = gen_stats['prefilter']
+    for key, value in stats.items():
+        if key in ['precision', 'recall']:
+            continue
+        total[key] = total.get(key, 0) + value
+
+    # Evaluation on the audited samples
+    pos = total.get('true_pos', 0) + total.get('false_pos', 0)
+    fails = total.get('true_pos', 0) + total.get('false_neg', 0)
+    total['precision'] = total.get('true_pos', 0) / pos if pos else None
+    total['recall'] = total.get('true_pos', 0) / fails if fails else None
+
+
+
+# Rejection sampling stats
+class SamplingAttempts():
+    """Records of the sampling attempts of a sample: the check that rejected the attempt, 
+        time spent on the attempt and the design parameters involved in the failure
+    """
+    # Checks
+    OK = 'ok'
+    PARAMS = 'param_combination'
+    PREFILTER = 'length_prefilter'
+    LENGTH = 'total_length'
+    INTERSECTION = 'self_intersection'
+    CRASH = 'crash'
+
+    def __init__(self):
+        self.records = []
+        self._start_time = None
+        self._name = None
+
+    def start(self, name):
+        self._name = name
+        self._start_time = time.time()
+
+    def accept(self):
+        self._add(self.OK)
+
+    def reject(self, check, body=None, design=None, used=None, garment=None, error=None):
+        """Record the failed attempt
+            * body -- 'default' or 'random'
+            * design, used -- design and the paths of its parameters involved in the failure
+            * garment -- label of the garment type
+        """
+        self._add(
+            check, body=body, garment=garment,
+            error=str(error) if error is not None else None,
+            design=pyg.canonical_design(design, used) if used else None)
+
+    def fail(self, exception, body=None, design=None, used=None, garment=None):
+        """Record the attempt failed with exception"""
+        if isinstance(exception, PredictedLengthError):
+            check = self.PREFILTER
+        elif isinstance(exception, TotalLengthError):
+            check = self.LENGTH
+        elif isinstance(exception, IncorrectElementConfiguration):
+            check = self.PARAMS
+        else:
+            check = self.CRASH
+        error = f'{type(exception).__name__}: {exception}'
+        self.reject(check, body=body, design=design, used=used, garment=garment, error=error)
+
+    def _add(self, check, **info):
+        record = dict(name=self._name, check=check, time=round(time.time() - self._start_time, 4))
+        record.update({key: value for key, value in info.items() if value is not None})
+        self.records.append(record)
+
+
+def length_params(design):
+    """Paths to the design parameters used in the length estimate (see stats_utils.vertical_len_cm())"""
+    tracker = pyg.DesignUsageTracker(design)
+    body = defaultdict(float)   # Only design reads are of interest
+    stats_utils.vertical_len_cm(tracker, body)
+    return tracker.used
+
+
+def _garment_label(design):
+    names = [design['meta'][key]['v'] for key in ['upper', 'wb', 'bottom']]
+    return '+'.join(name for name in names if name) or 'empty'
+
+
+def add_attempt_stats(gen_stats, records):
+    """Aggregate attempt records of a sample in the generator stats: 
+        number of attempts and time spent per rejection check and per garment type
+    """
+    if 'attempts' not in gen_stats:
+        gen_stats['attempts'] = dict(total=0, accepted=0, time=0., wasted_time=0., rejected={})
+    stats = gen_stats['attempts']
+    for record in records:
+        stats['total'] += 1
+        stats['time'] += record['time']
+        if record['check'] == SamplingAttempts.OK:
+            stats['accepted'] += 1
+            continue
+
+        stats['wasted_time'] += record['time']
+        if record['check'] not in stats['rejected']:
+            stats['rejected'][record['check']] = dict(count=0, time=0., garments={})
+        check_stats = stats['rejected'][record['check']]
+        check_stats['count'] += 1
+        check_stats['time'] += record['time']
+        label = record.get('garment', 'unknown')
+        check_stats['garments'][label] = check_stats['garments'].get(label, 0) + 1
+
+    # Keep yaml readable
+    stats['time'] = round(stats['time'], 3)
+    stats['wasted_time'] = round(stats['wasted_time'], 3)
+    for check_stats in stats['rejected'].values():
+        check_stats['time'] = round(check_stats['time'], 3)
+
+
+def _log_attempts(path, sample_id, records):
+    """Append the attempt records of the sample to the JSON-lines log"""
+    with open(path, 'a') as f:
+        for record in records:
+            f.write(json.dumps(dict(sample=sample_id, **record), default=str) + '\n')
+
+
+
+def _sample_keys(design, used_params, pattern):
+    """Keys identifying the sample on the default body: hashes of its canonical design 
+        (values of the parameters used by the selected components) and of its assembled pattern
+    """
+    design_key = 'design_' + pyg.design_hash(pyg.canonical_design(design, used_params))
+    spec_key = 'spec_' + hashlib.sha1(
+        json.dumps(pattern.pattern, sort_keys=True).encode()).hexdigest()
+    return design_key, spec_key
+
+
+def _record_duplicate(name, keys, seen, gen_stats):
+    """Record the sample as a duplicate of an earlier one if they have the same
+        canonical design or the same assembled pattern on the default body (see _sample_keys()).
+        Returns the name of the original sample or None
+    """
+    original = None
+    for key in keys:
+        if key in seen:
+            original = seen[key]
+            break
+    if original is not None:
+        gen_stats['duplicates'][name] = original
+        return original
+
+    for key in keys:
+        seen[key] = name
+    return None
+
+
+# Sample generation
+_worker_state = {}   # Sampler and bodies of the generation process, created on first use
+
+
+def _sampling_state(task):
+    """Design sampler and body options, loaded once per process"""
+    key = (task['design_file'], str(task['default_body_file']), str(task['body_samples_path']))
+    if _worker_state.get('key') != key:
+        sampler = pyg.DesignSampler(task['design_file'])
+        _worker_state.clear()
+        _worker_state.update(
+            key=key,
+            sampler=sampler,
+            batch_sampler=sampler.compile(),
+            default_body=BodyParameters(task['default_body_file']),
+            body_options=gather_body_options(Path(task['body_samples_path'])),
+        )
+    if task.get('component_cache', False):
+        pyg.component_cache.enable()
+    else:
+        pyg.component_cache.disable()
+    return _worker_state
+
+
+def _design_sequence(state, task):
+    """Low-discrepancy sequence of the dataset designs, created once per process"""
+    key = (task['design_sampling'], task['dataset_seed'], task['dataset_size'])
+    if state.get('sequence_key') != key:
+        state['sequence'] = pyg.DesignSequence(
+            state['batch_sampler'], task['design_sampling'], 
+            size=task['dataset_size'], seed=task['dataset_seed'])
+        state['sequence_key'] = key
+    return state['sequence']
+
+
+def _design_stream(state, task):
+    """Random designs for the sampling attempts of a sample
+    
+        NOTE: Datasets generated before batched sampling draw designs one by one 
+        with DesignSampler.randomize()
+    """
+    method = task.get('design_sampling', 'sequential')
+    if method == 'sequential':
+        while True:
+            yield state['sampler'].randomize()
+
+    if method in ['sobol', 'lhs']:
+        # All attempts of the sample follow the low-discrepancy sequence of the dataset
+        sequence = _design_sequence(state, task)
+        for attempt in itertools.count():
+            yield sequence.design(task['sample_id'], attempt)
+
+    rng = np.random.default_rng(task['seed'] if task['seed'] is not None else random.getrandbits(64))
+    while True:
+        # NOTE: Only the designs that are attempted are turned into dictionaries
+        yield from state['batch_sampler'].sample(DESIGN_BATCH_SIZE, rng)
+
+
+def _generate_sample(task):
+    """Sample a valid design and save its patterns on the default and a random body.
+        Retries the sampling until success (at most 100 attempts).
+
+        Can run in a worker process: the dataset properties are not modified, 
+        the info required to update them is returned instead (name is None if all attempts failed)
+    """
+    state = _sampling_state(task)
+    default_body = state['default_body']
+    body_samples_path = Path(task['body_samples_path'])
+    default_sample_data, body_sample_data = Path(task['default_data']), Path(task['body_sample_data'])
+    verbose = task['verbose']
+    prefilter = LengthPrefilter.from_config(task['prefilter'])
+
+    if task['seed'] is not None:
+        # Sample (incl. re-tries) only depends on the dataset seed and its index
+        random.seed(task['seed'])
+
+    # Redo sampling untill success
+    attempts = SamplingAttempts()
+    designs = _design_stream(state, task)
+    for _ in range(100):  # Putting a limit on re-tries to avoid infinite loops
+        new_design = next(designs)
+        name = f'rand_{_id_generator()}'
+        prefilter.start_sample(name)
+        attempts.start(name)
+        stage, used = None, None   # Body and the design parameters read at the current stage
+        try:
+            if verbose:
+                print(f'{name} saving design params for debug')
+                with open(Path('./Logs') / f'{name}_design_params.yaml', 'w') as f:
+                    yaml.dump(
+                        {'design': new_design}, 
+                        f,
+                        default_flow_style=False,
+                        sort_keys=False
+                    )
+
+            # Preliminary checks 
+            check_design = pyg.DesignUsageTracker(new_design)
+            used = check_design.used
+            assert_param_combinations(check_design)
+
+            # On default body
+            # NOTE: Recording the design parameters used by the selected components
+            stage = 'default'
+            tracked_design = pyg.DesignUsageTracker(new_design)
+            used = tracked_design.used
+            predicted = prefilter.check(new_design, default_body)
+            piece_default = MetaGarment(name, default_body, tracked_design) 
+            prefilter.assert_total_length(piece_default, predicted)  # Check final length correctnesss
+
+            # Straight/apart legs pose
+            def_obj_name = task['body_default']
+            if has_pants(new_design):
+                def_obj_name += '_apart'
+            default_body.params['body_sample'] = def_obj_name
+
+            # On random body shape
+            stage = 'random'
+            rand_body = body_sample(
+                state['body_options'],
+                body_samples_path,
+                straight=not has_pants(new_design))
+            shaped_design = pyg.DesignUsageTracker(new_design)
+            used = shaped_design.used
+            predicted = prefilter.check(new_design, rand_body)
+            piece_shaped = MetaGarment(name, rand_body, shaped_design) 
+            prefilter.assert_total_length(piece_shaped, predicted)   # Check final length correctness
+            
+            if piece_default.is_self_intersecting() or piece_shaped.is_self_intersecting():
+                if verbose:
+                    print(f'{piece_default.name} is self-intersecting!!') 
+                attempts.reject(
+                    SamplingAttempts.INTERSECTION, design=new_design, 
+                    used=tracked_design.used | shaped_design.used, garment=_garment_label(new_design))
+                continue  # Redo the randomization
+            
+            # Save samples
+            stage, used = None, None
+            pattern = _save_sample(piece_default, default_body, new_design, default_sample_data, verbose=verbose)
+            _save_sample(piece_shaped, rand_body, new_design, body_sample_data, verbose=verbose)
+
+            attempts.accept()
+            return dict(
+                name=name, 
+                design=new_design,
+                keys=_sample_keys(new_design, tracked_design.used, pattern),
+                n_panels=len(pattern.pattern['panels']),
+                prefilter=prefilter.stats,
+                attempts=attempts.records
+            )
+        except KeyboardInterrupt:
+            raise
+        except BaseException as e:
+            print(f'{name} failed')
+            if verbose:
+                traceback.print_exc()
+            print(e)
+
+            if isinstance(e, TotalLengthError):
+                used = length_params(new_design)   # Only the length parameters are relevant
+            attempts.fail(e, body=stage, design=new_design, used=used, garment=_garment_label(new_design))
+
+            # Check empty folder
+            if (default_sample_data / name).exists():
+                print('Generate::Info::Removed empty folder after unsuccessful sampling attempt', default_sample_data / name)
+                shutil.rmtree(default_sample_data / name, ignore_errors=True)
+            
+            if (body_sample_data / name).exists():
+                print('Generate::Info::Removed empty folder after unsuccessful sampling attempt', body_sample_data / name)
+                shutil.rmtree(body_sample_data / name, ignore_errors=True)
+
+            continue
+
+    return dict(name=None, prefilter=prefilter.stats, attempts=attempts.records)
+
+
+def _sample_results(tasks, num_workers, task_fn=_generate_sample, max_retries=MAX_SAMPLE_RETRIES):
+    """Yield (sample_id, result of task_fn (_generate_sample())) in the order of the tasks.
+        With num_workers > 1, the samples are generated in a pool of worker processes. 
+        Samples lost with a failed worker are re-tried up to max_retries times, 
+        and the failures are added to the attempt records of the sample
+    """
+    if num_workers <= 1:
+        for sample_id, task in tasks:
+            yield sample_id, task_fn(task)
+        return
+
+    ready = {}
+    order = [sample_id for sample_id, _ in tasks]
+    next_idx = 0
+    pending, payloads = deque(tasks), dict(tasks)
+    worker_fails = defaultdict(list)   # sample_id -> attempt records of the failed workers
+    pool = WorkerPool(task_fn, num_workers)
+    pool.start()
+    try:
+        while pending or pool.busy_count():
+            while pending and pool.idle_count():
+                pool.submit(*pending.popleft())
+            for sample_id, status, result in pool.poll(timeout=pool.poll_interval):
+                if status != 'done':
+                    worker_fails[sample_id].append(dict(
+                        name=None, check=SamplingAttempts.CRASH, time=0., 
+                        error=f'Worker {status}: {result}' if result else f'Worker {status}'))
+                    if len(worker_fails[sample_id]) <= max_retries:
+                        print(f'Generate::WARNING::Sample {sample_id} failed ({status}). Re-trying')
+                        # NOTE: First in the queue s.t. the following samples are not held back
+                        pending.appendleft((sample_id, payloads[sample_id]))
+                        continue
+                    print(f'Generate::WARNING::Sample {sample_id} was not generated: {status} {result if result else ""}')
+                    result = dict(name=None)
+                if sample_id in worker_fails:
+                    result['attempts'] = worker_fails.pop(sample_id) + result.get('attempts', [])
+                ready[sample_id] = result
+
+                # NOTE: Keep the order of samples s.t. the outputs do not depend on the worker scheduling
+                while next_idx < len(order) and order[next_idx] in ready:
+                    yield order[next_idx], ready.pop(order[next_idx])
+                    next_idx += 1
+    finally:
+        pool.close()
+
+
 # Generation loop
-def generate(path, properties, sys_paths, verbose=False):
+def generate(path, properties, sys_paths, verbose=False, num_workers=1):
     """Generates a synthetic dataset of patterns with given properties
         Params:
             path : path to folder to put a new dataset into
             props : an instance of DatasetProperties class
                     requested properties of the dataset
+            num_workers : number of processes sampling the patterns. 
+                    The calling process is the only one updating the dataset properties and manifests
     """
     path = Path(path)
     gen_config = properties['generator']['config']
     gen_stats = properties['generator']['stats']
     body_samples_path = Path(sys_paths['body_samples_path']) / properties['body_samples']
-    body_options = gather_body_options(body_samples_path)
 
     # create data folder
     data_folder, default_path, body_sample_path = _create_data_folder(properties, path)
     default_sample_data = default_path / 'data'
     body_sample_data = body_sample_path / 'data'
+    default_manifest = DatasetManifest(default_path)
+    body_sample_manifest = DatasetManifest(body_sample_path)
 
     # init random seed
     if 'random_seed' not in gen_config or gen_config['random_seed'] is None:
         gen_config['random_seed'] = int(time.time())
     print(f'Random seed is {gen_config["random_seed"]}')
-    random.seed(gen_config['random_seed'])
+    # NOTE: Datasets generated before per-sample seeding are replicated with a single seed
+    per_sample_seeds = gen_config.get('seeding', 'global') == 'per_sample'
+    if not per_sample_seeds:
+        random.seed(gen_config['random_seed'])
+
+    # Part of the dataset to generate in this run
+    shard = gen_config.get('shard', {'id': 0, 'num': 1})
+    if shard['num'] > 1 and not per_sample_seeds:
+        raise ValueError('Generate::ERROR::Generation in shards requires per-sample seeding')
+    if num_workers > 1 and not per_sample_seeds:
+        print('Generate::WARNING::Dataset uses a single random seed and can only be replicated sequentially')
+        num_workers = 1
 
     # generate data
     start_time = time.time()
 
-    default_body = BodyParameters(Path(sys_paths['bodies_default_path']) / (properties['body_default'] + '.yaml'))
-    sampler = pyg.DesignSampler(properties['design_file'])
-    for i in range(properties['size']):
-        # log properties every time
-        properties.serialize(data_folder / 'dataset_properties.yaml')
-
-        # Redo sampling untill success
-        for _ in range(100):  # Putting a limit on re-tries to avoid infinite loops
-            new_design = sampler.randomize()
-            name = f'rand_{_id_generator()}'
-            try:
-                if verbose:
-                    print(f'{name} saving design params for debug')
-                    with open(Path('./Logs') / f'{name}_design_params.yaml', 'w') as f:
-                        yaml.dump(
-                            {'design': new_design}, 
-                            f,
-                            default_flow_style=False,
-                            sort_keys=False
-                        )
-
-                # Preliminary checks 
-                assert_param_combinations(new_design)
-
-                # On default body
-                piece_default = MetaGarment(name, default_body, new_design) 
-                piece_default.assert_total_length()  # Check final length correctnesss
-
-                # Straight/apart legs pose
-                def_obj_name = properties['body_default']
-                if has_pants(new_design):
-                    def_obj_name += '_apart'
-                default_body.params['body_sample'] = def_obj_name
-
-                # On random body shape
-                rand_body = body_sample(
-                    body_options,
-                    body_samples_path,
-                    straight=not has_pants(new_design))
-                piece_shaped = MetaGarment(name, rand_body, new_design) 
-                piece_shaped.assert_total_length()   # Check final length correctness
-                
-                if piece_default.is_self_intersecting() or piece_shaped.is_self_intersecting():
-                    if verbose:
-                        print(f'{piece_default.name} is self-intersecting!!') 
-                    continue  # Redo the randomization
-                
-                # Save samples
-                pattern = _save_sample(piece_default, default_body, new_design, default_sample_data, verbose=verbose)
-                _save_sample(piece_shaped, rand_body, new_design, body_sample_data, verbose=verbose)
-                
-                stats_utils.count_panels(pattern, props)
-                stats_utils.garment_type(name, new_design, props)
-
-                break  # Stop generation
-            except KeyboardInterrupt:  # Return immediately with whatever is ready
-                return default_path, body_sample_path
-            except BaseException as e:
-                print(f'{name} failed')
-                if verbose:
-                    traceback.print_exc()
-                print(e)
-
-                # Check empty folder
-                if (default_sample_data / name).exists():
-                    print('Generate::Info::Removed empty folder after unsuccessful sampling attempt', default_sample_data / name)
-                    shutil.rmtree(default_sample_data / name, ignore_errors=True)
-                
-                if (body_sample_data / name).exists():
-                    print('Generate::Info::Removed empty folder after unsuccessful sampling attempt', body_sample_data / name)
-                    shutil.rmtree(body_sample_data / name, ignore_errors=True)
-
+    task_base = dict(
+        design_file=properties['design_file'],
+        default_body_file=Path(sys_paths['bodies_default_path']) / (properties['body_default'] + '.yaml'),
+        body_default=properties['body_default'],
+        body_samples_path=body_samples_path,
+        default_data=default_sample_data,
+        body_sample_data=body_sample_data,
+        prefilter=gen_config.get('prefilter'),
+        component_cache=gen_config.get('component_cache', False),
+        design_sampling=gen_config.get('design_sampling', 'sequential'),
+        dataset_seed=gen_config['random_seed'],
+        dataset_size=properties['size'],
+        verbose=verbose
+    )
+    tasks = [
+        (i, dict(task_base, sample_id=i, seed=sample_seed(gen_config['random_seed'], i) if per_sample_seeds else None))
+        for i in range(shard['id'], properties['size'], shard['num'])
+    ]
+
+    seen_samples = {}   # Canonical design and pattern hashes -> sample name
+    attempts_log = data_folder / ATTEMPTS_FILE
+    if 'duplicates' not in gen_stats:
+        gen_stats['duplicates'] = {}
+    try:
+        for sample_id, sample in _sample_results(tasks, num_workers):
+            if 'prefilter' in sample and gen_config.get('prefilter'):
+                add_prefilter_stats(gen_stats, sample['prefilter'])
+            if 'attempts' in sample:
+                _log_attempts(attempts_log, sample_id, sample['attempts'])
+                add_attempt_stats(gen_stats, sample['attempts'])
+            if sample['name'] is None:
                 continue
+            name, new_design = sample['name'], sample['design']
+
+            # NOTE: Duplicates are still saved: random body samples are different
+            original = _record_duplicate(name, sample['keys'], seen_samples, gen_stats)
+            if original is not None and verbose:
+                print(f'{name} is a duplicate of {original} on default body')
+
+            # Index the samples
+            default_manifest.add_folder(
+                name, default_sample_data / name, 
+                stats={'duplicate_of': original} if original is not None else None)
+            body_sample_manifest.add_folder(name, body_sample_data / name)
+
+            gen_stats['panel_count'][name] = sample['n_panels']
+            stats_utils.garment_type(name, new_design, properties)
+
+            # log properties every time
+            properties.serialize(data_folder / 'dataset_properties.yaml')
+    except KeyboardInterrupt:  # Return immediately with whatever is ready
+        return default_path, body_sample_path
 
     elapsed = time.time() - start_time
     gen_stats['generation_time'] = f'{elapsed:.3f} s'
 
     # log properties
-    props.stats_summary()
+    properties.stats_summary()
     properties.serialize(data_folder / 'dataset_properties.yaml')
 
     return default_path, body_sample_path
@@ -316,7 +811,16 @@ if __name__ == '__main__':
             size=args.size,
             name=f'{args.name}_{args.size}' if not args.batch_id else f'{args.name}_{args.size}_{args.batch_id}',
             to_subfolders=True)
-        props.set_section_config('generator')
+        if args.num_shards > 1:
+            props['name'] += f'_shard{args.shard_id}of{args.num_shards}'
+        props.set_section_config(
+            'generator',
+            random_seed=args.seed,
+            seeding='per_sample',
+            prefilter=dict(enabled=args.prefilter, margin=15., audit_rate=0.05),
+            design_sampling=args.design_sampling,
+            component_cache=args.component_cache,
+            shard={'id': args.shard_id, 'num': args.num_shards})
         props.set_section_stats(
             'generator', 
             panel_count={},
@@ -327,10 +831,10 @@ if __name__ == '__main__':
 
     # Generator
     default_path, body_sample_path = generate(
-        system_props['datasets_path'], props, system_props, verbose=False)
+        system_props['datasets_path'], props, system_props, verbose=False, num_workers=args.workers)
 
     # Gather the pattern images separately
-    gather_visuals(default_path)
-    gather_visuals(body_sample_path)
+    gather_visuals(default_path, mode=args.gallery)
+    gather_visuals(body_sample_path, mode=args.gallery)
 
     print('Data generation completed!')
@@ -0,0 +1,199 @@
+"""Merge the shards of a dataset generated or simulated on independent nodes into one dataset
+    (see --num_shards and --shard_id options of pattern_sampler.py and pattern_data_sim.py)
+
+    Dataset properties stats, fail lists, manifests and tar shards of the garment outputs are combined,
+    and the garment folders are linked (or copied/moved) to the merged dataset without re-simulation
+
+    Usage (from the repository root):
+        python post_processing_scripts/merge_dataset_shards.py --datasets data_shard0of2_<time> data_shard1of2_<time> --name data_merged
+        python post_processing_scripts/merge_dataset_shards.py --sim --datasets data_shard0of2 data_shard1of2 --name data
+"""
+
+import argparse
+import json
+import os
+from pathlib import Path
+import shutil
+
+from pygarment.data_config import Properties
+from pygarment.data_manifest import MANIFEST_FILE, SIM_MANIFEST_FILE
+from pygarment.meshgen.dataset_shards import INDEX_FILE, read_index, shard_file_name
+
+BODY_TYPES = ['default_body', 'random_body']
+FLAT_FOLDERS = ['data', 'renders', 'patterns_vis']   # Merged item by item
+SKIP_STATS = ['journal_compacted', 'pipeline']   # Only meaningful for the individual shards
+
+
+def get_command_args():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--datasets', nargs='+', help='names of the dataset shards to merge', type=str, required=True)
+    parser.add_argument('--name', '-n', help='name of the merged dataset', type=str, required=True)
+    parser.add_argument('--sim', action='store_true',
+                        help='merge simulated datasets (datasets_sim folder) instead of the generated patterns')
+    parser.add_argument('--mode', help='how to transfer garment files to the merged dataset',
+                        choices=['hardlink', 'symlink', 'copy', 'move'], default='hardlink')
+    return parser.parse_args()
+
+
+# ---- Properties ----
+def _merge_stats(into, stats):
+    """Recursively merge stats: dictionaries are updated, lists are concatenated"""
+    for key, value in stats.items():
+        if key in SKIP_STATS:
+            continue
+        if key not in into:
+            into[key] = value
+        elif isinstance(value, dict) and isinstance(into[key], dict):
+            _merge_stats(into[key], value)
+        elif isinstance(value, list) and isinstance(into[key], list):
+            present = set(into[key])
+            into[key] = into[key] + [v for v in value if v not in present]
+        # Scalars (e.g. summaries) are re-computed after merging
+
+
+def merge_props(prop_files, name):
+    merged = Properties(prop_files[0])
+    frozen = merged.properties.get('frozen', False)
+    for section in merged.properties.values():
+        if isinstance(section, dict) and 'stats' in section:
+            for key in SKIP_STATS:
+                section['stats'].pop(key, None)
+
+    for file in prop_files[1:]:
+        props = Properties(file)
+        frozen = frozen and props.properties.get('frozen', False)
+        for key, section in props.properties.items():
+            if not (isinstance(section, dict) and 'stats' in section):
+                continue
+            if key not in merged:
+                merged[key] = section
+                continue
+            if _without_shard(section.get('config')) != _without_shard(merged[key].get('config')):
+                print(f'Merge::WARNING::{key} config of {file} differs from {prop_files[0]}. '
+                      'Using the first one')
+            _merge_stats(merged[key]['stats'], section['stats'])
+
+    # Merged dataset is a single logical dataset
+    merged.properties.pop('sim_shard', None)
+    if 'generator' in merged and 'shard' in merged['generator']['config']:
+        merged['generator']['config']['shard'] = {'id': 0, 'num': 1}
+    if 'frozen' in merged:
+        merged['frozen'] = frozen
+    merged['name'] = merged['data_folder'] = name
+
+    merged.stats_summary()
+    return merged
+
+
+def _without_shard(config):
+    if not isinstance(config, dict):
+        return config
+    return {key: value for key, value in config.items() if key != 'shard'}
+
+
+# ---- Files ----
+def _place(src: Path, dst: Path, mode):
+    """Transfer file or folder to dst"""
+    if dst.exists() or dst.is_symlink():
+        print(f'Merge::WARNING::{dst} already exists. Skipped')
+        return
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    if mode == 'move':
+        shutil.move(str(src), str(dst))
+    elif mode == 'symlink':
+        dst.symlink_to(src.resolve(), target_is_directory=src.is_dir())
+    elif src.is_dir():
+        shutil.copytree(src, dst, copy_function=_link_or_copy if mode == 'hardlink' else shutil.copy2)
+    elif mode == 'hardlink':
+        _link_or_copy(src, dst)
+    else:
+        shutil.copy2(src, dst)
+
+
+def _link_or_copy(src, dst):
+    try:
+        os.link(src, dst)
+    except OSError:   # e.g. different file systems
+        shutil.copy2(src, dst)
+
+
+def merge_manifests(sources, target: Path, filename):
+    """Concatenate the manifests. Element paths are relative to the body type folder, so they stay valid"""
+    files = [src / filename for src in sources if (src / filename).exists()]
+    if not files:
+        return
+    with open(target / filename, 'w') as out:
+        for file in files:
+            with open(file, 'r') as f:
+                for line in f:
+                    if line.strip():
+                        out.write(line if line.endswith('\n') else line + '\n')
+
+
+def merge_shards(sources, target: Path, mode):
+    """Renumber the tar shards of all the sources and combine their indices"""
+    shard_folders = [src / 'shards' for src in sources if (src / 'shards' / INDEX_FILE).exists()]
+    if not shard_folders:
+        return
+    target.mkdir(parents=True, exist_ok=True)
+
+    next_id = 0
+    with open(target / INDEX_FILE, 'w') as index:
+        for folder in shard_folders:
+            entries = read_index(folder / INDEX_FILE)
+            id_map = {}
+            for shard_id in sorted(set(entry['shard'] for entry in entries.values())):
+                id_map[shard_id] = next_id
+                _place(folder / shard_file_name(shard_id), target / shard_file_name(next_id), mode)
+                next_id += 1
+            for entry in entries.values():
+                entry['shard'] = id_map[entry['shard']]
+                index.write(json.dumps(entry) + '\n')
+
+
+def merge_body_folder(sources, target: Path, mode):
+    """Merge default_body or random_body folders of the dataset shards"""
+    target.mkdir(parents=True, exist_ok=True)
+    body_type = target.name
+    for src in sources:
+        for el in src.iterdir():
+            if el.is_dir() and el.name in FLAT_FOLDERS:
+                for item in el.iterdir():
+                    _place(item, target / el.name / item.name, mode)
+            elif el.is_dir() and el.name != 'shards':
+                _place(el, target / el.name, mode)   # Garment outputs
+            # Files (properties, manifests, journals) are merged separately
+
+    merge_manifests(sources, target, MANIFEST_FILE)
+    merge_manifests(sources, target, SIM_MANIFEST_FILE)
+    merge_shards(sources, target / 'shards', mode)
+
+    prop_files = [src / f'dataset_properties_{body_type}.yaml' for src in sources]
+    prop_files = [file for file in prop_files if file.exists()]
+    if prop_files:
+        merged = merge_props(prop_files, target.parent.name)
+        merged.serialize(target / f'dataset_properties_{body_type}.yaml')
+
+
+def merge_datasets(sources, target: Path, mode='hardlink'):
+    if target.exists():
+        raise ValueError(f'Merge::ERROR::Target dataset {target} already exists')
+
+    target.mkdir(parents=True)
+    prop_files = [src / 'dataset_properties.yaml' for src in sources if (src / 'dataset_properties.yaml').exists()]
+    if prop_files:
+        merge_props(prop_files, target.name).serialize(target / 'dataset_properties.yaml')
+
+    for body_type in BODY_TYPES:
+        body_sources = [src / body_type for src in sources if (src / body_type).exists()]
+        if body_sources:
+            merge_body_folder(body_sources, target / body_type, mode)
+
+
+if __name__ == '__main__':
+    args = get_command_args()
+    system_props = Properties('./system.json')
+    root = Path(system_props['datasets_sim' if args.sim else 'datasets_path'])
+
+    merge_datasets([root / name for name in args.datasets], root / args.name, mode=args.mode)
+    print(f'Merged {len(args.datasets)} datasets into {root / args.name}')
@@ -0,0 +1,30 @@
+"""In simulated dataset, summarize per-frame simulation telemetry of all garments
+    to find the simulation phases that take the most time
+
+    NOTE: the dataset needs to be simulated with `telemetry: true` in sim config
+"""
+
+from pathlib import Path
+import yaml
+
+import pygarment.data_config as config
+from pygarment.meshgen.sim_telemetry import summarize
+
+
+system_props = config.Properties('./system.json')
+dataset = 'telemetry_test'
+datapaths = [
+    Path(system_props['datasets_sim']) / dataset / 'default_body', 
+    Path(system_props['datasets_sim']) / dataset / 'random_body'
+]
+
+for datapath in datapaths:
+    if not datapath.exists():
+        continue
+
+    summary = summarize(datapath)
+    print(f'{datapath}:')
+    print(yaml.dump(summary, default_flow_style=False, sort_keys=False))
+
+    with open(datapath / 'sim_telemetry_summary.yaml', 'w') as f:
+        yaml.dump(summary, f, default_flow_style=False, sort_keys=False)
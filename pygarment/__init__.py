@@ -19,7 +19,9 @@ import pygarment.garmentcode.operators as ops
 import pygarment.garmentcode.utils as utils
 
 # Parameter support
-from pygarment.garmentcode.params import BodyParametrizationBase, DesignSampler
+from pygarment.garmentcode.params import BodyParametrizationBase, DesignSampler, DesignBatchSampler, DesignSequence
+from pygarment.garmentcode.params import DesignUsageTracker, canonical_design, design_hash
+from pygarment.garmentcode.component_cache import component_cache, memoize_component
 
 # Errors
 from pygarment.pattern.core import EmptyPatternError
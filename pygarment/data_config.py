@@ -47,6 +47,9 @@ class Properties():
     def __init__(self, filename="", clean_stats=False):
         self.properties = {}
         self.properties_on_load = {}
+        # Sets of the values of stats lists (processed, fails, etc.) for fast membership checks:
+        # path -> [list, its length when indexed, set of values]
+        self._indexes = {}
 
         if filename:
             self.properties = self._from_file(filename)
@@ -116,9 +119,8 @@ class Properties():
             Check if a particular object is listed as fail in any of the sections
             Fails may be listed in the stats subsection of any of the section
         """
-        _, fails_list = self.count_fails()
-
-        return dataname in fails_list
+        is_fail, _ = self.is_fail_section(dataname)
+        return is_fail
 
     def is_fail_section(self, dataname):
         """
@@ -137,11 +139,11 @@ class Properties():
                                 'Properties::ERROR:: Fails subsections of the type {} is not supported'.format(
                                     type(section['stats']['fails'][key])))
                                     
-                        if dataname in section['stats']['fails'][key]:  # expects a list as value
+                        if self.has_fail(section_key, key, dataname):  # expects a list as value
                             return True, key
 
                 elif isinstance(section['stats']['fails'], list):
-                    if dataname in section['stats']['fails'][key]:  # expects a list as value
+                    if self.in_stats_list(section_key, 'fails', dataname):  # expects a list as value
                         return True, 'fails'
                 else:
                     raise NotImplementedError('Properties::ERROR:: Fails subsections of the type {} is not supported'.format(type(section['stats']['fails'])))
@@ -186,11 +188,60 @@ class Properties():
         section = self.properties[section_name]
         if 'fails' not in section['stats']:
             section['stats']['fails'] = {}
+        if fail_type not in section['stats']['fails']:
+            section['stats']['fails'][fail_type] = []
+        self._indexed_append(
+            section['stats']['fails'][fail_type], (section_name, 'fails', fail_type), info)
+
+    def has_fail(self, section_name, fail_type, info):
+        """Check if the object is listed as fail of the given type in the section"""
         try:
-            section['stats']['fails'][fail_type].append(info)
+            fails = self.properties[section_name]['stats']['fails'][fail_type]
+        except (KeyError, TypeError):
+            return False
+        return info in self._index(fails, (section_name, 'fails', fail_type))
+
+    # ---- Indexed stats lists ----
+    def in_stats_list(self, section_name, key, value):
+        """Check if the value is in the stats list (e.g. sim processed) of a section"""
+        return value in self.stats_list_set(section_name, key)
+
+    def stats_list_set(self, section_name, key):
+        """Set of the values in the stats list of a section (empty if there is no such list). 
+            Use it for membership checks of many values at once
+        """
+        try:
+            values = self.properties[section_name]['stats'][key]
         except KeyError:
-            section['stats']['fails'][fail_type] = [info]
-            
+            return set()
+        return self._index(values, (section_name, key))
+
+    def add_to_stats_list(self, section_name, key, value):
+        """Append the value to the stats list of a section keeping its index updated"""
+        stats = self.properties[section_name]['stats']
+        if key not in stats:
+            stats[key] = []
+        self._indexed_append(stats[key], (section_name, key), value)
+
+    def remove_from_stats_list(self, section_name, key, values):
+        """Remove all the given values from the stats list of a section in a single pass"""
+        stats = self.properties[section_name]['stats']
+        to_remove = set(values)
+        index = self._index(stats[key], (section_name, key))
+        stats[key] = [v for v in stats[key] if v not in to_remove]
+        self._indexes[(section_name, key)] = [stats[key], len(stats[key]), index - to_remove]
+
+    def pop_from_stats_list(self, section_name, key):
+        """Remove and return the last value of the stats list of a section"""
+        values = self.properties[section_name]['stats'][key]
+        index = self._index(values, (section_name, key))
+        value = values.pop()
+        if len(index) > len(values):   # No repeated values -- the popped one is gone from the list
+            index.discard(value)
+            self._indexes[(section_name, key)][1] = len(values)
+        else:
+            self._indexes.pop((section_name, key))
+        return value
 
     # ---------- Properties updates ---------------
     def set_basic(self, **kwconfig):
@@ -338,6 +389,25 @@ class Properties():
                   'requested, but not all sections were updated')
 
     # ---- Private utils ----
+    def _index(self, values, path):
+        """Set of the values of a stats list. 
+            Re-built if the list was replaced or its length was changed bypassing the indexed updates 
+
+            NOTE: In-place edits of the list that keep its length (e.g. item assignment) are not detected. 
+            Use the stats list methods to update the lists
+        """
+        cached = self._indexes.get(path)
+        if cached is None or cached[0] is not values or cached[1] != len(values):
+            cached = [values, len(values), set(values)]
+            self._indexes[path] = cached
+        return cached[2]
+
+    def _indexed_append(self, values, path, value):
+        index = self._index(values, path)
+        values.append(value)
+        index.add(value)
+        self._indexes[path][1] = len(values)
+
     def _from_file(self, filename):
         """ Load properties from previously created file """
         extention = Path(filename).suffix.lower()
@@ -0,0 +1,132 @@
+"""
+    Dataset manifest: incrementally written index of the dataset elements
+
+    Every element (garment) gets a JSON line with its name, status, the files it produced
+    and its stats, appended as soon as the element is ready.
+    Listing the dataset or gathering its files then becomes a query over the manifest
+    instead of a traversal of the (potentially huge) dataset folder tree
+"""
+
+import json
+import os
+from pathlib import Path
+import shutil
+
+MANIFEST_FILE = 'manifest.jsonl'
+SIM_MANIFEST_FILE = 'sim_manifest.jsonl'   # Manifest of the simulated dataset
+
+
+class DatasetManifest():
+    """Append-only manifest of the dataset elements located in root folder
+
+        Each entry contains:
+            * name -- element name
+            * status -- 'ok' or the description of the failure
+            * folder -- element folder relative to the root (None if the files are not stored as a folder)
+            * files -- list of the element files relative to its folder
+            * stats -- optional dictionary of per-element stats
+        The latest entry of an element overrides the earlier ones
+    """
+    def __init__(self, root, filename=MANIFEST_FILE):
+        self.root = Path(root)
+        self.path = self.root / filename
+        self._entries = None   # Loaded on demand
+        self._line_terminated = False
+
+    def exists(self):
+        return self.path.exists()
+
+    def add(self, name, status='ok', folder=None, files=None, stats=None):
+        """Add or update the element entry"""
+        entry = dict(name=name, status=status, folder=folder, files=files or [], stats=stats or {})
+        self.root.mkdir(parents=True, exist_ok=True)
+        if not self._line_terminated:
+            self._terminate_last_line()
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(entry, default=_to_json) + '\n')
+        if self._entries is not None:
+            self._entries[name] = entry
+
+    def add_folder(self, name, folder, status='ok', stats=None):
+        """Add the element with all the files stored in its folder"""
+        folder = Path(folder)
+        files = sorted(file.relative_to(folder).as_posix() for file in folder.rglob('*') if file.is_file())
+        self.add(name, status=status, folder=_relative(folder, self.root), files=files, stats=stats)
+
+    def _terminate_last_line(self):
+        """Terminate the line partially written on crash s.t. it does not break the next entry"""
+        if self.exists() and self.path.stat().st_size:
+            with open(self.path, 'rb+') as f:
+                f.seek(-1, 2)
+                if f.read(1) != b'\n':
+                    f.write(b'\n')
+        self._line_terminated = True
+
+    # ---- Queries ----
+    def entries(self):
+        """Dictionary of the latest entries of the elements"""
+        if self._entries is None:
+            self._entries = {}
+            if self.exists():
+                with open(self.path, 'r') as f:
+                    for line in f:
+                        try:
+                            entry = json.loads(line)
+                        except json.JSONDecodeError:   # Partially written on crash
+                            continue
+                        self._entries[entry['name']] = entry
+        return self._entries
+
+    def names(self, status=None):
+        """Names of the elements, optionally only with the given status"""
+        return [name for name, entry in self.entries().items()
+                if status is None or entry['status'] == status]
+
+    def files(self, filter_fn=None, status=None):
+        """Paths to the element files (stored in folders) satisfying filter_fn(file_name)"""
+        paths = []
+        for entry in self.entries().values():
+            if entry['folder'] is None or (status is not None and entry['status'] != status):
+                continue
+            folder = self.root / entry['folder']
+            paths += [folder / file for file in entry['files'] if filter_fn is None or filter_fn(file)]
+        return paths
+
+    def gallery(self, out_path, filter_fn=None, mode='copy', status=None):
+        """Gather the element files satisfying filter_fn(file_name) in a single folder
+
+            * mode -- 'copy', 'hardlink' or 'symlink'
+        """
+        out_path = Path(out_path)
+        out_path.mkdir(parents=True, exist_ok=True)
+        for file in self.files(filter_fn, status=status):
+            target = out_path / file.name
+            if target.exists() or target.is_symlink():
+                target.unlink()
+            if mode == 'symlink':
+                target.symlink_to(file.resolve())
+            elif mode == 'hardlink':
+                try:
+                    os.link(file, target)
+                except OSError:  # e.g. different file systems
+                    shutil.copy2(file, target)
+            elif mode == 'copy':
+                shutil.copy2(file, target)
+            else:
+                raise ValueError(f'{self.__class__.__name__}::ERROR::Unknown gallery mode {mode}')
+        return out_path
+
+
+def _relative(path, root):
+    try:
+        return Path(path).relative_to(root).as_posix()
+    except ValueError:
+        return Path(path).as_posix()
+
+
+def _to_json(value):
+    """Fallback serialization for numpy scalars"""
+    try:
+        return value.item()
+    except AttributeError:
+        raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
@@ -0,0 +1,117 @@
+"""Closed-form evaluation of cubic Bezier curves
+
+    Vectorized evaluation of points, derivatives, curvature and length of cubic Bezier curves
+    given as 4 x 2 arrays of control points, together with the gradients of these quantities
+    w.r.t. the control points.
+    Used in optimization objectives instead of sampling svgpathtools curves point by point
+"""
+from functools import lru_cache
+
+import numpy as np
+
+# Composite Gauss-Legendre quadrature for the curve length
+LENGTH_SEGMENTS = 4
+LENGTH_NODES = 8
+
+
+@lru_cache(maxsize=None)
+def _quadrature(segments, nodes):
+    """Nodes and weights of the composite Gauss-Legendre quadrature on [0, 1]"""
+    x, w = np.polynomial.legendre.leggauss(nodes)
+    starts = np.arange(segments) / segments
+    t = (starts[:, None] + (x[None, :] + 1) / (2 * segments)).ravel()
+    weights = np.tile(w / (2 * segments), segments)
+    return t, weights
+
+
+# ---- Bernstein basis ----
+def basis(t):
+    """Weights of the control points in the curve points B(t): n x 4"""
+    t = np.atleast_1d(np.asarray(t, dtype=float))
+    s = 1 - t
+    return np.stack([s**3, 3 * s**2 * t, 3 * s * t**2, t**3], axis=-1)
+
+
+def basis_d1(t):
+    """Weights of the control points in the first derivative B'(t): n x 4"""
+    t = np.atleast_1d(np.asarray(t, dtype=float))
+    s = 1 - t
+    return 3 * np.stack([-s**2, s**2 - 2 * s * t, 2 * s * t - t**2, t**2], axis=-1)
+
+
+def basis_d2(t):
+    """Weights of the control points in the second derivative B''(t): n x 4"""
+    t = np.atleast_1d(np.asarray(t, dtype=float))
+    s = 1 - t
+    return 6 * np.stack([s, t - 2 * s, s - 2 * t, t], axis=-1)
+
+
+# ---- Evaluation ----
+def points(cps, t):
+    """Points of the curve at parameter values t: n x 2"""
+    return basis(t) @ cps
+
+
+def derivative(cps, t, n=1):
+    """n-th derivative (n = 1, 2) of the curve at parameter values t: n x 2"""
+    if n == 1:
+        return basis_d1(t) @ cps
+    if n == 2:
+        return basis_d2(t) @ cps
+    raise NotImplementedError(f'Bezier::ERROR::Derivatives of order {n} are not supported')
+
+
+def unit_tangent(cps, t):
+    """Unit tangent vectors at t: n x 2"""
+    d1 = derivative(cps, t)
+    return d1 / np.linalg.norm(d1, axis=-1, keepdims=True)
+
+
+def curvature(cps, t):
+    """Unsigned curvature at parameter values t: n"""
+    d1, d2 = derivative(cps, t), derivative(cps, t, n=2)
+    cross = d1[:, 0] * d2[:, 1] - d1[:, 1] * d2[:, 0]
+    return np.abs(cross) / np.linalg.norm(d1, axis=-1)**3
+
+
+def length(cps, segments=LENGTH_SEGMENTS, nodes=LENGTH_NODES):
+    """Curve length (composite Gauss-Legendre quadrature of the speed |B'(t)|)"""
+    t, weights = _quadrature(segments, nodes)
+    return weights @ np.linalg.norm(derivative(cps, t), axis=-1)
+
+
+# ---- Gradients w.r.t. control points ----
+def length_grad(cps, segments=LENGTH_SEGMENTS, nodes=LENGTH_NODES):
+    """Curve length and its gradient w.r.t. the control points (4 x 2)"""
+    t, weights = _quadrature(segments, nodes)
+    b1 = basis_d1(t)
+    d1 = b1 @ cps
+    speed = np.linalg.norm(d1, axis=-1)
+    return weights @ speed, b1.T @ (weights[:, None] * d1 / speed[:, None])
+
+
+def unit_tangent_grad(cps, t, target):
+    """Squared distance between the unit tangent at (scalar) t and the target unit vector,
+        and its gradient w.r.t. the control points (4 x 2)
+    """
+    b1 = basis_d1(t)[0]
+    d1 = b1 @ cps
+    speed = np.linalg.norm(d1)
+    tangent = d1 / speed
+    diff = tangent - target
+    # d tangent / d d1 = (I - tangent tangent^T) / speed
+    grad_d1 = 2 * (diff - tangent * (tangent @ diff)) / speed
+    return diff @ diff, np.outer(b1, grad_d1)
+
+
+def curvature_sq_grad(cps, t):
+    """Squared curvature at (scalar) t and its gradient w.r.t. the control points (4 x 2)"""
+    b1, b2 = basis_d1(t)[0], basis_d2(t)[0]
+    d1, d2 = b1 @ cps, b2 @ cps
+    cross = d1[0] * d2[1] - d1[1] * d2[0]
+    speed_sq = d1 @ d1
+    k_sq = cross**2 / speed_sq**3
+
+    grad_d1 = 2 * cross / speed_sq**3 * np.array([d2[1], -d2[0]]) - 6 * k_sq / speed_sq * d1
+    grad_d2 = 2 * cross / speed_sq**3 * np.array([-d1[1], d1[0]])
+    return k_sq, np.outer(b1, grad_d1) + np.outer(b2, grad_d2)
@@ -0,0 +1,351 @@
+"""Memoization of garment component construction
+
+    Garment programs construct the same sub-components (sleeves, collars, waistbands, etc.)
+    over and over, e.g. when the same design is re-built in the GUI after a change in another
+    part of the garment, or for repeating designs in data generation.
+    Every component only reads a small subset of body and design parameters,
+    so it is enough to compare this subset to re-use the earlier result.
+
+    Classes decorated with @memoize_component record the body and design parameters
+    their constructor reads. When the component cache is enabled, a component of the same class
+    with the same other arguments and the same values of the recorded parameters
+    is cloned from the cache instead of being constructed again
+"""
+
+from collections import OrderedDict
+from collections.abc import Mapping, MutableMapping
+from copy import deepcopy
+import functools
+
+from pygarment.garmentcode.params import BodyParametrizationBase
+
+_HASHABLE_ARGS = (str, int, float, bool, type(None))
+
+
+class _ReadLog:
+    """Parameters read during a component construction: (source, path, kind) -> value"""
+    def __init__(self):
+        self.reads = OrderedDict()
+        self.active = True
+        self.mutated = False
+        self.capturing = False
+        self.refs = {}   # id(marker) -> (marker, source, path) of the inputs stored by the component
+
+    def record(self, source, path, kind, value):
+        if self.active:
+            self.reads.setdefault((source, path, kind), deepcopy(value))
+
+    def ref(self, source, path):
+        """Marker replacing the input object in the cached component state"""
+        marker = _InputRef()
+        self.refs[id(marker)] = (marker, source, path)
+        return marker
+
+
+class _InputRef:
+    """Placeholder of the (part of the) input body or design in the cached state"""
+    pass
+
+
+class _DesignReader(MutableMapping):
+    """Design parameters (sub-)dictionary recording the values read through it
+
+        Copies of the design (deepcopy() in the garment programs) keep recording the reads,
+        except for the values assigned to the copy (local)
+    """
+    def __init__(self, data, log: _ReadLog, source, path=(), local=None):
+        self._data = data
+        self._log = log
+        self._source = source
+        self._path = path
+        self._local = local   # Paths assigned in the copy. None for the input itself
+
+    def __getitem__(self, key):
+        try:
+            value = self._data[key]
+        except KeyError:
+            self._record((key, ), 'in', False)
+            raise
+        if isinstance(value, Mapping):
+            return _DesignReader(value, self._log, self._source, self._path + (key, ), self._local)
+        self._record((key, ), 'item', value)
+        return value
+
+    def __contains__(self, key):
+        found = key in self._data
+        self._record((key, ), 'in', found)
+        return found
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def __iter__(self):
+        keys = tuple(self._data)
+        self._record((), 'keys', keys)
+        return iter(keys)
+
+    def __len__(self):
+        return len(tuple(iter(self)))
+
+    def __setitem__(self, key, value):
+        self._assign(key)
+        self._data[key] = value
+
+    def __delitem__(self, key):
+        self._assign(key)
+        del self._data[key]
+
+    def __deepcopy__(self, memo):
+        if self._log.capturing:
+            if self._local is None:
+                return self._log.ref(self._source, self._path)
+            return deepcopy(self._data, memo)
+        local = set() if self._local is None else set(self._local)
+        return _DesignReader(deepcopy(self._data, memo), self._log, self._source, self._path, local)
+
+    def _record(self, subpath, kind, value):
+        path = self._path + subpath
+        if self._local and any(path[:i] in self._local for i in range(len(path) + 1)):
+            # Value assigned by the program itself -- not a dependency. 
+            # If only the value itself was re-assigned, the read is replayed on the input 
+            # for the usage trackers (DesignUsageTracker)
+            if kind == 'item' and not any(path[:i] in self._local for i in range(len(path))):
+                self._log.record(self._source, path, 'touch', None)
+            return
+        self._log.record(self._source, path, kind, value)
+
+    def _assign(self, key):
+        if self._local is None:
+            self._log.mutated = True
+        else:
+            self._local.add(self._path + (key, ))
+
+
+class _BodyReader:
+    """Body parameters recording the measurements read through it"""
+    def __init__(self, body, log: _ReadLog, source):
+        self._body = body
+        self._log = log
+        self._source = source
+
+    def __getitem__(self, key):
+        try:
+            value = self._body[key]
+        except KeyError:
+            self._log.record(self._source, (key, ), 'in', False)
+            raise
+        self._log.record(self._source, (key, ), 'item', value)
+        return value
+
+    def __setitem__(self, key, value):
+        self._log.mutated = True
+        self._body[key] = value
+
+    def __iter__(self):
+        keys = tuple(self._body)
+        self._log.record(self._source, (), 'keys', keys)
+        return iter(keys)
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        # Any other access (e.g. body.params) -- all the measurements are a dependency
+        self._log.record(self._source, (), 'all', _body_values(self._body))
+        return getattr(self._body, name)
+
+    def __deepcopy__(self, memo):
+        if self._log.capturing:
+            return self._log.ref(self._source, ())
+        self._log.record(self._source, (), 'all', _body_values(self._body))
+        return deepcopy(self._body, memo)
+
+
+def _body_values(body):
+    return {key: body[key] for key in body}
+
+
+def _read(obj, path, kind):
+    """Read the value recorded in _ReadLog from the body or design object"""
+    if isinstance(obj, (BodyParametrizationBase, _BodyReader)):
+        if kind == 'all':
+            return _body_values(obj)
+        if kind == 'keys':
+            return tuple(obj)
+        if kind == 'in':
+            return path[0] in tuple(obj)
+        return obj[path[0]]
+
+    if kind == 'in':
+        path, key = path[:-1], path[-1]
+    for step in path:
+        obj = obj[step]
+    if kind == 'in':
+        return key in obj
+    if kind == 'keys':
+        return tuple(obj)
+    return obj
+
+
+def _input(args, kwargs, source, path):
+    """(Part of) the input object the component was constructed with"""
+    obj = args[source] if isinstance(source, int) else kwargs[source]
+    for step in path:
+        obj = obj[step]
+    return obj
+
+
+class _Root:
+    """Placeholder of the component itself in the cached state"""
+    pass
+
+
+class ComponentCache:
+    """Cache of the constructed components
+
+        * max_entries -- maximum number of cached components (least recently used are removed)
+        * max_variants -- maximum number of cached components per class and arguments
+    """
+    def __init__(self, max_entries=256, max_variants=16):
+        self.enabled = False
+        self.max_entries = max_entries
+        self.max_variants = max_variants
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()   # (class, args) -> [(reads, state, input refs)]
+        self._size = 0
+
+    def enable(self, max_entries=None):
+        self.enabled = True
+        if max_entries is not None:
+            self.max_entries = max_entries
+
+    def disable(self):
+        self.enabled = False
+
+    def clear(self):
+        self._entries = OrderedDict()
+        self._size = 0
+        self.hits, self.misses = 0, 0
+
+    def stats(self):
+        return dict(hits=self.hits, misses=self.misses, entries=self._size)
+
+    def construct(self, component, init, args, kwargs):
+        """Initialize the component from the cache or with init(component, *args, **kwargs)"""
+        key = self._key(type(component), args, kwargs)
+        if key is None:   # Arguments cannot be compared
+            init(component, *args, **kwargs)
+            return
+
+        # Lookup
+        for entry in self._entries.get(key, []):
+            if self._matches(entry[0], args, kwargs):
+                self._entries.move_to_end(key)
+                self._restore(component, entry, args, kwargs)
+                self.hits += 1
+                return
+
+        # Construct with recording of the parameters reads
+        log = _ReadLog()
+        tracked_args = [self._track(arg, log, i) for i, arg in enumerate(args)]
+        tracked_kwargs = {name: self._track(arg, log, name) for name, arg in kwargs.items()}
+        try:
+            init(component, *tracked_args, **tracked_kwargs)
+        finally:
+            log.active = False
+        self.misses += 1
+
+        if log.mutated:   # Construction has side effects on the inputs -- cannot be skipped
+            return
+
+        # NOTE: References to the inputs are kept as references (and not tracked) in the cached state
+        log.capturing = True
+        try:
+            state = deepcopy(component.__dict__, {id(component): _Root})
+        finally:
+            log.capturing = False
+        entry = (list(log.reads.items()), state, list(log.refs.values()))
+        self._store(key, entry)
+
+        # Same state as restored from the cache
+        self._restore(component, entry, args, kwargs)
+
+    # ---- Private utils ----
+    def _key(self, cls, args, kwargs):
+        key_args = []
+        for arg in list(args) + [kwargs[name] for name in sorted(kwargs)]:
+            if _is_source(arg):
+                key_args.append('<input>')
+            elif isinstance(arg, _HASHABLE_ARGS) or _is_numpy_scalar(arg):
+                key_args.append(arg)
+            else:
+                return None
+        return (cls, tuple(key_args), tuple(sorted(kwargs)))
+
+    def _track(self, arg, log, source):
+        if isinstance(arg, (BodyParametrizationBase, _BodyReader)):
+            return _BodyReader(arg, log, source)
+        if isinstance(arg, Mapping):
+            return _DesignReader(arg, log, source)
+        return arg
+
+    def _matches(self, reads, args, kwargs):
+        for (source, path, kind), value in reads:
+            obj = args[source] if isinstance(source, int) else kwargs[source]
+            try:
+                if _read(obj, path, kind) != value and kind != 'touch':
+                    return False
+            except (KeyError, IndexError, TypeError, ValueError):
+                if kind != 'touch':
+                    return False
+        return True
+
+    def _restore(self, component, entry, args, kwargs):
+        _, state, refs = entry
+        memo = {id(_Root): component}
+        for marker, source, path in refs:
+            memo[id(marker)] = _input(args, kwargs, source, path)
+        component.__dict__.update(deepcopy(state, memo))
+
+    def _store(self, key, entry):
+        variants = self._entries.setdefault(key, [])
+        variants.insert(0, entry)
+        self._size += 1
+        if len(variants) > self.max_variants:
+            variants.pop()
+            self._size -= 1
+        self._entries.move_to_end(key)
+
+        while self._size > self.max_entries and self._entries:
+            _, removed = self._entries.popitem(last=False)
+            self._size -= len(removed)
+
+
+def _is_source(arg):
+    return isinstance(arg, (BodyParametrizationBase, _BodyReader, Mapping))
+
+
+def _is_numpy_scalar(arg):
+    return type(arg).__module__ == 'numpy' and hasattr(arg, 'dtype') and arg.shape == ()
+
+
+# Shared cache of the garment components
+component_cache = ComponentCache()
+
+
+def memoize_component(cls):
+    """Class decorator: construct the component through the component cache when it is enabled.
+
+        NOTE: Subclasses are only memoized if decorated themselves
+    """
+    init = cls.__init__
+
+    @functools.wraps(init)
+    def __init__(self, *args, **kwargs):
+        if type(self) is not cls or not component_cache.enabled:
+            init(self, *args, **kwargs)
+            return
+        component_cache.construct(self, init, args, kwargs)
+
+    cls.__init__ = __init__
+    return cls
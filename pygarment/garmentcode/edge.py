@@ -57,6 +57,28 @@ class Edge:
         """Length of the edge ignoring the curvature"""
         return norm(np.asarray(self.end) - np.asarray(self.start))
 
+    # Geometry cache
+    def _geometry_stamp(self):
+        """Current values of the parameters defining the edge geometry
+
+            NOTE: vertex objects are shared between edges and may be updated in place
+            by any of them (or externally), hence the cached geometry is validated
+            against the stamp on every access
+        """
+        return (self.start[0], self.start[1], self.end[0], self.end[1])
+
+    def _cached(self, key, evaluate):
+        """Value of the geometric property (key) of the edge.
+            evaluate() is only called when the edge geometry changed since the last evaluation
+        """
+        stamp = self._geometry_stamp()
+        cache = getattr(self, '_geometry_cache', None)
+        if cache is None or cache[0] != stamp:
+            cache = self._geometry_cache = (stamp, {})
+        if key not in cache[1]:
+            cache[1][key] = evaluate()
+        return cache[1][key]
+
     def __eq__(self, __o: object, tol=1e-2) -> bool:
         """Special implementation of comparison: same edges == edges can be
         connected by flat stitch
@@ -290,7 +312,8 @@ class CircleEdge(Edge):
             Since vertices may change their locations externally, the length
             is dynamically evaluated
         """
-        return self._rel_radius() * self._straight_len() * self._arc_angle()
+        return self._cached(
+            'length', lambda: self._rel_radius() * self._straight_len() * self._arc_angle())
 
     def __str__(self) -> str:
 
@@ -355,10 +378,17 @@ class CircleEdge(Edge):
 
         return subedges
 
+    def _geometry_stamp(self):
+        return super()._geometry_stamp() + (self.control_y, )
+
     # Special tools for circle representation
     def as_curve(self):
-        """Represent as svgpath Arc"""
+        """Represent as svgpath Arc
+            NOTE: the curve object is shared between the calls until the edge changes
+        """
+        return self._cached('curve', self._eval_curve)
 
+    def _eval_curve(self):
         radius, la, sweep = self.as_radius_flag()
 
         return svgpath.Arc(
@@ -388,14 +418,18 @@ class CircleEdge(Edge):
            NOTE: n_verts_inside = number of vertices (excluding the start
             and end vertices) used to create a linearization of the edge
         """
+        edge_verts = self._cached(
+            ('linearize', n_verts_inside), lambda: self._eval_linearization(n_verts_inside))
+        seq = self.to_edge_sequence([copy(v) for v in edge_verts])
+
+        return seq
+
+    def _eval_linearization(self, n_verts_inside):
         n = n_verts_inside + 1
         tvals = np.linspace(0, 1, n, endpoint=False)[1:]
 
         curve = self.as_curve()
-        edge_verts = [c_to_list(curve.point(t)) for t in tvals]
-        seq = self.to_edge_sequence(edge_verts)
-
-        return seq
+        return [c_to_list(curve.point(t)) for t in tvals]
 
     # NOTE: The following values are calculated at runtime to allow 
     # changes to control point after the edge definition
@@ -493,9 +527,7 @@ class CurveEdge(Edge):
 
     def length(self):
         """Length of Bezier curve edge"""
-        curve = self.as_curve()
-        
-        return curve.length()
+        return self._cached('length', lambda: self.as_curve().length())
 
     def __str__(self) -> str:
 
@@ -510,7 +542,7 @@ class CurveEdge(Edge):
         """Center of the edge"""
         curve = self.as_curve()
 
-        t_mid = curve.ilength(curve.length()/2, s_tol=ILENGTH_S_TOL)
+        t_mid = curve.ilength(self.length()/2, s_tol=ILENGTH_S_TOL)
         return c_to_list(curve.point(t_mid))
     
     def _subdivide(self, fractions: list, by_length=False):
@@ -523,7 +555,7 @@ class CurveEdge(Edge):
 
         # Sub-curves
         covered_fr, prev_t = 0, 0
-        clen = curve.length()
+        clen = self.length()
         subcurves = []
         for fr in fractions:
             covered_fr += fr
@@ -568,12 +600,19 @@ class CurveEdge(Edge):
 
         return self
     
+    def _geometry_stamp(self):
+        return super()._geometry_stamp() + tuple(c for p in self.control_points for c in p)
+
     def as_curve(self, absolute=True):
         """As svgpath curve object
 
             Converting on the fly as exact vertex location might have been updated since
             the creation of the edge
+            NOTE: the curve object is shared between the calls until the edge changes
         """
+        return self._cached(('curve', absolute), lambda: self._eval_curve(absolute))
+
+    def _eval_curve(self, absolute):
         # Get the nodes correcly
         if absolute:
             cp = [rel_to_abs_2d(self.start, self.end, c) for c in self.control_points]
@@ -592,6 +631,13 @@ class CurveEdge(Edge):
            and end vertices) used to create a linearization of the edge
 
         """        
+        edge_verts = self._cached(
+            ('linearize', n_verts_inside), lambda: self._eval_linearization(n_verts_inside))
+        seq = self.to_edge_sequence([copy(v) for v in edge_verts])
+
+        return seq
+
+    def _eval_linearization(self, n_verts_inside):
         n = n_verts_inside + 1
         tvals_init = np.linspace(0, 1, n, endpoint=False)[1:]
 
@@ -599,10 +645,7 @@ class CurveEdge(Edge):
         curve_lengths = tvals_init * curve.length()
         tvals = [curve.ilength(c_len, s_tol=ILENGTH_S_TOL) for c_len in curve_lengths]
 
-        edge_verts = [rel_to_abs_2d(self.start, self.end, c_to_list(curve.point(t))) for t in tvals]
-        seq = self.to_edge_sequence(edge_verts)
-
-        return seq
+        return [rel_to_abs_2d(self.start, self.end, c_to_list(curve.point(t))) for t in tvals]
 
     def _extreme_points(self):
         """Return extreme points (on Y) of the current edge
@@ -703,9 +746,10 @@ class EdgeSequence:
         """Fractions of the lengths of each edge in sequence w.r.t. 
             the whole sequence
         """
-        total_len = sum([e.length() for e in self.edges])
+        lengths = self.lengths()
+        total_len = sum(lengths)
 
-        return [e.length() / total_len for e in self.edges]
+        return [l / total_len for l in lengths]
 
     def lengths(self) -> list:
         """Lengths of individual edges in the sequence"""
@@ -200,20 +200,9 @@ class CurveEdgeFactory:
             target_tan1 = abs_to_rel_2d(start, end, target_tan1, as_vector=True)
             target_tan1 /= norm(target_tan1)
         
-        # Initialization with a target point as control point
-        # Ensures very smooth, minimal solution
-        out = minimize(
-            _fit_tangents, 
-            [0.5, 0] if initial_guess is None else initial_guess,
-            args=(target_tan0, target_tan1)
-        )
-
-        if not out.success:
-            print('CurveEdgeFactory::Curve From Tangents::WARNING::Optimization not successful')
-            if verbose:
-                print(out)
-
-        cp = out.x.tolist()
+        cp = _solve_tangents(target_tan0, target_tan1)
+        if cp is None:  # Single tangent or degenerate case
+            cp = _optimize_tangents(target_tan0, target_tan1, initial_guess, verbose=verbose)
 
         return CurveEdge(start, end, control_points=[cp], relative=True)
 
@@ -382,6 +371,51 @@ class EdgeSeqFactory:
         return left_seqs, right_seqs
 
 # --- For Curves ---
+# NOTE: Quadratic Bezier curves are fitted in coordinates relative to the edge:
+# [0, 0] -> cp -> [1, 0], s.t. B(t) = 2t(1-t) * cp + t^2 * [1, 0]
+
+def _solve_tangents(target_tangent_start, target_tangent_end):
+    """Closed-form control point of the [[0, 0] -> [1, 0]] Quadratic Bezier 
+        with both target (unit) tangents at the endpoints (relative coordinates):
+        the intersection of the tangent lines
+
+        Returns None in degenerate cases (e.g. parallel or diverging tangents)
+        NOTE: With a single target tangent, any control point on the tangent line fits 
+            -- the solution is defined by the optimization steps from the initial guess, 
+            so the optimization is used in this case
+    """
+    if target_tangent_start is None or target_tangent_end is None:
+        return None
+
+    # cp = s * tan0 = [1, 0] - u * tan1
+    tangents = np.array([target_tangent_start, target_tangent_end]).T
+    if abs(np.linalg.det(tangents)) < 1e-6:
+        return None
+    s, u = np.linalg.solve(tangents, [1, 0])
+    if s <= 0 or u <= 0:
+        return None
+    return (s * np.asarray(target_tangent_start)).tolist()
+
+
+def _optimize_tangents(target_tangent_start, target_tangent_end, initial_guess=None, verbose=False):
+    """Fit the control point to the target tangents with numerical optimization"""
+
+    # Initialization with a target point as control point
+    # Ensures very smooth, minimal solution
+    out = minimize(
+        _fit_tangents, 
+        [0.5, 0] if initial_guess is None else initial_guess,
+        args=(target_tangent_start, target_tangent_end)
+    )
+
+    if not out.success:
+        print('CurveEdgeFactory::Curve From Tangents::WARNING::Optimization not successful')
+        if verbose:
+            print(out)
+
+    return out.x.tolist()
+
+
 def _fit_pass_point(cp, target_location):
     """ Fit the control point of basic [[0, 0] -> [1, 0]] Quadratic Bezier s.t. 
         it passes through the target location.
@@ -439,7 +473,7 @@ def _fit_tangents(cp, target_tangent_start, target_tangent_end, reg_strength=0.0
         target1 = target_tangent_end[0] + 1j*target_tangent_end[1]
         fin += (abs(curve.unit_tangent(1) - target1))**2
 
-    # NOTE: Tried _max_curvature() and Y value regularizaton, 
+    # NOTE: Tried max curvature and Y value regularizaton, 
     # but it seems like they are not needed
     return fin
 
@@ -12,6 +12,7 @@ from pygarment.garmentcode.interface import Interface
 from pygarment.garmentcode.utils import vector_angle, close_enough, c_to_list, c_to_np
 from pygarment.garmentcode.utils import list_to_c
 from pygarment.garmentcode.base import BaseComponent
+from pygarment.garmentcode import bezier
 
 
 # ANCHOR ----- Edge Sequences Modifiers ----
@@ -478,22 +479,14 @@ def _avg_curvature(curve, points_estimates=100):
     return sum([curve.curvature(t) for t in t_space]) / points_estimates
 
 
-def _max_curvature(curve, points_estimates=100):
-    """Average curvature in a curve"""
-    # NOTE: this work slow, but direct evaluation seems
-    # infeasible
-    # Some hints here: https://math.stackexchange.com/questions/1954845/bezier-curvature-extrema
-    t_space = np.linspace(0, 1, points_estimates)
-    return max([curve.curvature(t) for t in t_space])
-
-
 def _bend_extend_2_tangent(
         shift, cp, target_len, direction, 
         target_tangent_start, target_tangent_end, 
         point_estimates=50):
-    """Evaluate how well curve preserves the length and tangents
+    """Evaluate how well curve preserves the length and tangents.
+        Returns the objective value and its gradient w.r.t. shift
 
-        NOTE: point_estimates controls average curvature evaluation.
+        NOTE: point_estimates controls max curvature evaluation.
             The higher the number, the more stable the optimization,
             but higher computational cost
     """
@@ -505,21 +498,29 @@ def _bend_extend_2_tangent(
         cp[-1] + direction * shift[4]
     ])
 
-    params = control[:, 0] + 1j*control[:, 1]
-    curve_inverse = svgpath.CubicBezier(*params)
-
-    length_diff = (curve_inverse.length() - target_len)**2  # preservation
+    length, length_grad = bezier.length_grad(control)
+    length_diff = (length - target_len)**2  # preservation
 
-    tan_0_diff = (abs(curve_inverse.unit_tangent(0) - target_tangent_start))**2
-    tan_1_diff = (abs(curve_inverse.unit_tangent(1) - target_tangent_end))**2
+    tan_0_diff, tan_0_grad = bezier.unit_tangent_grad(control, 0., target_tangent_start)
+    tan_1_diff, tan_1_grad = bezier.unit_tangent_grad(control, 1., target_tangent_end)
 
     # NOTE: tried regularizing based on Y value in relative coordinates (for speed), 
     # But it doesn't produce good results
-    curvature_reg = _max_curvature(curve_inverse, points_estimates=point_estimates)**2
+    t_space = np.linspace(0, 1, point_estimates)
+    t_max = t_space[np.argmax(bezier.curvature(control, t_space))]
+    curvature_reg, curvature_grad = bezier.curvature_sq_grad(control, t_max)
 
     end_expantion_reg = 0.001*shift[-1]**2 
 
-    return length_diff + tan_0_diff + tan_1_diff + curvature_reg + end_expantion_reg
+    # Gradient w.r.t. control points -> w.r.t. shift
+    cp_grad = 2 * (length - target_len) * length_grad + tan_0_grad + tan_1_grad + curvature_grad
+    grad = np.array([
+        cp_grad[1][0], cp_grad[1][1], 
+        cp_grad[2][0], cp_grad[2][1], 
+        cp_grad[3] @ direction + 0.002*shift[-1]
+    ])
+
+    return length_diff + tan_0_diff + tan_1_diff + curvature_reg + end_expantion_reg, grad
 
 
 def curve_match_tangents(curve, target_tan0, target_tan1, target_len=None,
@@ -553,13 +554,14 @@ def curve_match_tangents(curve, target_tan0, target_tan1, target_len=None,
         [0, 0, 0, 0, 0], 
         args=(
             curve_cps, 
-            curve.length() if target_len is None else target_len,
+            bezier.length(curve_cps) if target_len is None else target_len,
             direction,
-            list_to_c(target_tan0),  
-            list_to_c(target_tan1), 
+            np.asarray(target_tan0),  
+            np.asarray(target_tan1), 
             70   # NOTE: Low values cause instable resutls
         ),
         method='L-BFGS-B',
+        jac=True   # Analytic gradient
     )
     if not out.success:
         if verbose:
@@ -4,6 +4,7 @@ from argparse import Namespace
 from scipy.spatial.transform import Rotation as R
 
 from pygarment.pattern.core import BasicPattern
+from pygarment.pattern.intersections import self_intersections
 from pygarment.garmentcode.base import BaseComponent
 from pygarment.garmentcode.edge import Edge, EdgeSequence, CircleEdge
 from pygarment.garmentcode.utils import close_enough, vector_align_3D
@@ -67,23 +68,8 @@ class Panel(BaseComponent):
             else:
                 edge_curves.append(e.as_curve())
 
-        # NOTE: simple pairwise checks of edges
-        for i1 in range(0, len(edge_curves)):
-           for i2 in range(i1 + 1, len(edge_curves)):
-                intersect_t = edge_curves[i1].intersect(edge_curves[i2])
-                
-                # Check exceptions -- intersection at the vertex
-                for i in range(len(intersect_t)): 
-                    t1, t2 = intersect_t[i]
-                    if t2 < t1:
-                        t1, t2 = t2, t1
-                    if close_enough(t1, 0) and close_enough(t2, 1):
-                        intersect_t[i] = None
-                intersect_t = [el for el in intersect_t if el is not None]
-
-                if intersect_t:  # Any other case of intersections
-                    return True      
-        return False
+        # NOTE: only the edges with overlapping bounding boxes are checked
+        return bool(self_intersections(edge_curves, first_only=True))
 
     # ANCHOR - Operations -- update object in-place 
     def set_panel_label(self, label: str, overwrite=True): 
@@ -3,8 +3,13 @@
 import yaml
 from pathlib import Path
 from copy import deepcopy
+import hashlib
+import json
 import random 
 
+import numpy as np
+from scipy.stats import qmc
+
 from pygarment.garmentcode.utils import nested_get, nested_set, close_enough
 
 
@@ -150,4 +155,352 @@ class DesignSampler:
         if exclude is not None and close_enough(rand_v, exclude):
             return self.__uniform_exclude(range, exclude)  
         
-        return rand_v 
\ No newline at end of file
+        return rand_v 
+
+    def compile(self):
+        """Batch sampler of the current design parameters (see DesignBatchSampler)"""
+        return DesignBatchSampler(self.params)
+
+
+class DesignBatchSampler:
+    """Compiled design sampler drawing batches of designs at once
+
+        The parameter tree is flattened once into typed columns (float, int and discrete parameters), 
+        and N designs are drawn together with a NumPy random generator. 
+        Nested design dictionaries are only created for the requested samples (see DesignBatch).
+
+        Follows the sampling rules of DesignSampler.randomize(): 
+        default values are used with default_prob, otherwise the value is sampled from the range
+        excluding the default (if default_prob is given). 
+        The random stream is different, but the same seed gives the same designs
+    """
+    def __init__(self, params):
+        self.params = params
+        self.paths = []   # Paths to the parameters, in the column order
+        self.defaults = []
+        def_prob = []
+
+        # Columns by type: parameter indices and the sampling ranges
+        float_ids, float_ranges = [], []
+        int_ids, int_ranges = [], []
+        self.discrete_ids, self.options = [], []
+
+        for path, param in _flatten_params(params):
+            p_type, p_range = param['type'], param['range']
+            default, prob = param['v'], param.get('default_prob')
+            idx = len(self.paths)
+            self.paths.append(path)
+            self.defaults.append(default)
+            def_prob.append(np.nan if prob is None else prob)
+
+            if 'select' in p_type or p_type == 'bool' or 'file' in p_type:  # All discrete types
+                options = list(p_range)
+                if p_type == 'select_null' and None not in options:
+                    options.append(None)
+                # Exclude default
+                if prob is not None and default in options:
+                    options.remove(default)
+                self.discrete_ids.append(idx)
+                self.options.append(options)
+            elif p_type == 'int':
+                int_ids.append(idx)
+                int_ranges.append(p_range)
+            elif p_type == 'float':
+                float_ids.append(idx)
+                float_ranges.append(p_range)
+            else:
+                raise ValueError(f'{self.__class__.__name__}::ERROR::Unknown parameter type {p_type} of {path}')
+
+        self.def_prob = np.array(def_prob, dtype=float)
+        self.float_ids, self.int_ids = np.array(float_ids, dtype=int), np.array(int_ids, dtype=int)
+        self.discrete_ids = np.array(self.discrete_ids, dtype=int)
+        self.float_ranges = np.array(float_ranges, dtype=float).reshape(-1, 2)
+        self.int_ranges = np.array(int_ranges, dtype=int).reshape(-1, 2)
+        self.n_options = np.array([len(o) for o in self.options], dtype=int)
+
+        # Columns of each parameter
+        self.columns = [None] * len(self.paths)
+        for kind, ids in [('float', self.float_ids), ('int', self.int_ids), ('discrete', self.discrete_ids)]:
+            for col, idx in enumerate(ids):
+                self.columns[idx] = (kind, col)
+
+    def __len__(self):
+        return len(self.paths)
+
+    def sample(self, n, rng=None):
+        """Draw n designs.
+            * rng -- numpy random generator or a seed
+        """
+        rng = np.random.default_rng(rng)
+        n_params = len(self.paths)
+
+        # NOTE: Parameters without default_prob never use the default
+        use_default = rng.random((n, n_params)) < np.nan_to_num(self.def_prob, nan=-1.)
+        exclude = ~np.isnan(self.def_prob)
+
+        floats = self._sample_excluding(
+            n, self.float_ids, exclude, 
+            lambda low, high, size: rng.uniform(low, high, size), 
+            self.float_ranges[:, 0], self.float_ranges[:, 1], tol=1e-4)
+        ints = self._sample_excluding(
+            n, self.int_ids, exclude, 
+            lambda low, high, size: rng.integers(low, high + 1, size), 
+            self.int_ranges[:, 0], self.int_ranges[:, 1], tol=0.5)
+        discrete = (rng.random((n, len(self.discrete_ids))) * self.n_options).astype(int)
+
+        return DesignBatch(self, use_default, floats, ints, discrete)
+
+    @property
+    def n_dims(self):
+        """Dimensions of the unit hypercube mapped to the design space (see sample_unit()):
+            one per parameter value and one per default_prob decision
+        """
+        return len(self.paths) + int((~np.isnan(self.def_prob)).sum())
+
+    def sample_unit(self, points, rng=None):
+        """Designs corresponding to the points of the unit hypercube [0, 1)^n_dims,
+            e.g. from a low-discrepancy sequence. 
+            
+            Value dimensions are mapped to the parameter ranges: uniformly for float and int parameters
+            and to equal intervals per option for discrete parameters, excluding the default values
+            if default_prob is given. Decision dimensions select the default values with default_prob.
+
+            * rng -- random generator or seed to re-draw float values that coincide with the excluded defaults
+        """
+        points = np.atleast_2d(points)
+        n_params = len(self.paths)
+        has_default = ~np.isnan(self.def_prob)
+
+        use_default = np.zeros((len(points), n_params), dtype=bool)
+        use_default[:, has_default] = points[:, n_params:] < self.def_prob[has_default]
+        values = points[:, :n_params]
+
+        low, high = self.float_ranges[:, 0], self.float_ranges[:, 1]
+        floats = low + values[:, self.float_ids] * (high - low)
+        if len(self.float_ids):
+            rng = np.random.default_rng(rng)
+            defaults = np.array([self.defaults[i] for i in self.float_ids], dtype=float)
+            excluded = has_default[self.float_ids] & (high > low)
+            redraw = excluded & (np.abs(floats - defaults) < 1e-4)
+            while redraw.any():
+                floats[redraw] = rng.uniform(
+                    np.broadcast_to(low, floats.shape)[redraw], 
+                    np.broadcast_to(high, floats.shape)[redraw])
+                redraw = excluded & (np.abs(floats - defaults) < 1e-4)
+
+        # Integers: equal intervals per value, skipping the excluded default
+        low, high = self.int_ranges[:, 0], self.int_ranges[:, 1]
+        defaults = np.array([self.defaults[i] for i in self.int_ids], dtype=int)
+        excluded = has_default[self.int_ids] & (high > low) & (defaults >= low) & (defaults <= high)
+        n_values = high - low + 1 - excluded
+        ints = low + np.minimum(values[:, self.int_ids] * n_values, n_values - 1).astype(int)
+        ints = ints + (excluded & (ints >= defaults))
+
+        discrete = np.minimum(
+            values[:, self.discrete_ids] * self.n_options, self.n_options - 1).astype(int)
+
+        return DesignBatch(self, use_default, floats, ints, discrete)
+
+    def _sample_excluding(self, n, ids, exclude, draw, low, high, tol):
+        """Sample columns of the given parameters uniformly in [low, high]
+            re-drawing the values close to the excluded defaults
+        """
+        values = draw(low, high, (n, len(ids)))
+        if not len(ids):
+            return values
+        defaults = np.array([self.defaults[i] for i in ids], dtype=float)
+        # NOTE: Ranges consisting of the default only cannot exclude it
+        excluded = exclude[ids] & (high > low)
+        low, high = np.broadcast_to(low, values.shape), np.broadcast_to(high, values.shape)
+
+        redraw = excluded & (np.abs(values - defaults) < tol)
+        while redraw.any():
+            values[redraw] = draw(low[redraw], high[redraw], int(redraw.sum()))
+            redraw = excluded & (np.abs(values - defaults) < tol)
+        return values
+
+
+class DesignBatch:
+    """Batch of designs drawn by DesignBatchSampler, stored as columns of values"""
+    def __init__(self, sampler: DesignBatchSampler, use_default, floats, ints, discrete):
+        self.sampler = sampler
+        self.use_default = use_default
+        self.floats = floats
+        self.ints = ints
+        self.discrete = discrete
+
+    def __len__(self):
+        return len(self.use_default)
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self.design(i)
+
+    def value(self, i, param_idx):
+        """Value of the parameter (index in sampler.paths) in design i"""
+        if self.use_default[i, param_idx]:
+            return self.sampler.defaults[param_idx]
+        kind, col = self.sampler.columns[param_idx]
+        if kind == 'float':
+            return float(self.floats[i, col])
+        if kind == 'int':
+            return int(self.ints[i, col])
+        return self.sampler.options[col][self.discrete[i, col]]
+
+    def values(self, path):
+        """Values of the parameter in all the designs of the batch"""
+        param_idx = self.sampler.paths.index(tuple(path))
+        return [self.value(i, param_idx) for i in range(len(self))]
+
+    def design(self, i):
+        """Design parameters dictionary of design i"""
+        design = _copy_params(self.sampler.params)
+        for param_idx, path in enumerate(self.sampler.paths):
+            node = design
+            for key in path:
+                node = node[key]
+            node['v'] = self.value(i, param_idx)
+        return design
+
+
+class DesignSequence:
+    """Low-discrepancy sequence of designs covering the design space more evenly 
+        than independent random samples
+
+        * sampler -- DesignBatchSampler of the design parameters
+        * method -- 'sobol' (scrambled Sobol' sequence) or 'lhs' (Latin hypercube of the given size)
+        * size -- number of designs in the sequence (required for 'lhs' and for the re-tries)
+        * seed -- random seed of the scrambling/permutations
+
+        Designs are accessed by index, s.t. the sequence can be shared between independent processes.
+        Continuous parameters are sampled from the sequence points directly, 
+        while discrete parameters (incl. meta component choices) are stratified over 
+        equal intervals of their dimensions (see DesignBatchSampler.sample_unit()).
+
+        Re-tries of the rejected designs continue the sequence: attempt k of design i 
+        takes the point i + k * size, i.e. re-tries of all the designs form the next blocks of 
+        the Sobol' sequence or new Latin hypercubes of the same size
+    """
+    def __init__(self, sampler: DesignBatchSampler, method='sobol', size=None, seed=None):
+        self.sampler = sampler
+        self.method = method
+        self.size = size
+        self.seed = seed
+
+        self._blocks = {}   # Latin hypercubes by the re-try block
+        self._engine, self._next = None, 0  # Sobol' engine and its position
+        if method == 'lhs':
+            if size is None:
+                raise ValueError(f'{self.__class__.__name__}::ERROR::Latin hypercube sampling requires the size')
+            self._blocks[0] = self._hypercube(np.random.default_rng(seed))
+        elif method != 'sobol':
+            raise ValueError(f'{self.__class__.__name__}::ERROR::Unknown sampling method {method}')
+
+    def point(self, i):
+        """Point i of the sequence in the unit hypercube"""
+        if self.method == 'lhs':
+            block = i // self.size
+            if block not in self._blocks:
+                self._blocks[block] = self._hypercube(np.random.default_rng([self.seed or 0, block]))
+            return self._blocks[block][i % self.size]
+
+        if self._engine is None or i < self._next:
+            self._engine = qmc.Sobol(self.sampler.n_dims, scramble=True, seed=np.random.default_rng(self.seed))
+            self._next = 0
+        if i > self._next:
+            self._engine.fast_forward(i - self._next)
+        self._next = i + 1
+        return self._engine.random(1)[0]
+
+    def index(self, i, attempt=0):
+        """Index of the sequence point used by the given attempt of design i"""
+        if not attempt:
+            return i
+        if self.size is None:
+            raise ValueError(f'{self.__class__.__name__}::ERROR::Re-tries of the sequence designs require the size')
+        return i + attempt * self.size
+
+    def design(self, i, attempt=0):
+        """Design i of the sequence (for the given attempt)"""
+        idx = self.index(i, attempt)
+        return self.sampler.sample_unit(self.point(idx), rng=[self.seed or 0, idx]).design(0)
+
+    def _hypercube(self, rng):
+        return qmc.LatinHypercube(self.sampler.n_dims, seed=rng).random(self.size)
+
+def _flatten_params(params, path=()):
+    """(path, parameter) pairs of the nested design parameters"""
+    for key, value in params.items():
+        if 'v' in value:
+            yield path + (key, ), value
+        else:
+            yield from _flatten_params(value, path + (key, ))
+
+
+def _copy_params(params):
+    """Copy of the nested dictionaries and lists of the design parameters 
+        (faster than deepcopy for plain data)
+    """
+    if isinstance(params, dict):
+        return {key: _copy_params(value) for key, value in params.items()}
+    if isinstance(params, list):
+        return [_copy_params(value) for value in params]
+    return params
+
+
+# ---- Design canonicalization ----
+class DesignUsageTracker(dict):
+    """Design parameters dictionary that records which parameter values ('v' fields)
+        are read by the garment program.
+
+        Parameters of the components that are not selected for the garment are never read,
+        so the recorded set defines the part of the design that determines the garment.
+        Copies (e.g. deepcopy() in the garment programs) record to the same set
+
+        * design -- (nested) design parameters dictionary
+        * used -- set of the paths (tuples of keys) to the parameters that were read
+    """
+    def __init__(self, design, used=None, path=()):
+        self.used = used if used is not None else set()
+        self.path = path
+        super().__init__({
+            key: DesignUsageTracker(value, self.used, path + (key, )) if isinstance(value, dict) else value
+            for key, value in design.items()
+        })
+
+    def __getitem__(self, key):
+        if key == 'v':
+            self.used.add(self.path)
+        return super().__getitem__(key)
+
+    def get(self, key, default=None):
+        return self[key] if key in self else default
+
+    def __deepcopy__(self, memo):
+        return DesignUsageTracker(deepcopy(self.to_dict(), memo), self.used, self.path)
+
+    def to_dict(self):
+        """Plain dictionary with the design values"""
+        return {key: value.to_dict() if isinstance(value, DesignUsageTracker) else value
+                for key, value in self.items()}
+
+
+def canonical_design(design, used):
+    """Design values of the parameters in the used set (see DesignUsageTracker). 
+        Designs that only differ in the unused parameters produce the same garment 
+        and have the same canonical design
+    """
+    canonical = {}
+    for path in sorted(used):
+        try:
+            value = nested_get(design, list(path) + ['v'])
+        except KeyError:   
+            # Parameter added to a copy of the design by the garment program
+            continue
+        nested_set(canonical, list(path), value)
+    return canonical
+
+
+def design_hash(design):
+    """Hash of the design values"""
+    return hashlib.sha1(json.dumps(design, sort_keys=True, default=str).encode()).hexdigest()
@@ -0,0 +1,212 @@
+"""Process-level cache of preprocessed body colliders for cloth simulation
+
+    Simulating a dataset re-uses the same body (or a small set of bodies) for
+    thousands of garments. The body loading, vertical shift evaluation,
+    optional Laplacian smoothing and construction of the collision mesh
+    only depend on the body file and the smoothing settings,
+    so they are performed once per process and re-used afterwards.
+
+    Preprocessed arrays can additionally be stored on disk as .npz files,
+    s.t. the cache survives restarts of the simulation script
+"""
+
+from collections import OrderedDict
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import igl
+import numpy as np
+
+import warp as wp
+from warp.sim.utils import implicit_laplacian_smoothing
+
+
+class SharedMesh(wp.sim.Mesh):
+    """Collision mesh that keeps the built Warp mesh (and its BVH)
+        between the simulation models using it
+
+        NOTE: Only safe to share when the mesh vertices are not updated
+        during simulation (e.g. body smoothing is disabled)
+    """
+    def finalize(self, device=None):
+        mesh = getattr(self, 'mesh', None)
+        if mesh is not None and mesh.device == wp.get_device(device):
+            return mesh.id
+        return super().finalize(device=device)
+
+
+class BodyData:
+    """Preprocessed body geometry shared between simulations on the same body"""
+    def __init__(self, vertices, faces, shift_y, smoothing_vertices=None):
+        self.vertices = vertices
+        self.faces = faces
+        self.shift_y = shift_y
+        # Sequence of smoothed versions of the body, the most smoothed is the last
+        self.smoothing_vertices = smoothing_vertices
+
+        self._collider_mesh = None
+
+    @property
+    def indices(self):
+        return self.faces.flatten()
+
+    def smoothing_list(self):
+        """Fresh list of smoothed body vertices to be consumed by the simulation"""
+        if self.smoothing_vertices is None:
+            return []
+        return [v.copy() for v in self.smoothing_vertices]
+
+    def collider_mesh(self):
+        """Collision mesh of the original (not smoothed) body,
+            built once per body and device
+        """
+        if self._collider_mesh is None:
+            self._collider_mesh = SharedMesh(self.vertices, self.indices)
+        return self._collider_mesh
+
+    def release(self):
+        """Drop the collision mesh s.t. its Warp mesh (and BVH) can be freed on the device"""
+        if self._collider_mesh is not None:
+            self._collider_mesh.mesh = None
+            self._collider_mesh = None
+
+    # ---- Serialization ----
+    def save(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        arrays = dict(vertices=self.vertices, faces=self.faces, shift_y=np.array(self.shift_y))
+        if self.smoothing_vertices is not None:
+            arrays['smoothing_vertices'] = np.stack(self.smoothing_vertices)
+
+        # Write to a temporary file first s.t. interrupted writes do not leave broken cache
+        tmp_path = path.with_suffix('.tmp.npz')
+        np.savez(tmp_path, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            smoothing = list(data['smoothing_vertices']) if 'smoothing_vertices' in data else None
+            return cls(
+                data['vertices'], data['faces'], float(data['shift_y']),
+                smoothing_vertices=smoothing
+            )
+
+    @classmethod
+    def from_obj(cls, path, scale=1.0, smoothing_step_size=None, smoothing_num_steps=0):
+        """Load body from obj and perform all the preprocessing"""
+        vertices, faces = igl.read_triangle_mesh(str(path))
+        vertices = vertices * scale
+
+        # Place body above the floor
+        shift_y = floor_shift(vertices)
+        if shift_y:
+            vertices[:, 1] = vertices[:, 1] + shift_y
+
+        smoothing = None
+        if smoothing_num_steps:
+            smoothing = implicit_laplacian_smoothing(
+                vertices, faces,
+                step_size=smoothing_step_size,
+                iters=smoothing_num_steps)
+
+        return cls(vertices, faces, shift_y, smoothing_vertices=smoothing)
+
+
+def floor_shift(vertices):
+    """Vertical shift that places the lowest vertex of the body on the floor (Y = 0),
+        if the body is below the floor
+    """
+    min_y = np.asarray(vertices)[:, 1].min()
+    return float(abs(min_y)) if min_y < 0 else 0.0
+
+
+# ---- Process-level cache ----
+MAX_BODIES = 4   # Default number of bodies kept in memory
+_bodies = OrderedDict()   # Least recently used first
+_segmentations = {}
+_file_hashes = {}
+
+
+def file_hash(path):
+    """Hash of the file contents. Re-evaluated only when the file changes"""
+    path = Path(path)
+    stat = path.stat()
+    stamp = (str(path.resolve()), stat.st_size, stat.st_mtime_ns)
+    if stamp not in _file_hashes:
+        hasher = hashlib.sha1()
+        with open(path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                hasher.update(chunk)
+        _file_hashes[stamp] = hasher.hexdigest()
+    return _file_hashes[stamp]
+
+
+def body_key(body_path, scale=1.0, smoothing_step_size=None, smoothing_num_steps=0):
+    """Unique identifier of the preprocessed body"""
+    settings = f'{scale}_{smoothing_step_size}_{smoothing_num_steps}'
+    return f'{file_hash(body_path)}_{hashlib.sha1(settings.encode()).hexdigest()[:12]}'
+
+
+def load_body(body_path, scale=1.0,
+              smoothing_step_size=None, smoothing_num_steps=0,
+              cache_path=None, max_bodies=MAX_BODIES) -> BodyData:
+    """Get preprocessed body from the process cache,
+        from the on-disk cache (if cache_path is given),
+        or load it from scratch
+
+        * max_bodies -- number of bodies kept in the process cache. 
+            The least recently used bodies are evicted and their collision meshes released
+    """
+    if not smoothing_num_steps:
+        smoothing_step_size = None
+    key = body_key(body_path, scale, smoothing_step_size, smoothing_num_steps)
+    if key in _bodies:
+        _bodies.move_to_end(key)
+        return _bodies[key]
+
+    body = None
+    cache_file = Path(cache_path) / f'{key}.npz' if cache_path else None
+    if cache_file is not None and cache_file.exists():
+        try:
+            body = BodyData.load(cache_file)
+        except BaseException as e:
+            print(f'BodyCache::WARNING::Failed to read cached body {cache_file}: {e}. Re-computing')
+
+    if body is None:
+        body = BodyData.from_obj(
+            body_path, scale,
+            smoothing_step_size=smoothing_step_size,
+            smoothing_num_steps=smoothing_num_steps)
+        if cache_file is not None:
+            body.save(cache_file)
+
+    _bodies[key] = body
+    while len(_bodies) > max(max_bodies, 1):
+        _, evicted = _bodies.popitem(last=False)
+        evicted.release()
+    return body
+
+
+def load_segmentation(path):
+    """Body segmentation dictionary, read once per process
+
+        NOTE: the returned object is shared, do not modify it
+    """
+    key = file_hash(path)
+    if key not in _segmentations:
+        with open(path, 'r') as f:
+            _segmentations[key] = json.load(f)
+    return _segmentations[key]
+
+
+def clear():
+    """Drop all the in-memory cached bodies"""
+    for body in _bodies.values():
+        body.release()
+    _bodies.clear()
+    _segmentations.clear()
+    _file_hashes.clear()
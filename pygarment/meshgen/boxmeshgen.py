@@ -583,8 +583,12 @@ class BoxMesh(wrappers.VisPattern):
         """
         Loads all relevant functions and prints their time consumptions
         """
-        if self.is_self_intersecting(): 
-            print(f'{self.__class__.__name__}::WARNING::{self.name}::Provided pattern has self-intersecting panels. Simulation might crash')
+        intersections = self.self_intersections()
+        if intersections:
+            edges = '; '.join(f'{panel}: ' + ', '.join(f'{e1}-{e2}' for e1, e2 in pairs)
+                              for panel, pairs in intersections.items())
+            print(f'{self.__class__.__name__}::WARNING::{self.name}::Provided pattern has self-intersecting panels '
+                  f'(intersecting edges {edges}). Simulation might crash')
 
         self.load_panels()
         self.gen_panel_meshes()
@@ -0,0 +1,177 @@
+"""Sharded storage of the simulated dataset
+
+    Instead of keeping a folder with a dozen small files for every garment,
+    the garment artifacts are appended to large tar shards (shard-00000.tar, ...)
+    and located through an index file with one JSON line per garment.
+    The shards are regular tar archives that can be unpacked with standard tools,
+    while ShardReader streams garments directly from them without unpacking
+"""
+
+import io
+import json
+from pathlib import Path
+import tarfile
+
+INDEX_FILE = 'shards_index.jsonl'
+
+
+def shard_file_name(shard_id):
+    return f'shard-{shard_id:05d}.tar'
+
+
+def read_index(path):
+    """Garment entries of the shards index.
+        If a garment was stored several times, the latest entry is used
+    """
+    entries = {}
+    path = Path(path)
+    if not path.exists():
+        return entries
+    with open(path, 'r') as f:
+        for line in f:
+            try:
+                entry = json.loads(line)
+            except json.JSONDecodeError:   # Partially written on crash
+                continue
+            entries[entry['name']] = entry
+    return entries
+
+
+def _terminate_last_line(path):
+    """Terminate the line partially written on crash s.t. it does not break the next entry"""
+    if not path.exists() or not path.stat().st_size:
+        return
+    with open(path, 'rb+') as f:
+        f.seek(-1, 2)
+        if f.read(1) != b'\n':
+            f.write(b'\n')
+
+
+class ShardWriter:
+    """Appends garment folders to tar shards of limited size
+
+        * root -- folder to store the shards and the index in
+        * shard_size_mb -- a new shard is started when the current one exceeds this size
+
+        NOTE: The index is written after the shard data, s.t. garments are either fully stored
+        or not stored at all if the process is interrupted
+    """
+    def __init__(self, root, shard_size_mb=1024):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_shard_size = shard_size_mb * 1024 ** 2
+        self.index_path = self.root / INDEX_FILE
+
+        _terminate_last_line(self.index_path)
+
+        # Continue after the last stored garment
+        self.shard_id, self.shard_end = 0, 0
+        for entry in read_index(self.index_path).values():
+            self.shard_id, self.shard_end = max((self.shard_id, self.shard_end), (entry['shard'], entry['end']))
+
+    def add(self, name, folder):
+        """Store all the files of the garment folder. 
+            Returns the list of the stored files relative to the folder
+        """
+        if self.shard_end >= self.max_shard_size:
+            self.shard_id, self.shard_end = self.shard_id + 1, 0
+
+        folder = Path(folder)
+        path = self.root / shard_file_name(self.shard_id)
+        files = {}
+        with open(path, 'r+b' if path.exists() else 'w+b') as f:
+            # Overwrite the end-of-archive marker and any data left by interrupted writes
+            f.seek(self.shard_end)
+            f.truncate()
+            with tarfile.open(fileobj=f, mode='w') as tar:
+                for file in sorted(folder.rglob('*')):
+                    if not file.is_file():
+                        continue
+                    rel_path = file.relative_to(folder).as_posix()
+                    info = tar.gettarinfo(str(file), arcname=f'{name}/{rel_path}')
+                    header_size = len(info.tobuf(tar.format, tar.encoding, tar.errors))
+                    files[rel_path] = [f.tell() + header_size, info.size]
+                    with open(file, 'rb') as file_obj:
+                        tar.addfile(info, file_obj)
+                end = f.tell()
+
+        entry = dict(name=name, shard=self.shard_id, end=end, files=files)
+        with open(self.index_path, 'a') as f:
+            f.write(json.dumps(entry) + '\n')
+        self.shard_end = end
+        return list(files.keys())
+
+
+class ShardReader:
+    """Random access and streaming of garment files stored in shards
+
+        * root -- folder with the shards and the index
+    """
+    def __init__(self, root):
+        self.root = Path(root)
+        self.entries = read_index(self.root / INDEX_FILE)
+        self._handles = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, name):
+        return name in self.entries
+
+    def names(self):
+        return list(self.entries.keys())
+
+    def files(self, name):
+        """Relative paths of the files of the garment"""
+        return list(self.entries[name]['files'].keys())
+
+    def read(self, name, file):
+        """Contents of the garment file as bytes"""
+        entry = self.entries[name]
+        offset, size = entry['files'][file]
+        handle = self._handle(entry['shard'])
+        handle.seek(offset)
+        return handle.read(size)
+
+    def open(self, name, file):
+        """File-like object with the contents of the garment file"""
+        return io.BytesIO(self.read(name, file))
+
+    def stream(self, names=None, files=None):
+        """Yield (name, {file: bytes}) for the requested garments (all by default)
+            in the storage order to minimize seeks.
+
+            * files -- optional filter: list of the file name suffixes to read (e.g. ['_sim.ply', '.png'])
+        """
+        names = self.names() if names is None else names
+        order = sorted(names, key=lambda n: (self.entries[n]['shard'], self.entries[n]['end']))
+        for name in order:
+            garment_files = self.files(name)
+            if files is not None:
+                garment_files = [f for f in garment_files if any(f.endswith(suffix) for suffix in files)]
+            yield name, {file: self.read(name, file) for file in garment_files}
+
+    def extract(self, name, path):
+        """Unpack the garment files to path/name folder"""
+        out_folder = Path(path) / name
+        for file in self.files(name):
+            out_file = out_folder / file
+            out_file.parent.mkdir(parents=True, exist_ok=True)
+            out_file.write_bytes(self.read(name, file))
+        return out_folder
+
+    def close(self):
+        for handle in self._handles.values():
+            handle.close()
+        self._handles = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def _handle(self, shard_id):
+        if shard_id not in self._handles:
+            self._handles[shard_id] = open(self.root / shard_file_name(shard_id), 'rb')
+        return self._handles[shard_id]
@@ -1,23 +1,38 @@
 """Routines to run cloth simulation"""
 
 # Basic
+from collections import deque
+import copy
+from datetime import timedelta
 import time
 import multiprocessing
 import platform
 import signal
 from pathlib import Path
+import shutil
+import zlib
 
 # BoxMeshGen
 import pygarment.meshgen.boxmeshgen as bmg
 from pygarment.meshgen.boxmeshgen import BoxMesh
-from pygarment.meshgen.sim_config import PathCofig
+from pygarment.meshgen.sim_config import PathCofig, SimConfig
 
 # Warp simulation
-from pygarment.meshgen.simulation import run_sim
+import warp as wp
+from pygarment.meshgen.simulation import run_sim, render_garment
+from pygarment.meshgen.garment import Cloth
+from pygarment.meshgen.worker_pool import WorkerPool
+from pygarment.meshgen.sim_journal import SimJournal
+from pygarment.meshgen.sim_result_cache import SimResultCache
+from pygarment.meshgen.dataset_shards import ShardWriter
+from pygarment.pattern.core import BasicPattern
+from pygarment.data_config import Properties
+from pygarment.data_manifest import DatasetManifest, SIM_MANIFEST_FILE
 
 
 def batch_sim(data_path, output_path, dataset_props,
-              run_default_body=False, num_samples=None, caching=False, force_restart=False):
+              run_default_body=False, num_samples=None, caching=False, force_restart=False,
+              num_workers=None, devices=None, stage_workers=None, queue_size=None, shard=None):
     """
         Performs pattern simulation for each example in the dataset
         given by dataset_props.
@@ -40,6 +55,16 @@ def batch_sim(data_path, output_path, dataset_props,
             * num_samples -- number of (unprocessed) samples from dataset to process with this run. If None, runs over all unprocessed samples
             * caching -- enables caching of every frame of simulation (disabled by default)
             * force_restart -- force restarting the batch processing even if resume conditions are met.
+            * num_workers -- if given, garments are simulated in parallel in the given number of isolated 
+                worker processes. Each garment gets a hard wall-clock budget (`max_garment_time` in sim config), 
+                and crashed or hung workers are replaced without stopping the batch 
+            * devices -- list of devices to distribute between (simulation) workers (e.g. ['cuda:0', 'cuda:1'])
+            * stage_workers -- if given, runs box mesh generation, simulation and rendering as pipelined stages
+                with separate pools of workers, e.g. dict(meshgen=4, sim=2, render=2). 
+                Takes precedence over num_workers
+            * queue_size -- max number of garments waiting between pipeline stages (default: 2 * simulation workers)
+            * shard -- (shard_id, num_shards): only simulate the part of the dataset assigned to the given shard, 
+                s.t. independent nodes can simulate disjoint parts of one dataset
 
     """
     # ----- Init -----
@@ -48,44 +73,186 @@ def batch_sim(data_path, output_path, dataset_props,
         print('Warning: dataset is frozen, processing is skipped')
         return True
 
-    resume = init_sim_props(dataset_props, batch_run=True, force_restart=force_restart)
     body_type = 'default_body' if run_default_body else 'random_body'
     data_props_file = output_path / f'dataset_properties_{body_type}.yaml'
-    pattern_names = _get_pattern_names(data_path)
+    journal = SimJournal(output_path / f'dataset_journal_{body_type}.jsonl')
+
+    # NOTE: Crashes are detected from the journal if available
+    resume = init_sim_props(
+        dataset_props, batch_run=True, force_restart=force_restart, detect_crash=not journal.exists())
+    shard_size = get_dict_default_value(dataset_props['sim']['config'], 'shard_size_mb', None)
+    progress = _BatchProgress(
+        dataset_props, data_props_file, journal,
+        compact_every=get_dict_default_value(dataset_props['sim']['config'], 'journal_compact_every', 50),
+        shards=ShardWriter(output_path / 'shards', shard_size) if shard_size else None,
+        output_path=output_path,
+        manifest=DatasetManifest(output_path, SIM_MANIFEST_FILE))
+    if resume:
+        progress.replay()
+    else:
+        journal.clear()
+        progress.compact()   # Record the start of processing
+    pattern_names = _get_pattern_names(data_path, shard)
+    to_simulate = _skip_duplicates(dataset_props, pattern_names, progress) if run_default_body else pattern_names
+
+    if stage_workers:
+        _batch_sim_pipelined(
+            to_simulate, data_path, output_path, dataset_props, progress,
+            resume=resume, 
+            run_default_body=run_default_body, 
+            num_samples=num_samples, 
+            caching=caching,
+            stage_workers=stage_workers, 
+            queue_size=queue_size,
+            devices=devices)
+        return _finalize_batch(data_path, dataset_props, pattern_names, progress)
+    if num_workers:
+        _batch_sim_parallel(
+            to_simulate, data_path, output_path, dataset_props, progress,
+            resume=resume, 
+            run_default_body=run_default_body, 
+            num_samples=num_samples, 
+            caching=caching,
+            num_workers=num_workers, 
+            devices=devices)
+        return _finalize_batch(data_path, dataset_props, pattern_names, progress)
 
     # Simulate every template
+    task_base = _task_base(dataset_props, data_path, output_path, run_default_body, caching)
     count = 0
-    for pattern_name in pattern_names:
-        # skip processed cases -- in case of resume. First condition needed to skip checking second one on False =)
-        if resume and pattern_name in dataset_props['sim']['stats']['processed']:
+    processed = dataset_props.stats_list_set('sim', 'processed').copy() if resume else set()
+    for pattern_name in to_simulate:
+        # skip processed cases -- in case of resume
+        if pattern_name in processed:
             print(f'Skipped as already processed {pattern_name}')
             continue
 
-        dataset_props['sim']['stats']['processed'].append(pattern_name)
-        _serialize_props_with_sim_stats(dataset_props,
-                                        data_props_file)  # save info of processed files before potential crash
-
-        try:
-            paths = PathCofig(
-                in_element_path=data_path / pattern_name,
-                out_path=output_path,
-                in_name=pattern_name,
-                body_name=dataset_props['body_default'],
-                samples_name=dataset_props['body_samples'],
-                default_body=run_default_body
-            )
-        except BaseException as e: 
-            # Not all files available
-            print("***Pattern loading failed (paths)***")
-            dataset_props.add_fail('sim', 'crashes', pattern_name)
-        else:
-            template_simulation(paths, dataset_props, caching=caching)
+        progress.start(pattern_name)  # save info of processed files before potential crash
+        progress.finish(pattern_name, _simulate_task(dict(task_base, pattern_name=pattern_name)))
 
         count += 1  # count actively processed cases
         if num_samples is not None and count >= num_samples:  # only process requested number of samples
             break
 
-    # Fin
+    return _finalize_batch(data_path, dataset_props, pattern_names, progress)
+
+
+def _skip_duplicates(dataset_props, pattern_names, progress):
+    """Record garments that duplicate other garments of the dataset on the default body 
+        (as detected by pattern_sampler.py) as processed without simulation. 
+        Returns the names of the rest of the garments
+    """
+    if not get_dict_default_value(dataset_props['sim']['config'], 'skip_duplicates', True):
+        return pattern_names
+    duplicates = dataset_props['generator']['stats'].get('duplicates', {}) if 'generator' in dataset_props else {}
+    if not duplicates:
+        return pattern_names
+
+    names = set(pattern_names)
+    processed = dataset_props.stats_list_set('sim', 'processed').copy()
+    to_simulate = []
+    for name in pattern_names:
+        if name in duplicates and duplicates[name] in names:
+            if name not in processed:
+                # NOTE: Separate section: sim stats only hold numerical values and lists of names
+                progress.finish(name, {'duplicates': {'duplicate_of': {name: duplicates[name]}}})
+        else:
+            to_simulate.append(name)
+    print(f'Skipped {len(pattern_names) - len(to_simulate)} duplicated designs')
+    return to_simulate
+
+
+class _BatchProgress:
+    """Records per-garment progress of batch processing in the append-only journal,
+        and periodically compacts it into the dataset properties file.
+
+        If shards writer is given, the output folders of finished garments are moved to the shards.
+        If manifest is given, the finished garments are indexed in it
+    """
+    def __init__(self, dataset_props, props_file, journal: SimJournal, compact_every=50,
+                 shards: ShardWriter = None, output_path=None, manifest: DatasetManifest = None):
+        self.dataset_props = dataset_props
+        self.props_file = props_file
+        self.journal = journal
+        self.compact_every = compact_every
+        self.shards = shards
+        self.output_path = output_path
+        self.manifest = manifest
+        self._since_compact = 0
+
+    def start(self, name):
+        self.journal.start(name)
+
+    def finish(self, name, garment_stats):
+        """Record garment processing results"""
+        _merge_garment_stats(self.dataset_props, garment_stats)
+        self.dataset_props.add_to_stats_list('sim', 'processed', name)
+
+        garment_folder = self.output_path / name if self.output_path is not None else None
+        sharded_files = None
+        if self.shards is not None and garment_folder.exists():
+            sharded_files = self.shards.add(name, garment_folder)
+        if self.manifest is not None:
+            self._add_to_manifest(name, garment_stats, garment_folder, sharded_files)
+        self.journal.finish(name, garment_stats)
+        if sharded_files is not None:
+            # NOTE: Removed only after the garment is recorded as finished
+            shutil.rmtree(garment_folder, ignore_errors=True)
+
+        self._since_compact += 1
+        if self._since_compact >= self.compact_every:
+            self.compact()
+
+    def _add_to_manifest(self, name, garment_stats, garment_folder, sharded_files=None):
+        """Index the garment outputs with its status (list of fails) and per-garment stats"""
+        fails, stats = [], {}
+        for section_stats in garment_stats.values():
+            for key, value in section_stats.items():
+                if key == 'fails':
+                    fails += [fail_type for fail_type, names in value.items() if name in names]
+                elif isinstance(value, dict) and name in value:
+                    stats[key] = value[name]
+        status = ','.join(fails) if fails else 'ok'
+
+        if sharded_files is not None:
+            self.manifest.add(name, status=status, files=sharded_files, stats=stats)
+        elif garment_folder is not None and garment_folder.exists():
+            self.manifest.add_folder(name, garment_folder, status=status, stats=stats)
+        else:
+            self.manifest.add(name, status=status, stats=stats)
+
+    def fail(self, name, fail_type):
+        self.finish(name, {'sim': {'fails': {fail_type: [name]}}})
+
+    def compact(self):
+        """Write the summary of the journal to dataset properties file"""
+        self.dataset_props['sim']['stats']['journal_compacted'] = len(self.journal)
+        _serialize_props_with_sim_stats(self.dataset_props, self.props_file)
+        self._since_compact = 0
+
+    def replay(self):
+        """Update dataset stats with journal events that were not compacted before the restart,
+            and detect crashes: garments that failed to finish after a restart
+        """
+        sim_stats = self.dataset_props['sim']['stats']
+        offset = sim_stats.get('journal_compacted', 0)
+        for record in self.journal.read(offset):
+            if record['event'] == 'finish':
+                _merge_garment_stats(self.dataset_props, record['stats'])
+                self.dataset_props.add_to_stats_list('sim', 'processed', record['name'])
+
+        for name, num_starts in self.journal.in_progress().items():
+            if num_starts > 1:
+                # Already restarted once -> crash
+                print(f'{name} failed to finish processing {num_starts} times. Recorded as crash')
+                self.fail(name, 'crashes')
+            # Otherwise, try processing again
+
+        self.compact()
+
+
+def _finalize_batch(data_path, dataset_props, pattern_names, progress: _BatchProgress):
+    """Check if the dataset processing is finished and log the stats"""
     print(f'\nFinished batch of {data_path}')  
     try:
         if len(dataset_props['sim']['stats']['processed']) >= len(pattern_names):
@@ -101,13 +268,306 @@ def batch_sim(data_path, output_path, dataset_props,
         pass
 
     # Logs
-    _serialize_props_with_sim_stats(dataset_props, data_props_file)
+    progress.compact()
 
     return process_finished
 
 
+def _batch_sim_parallel(pattern_names, data_path, output_path, dataset_props, progress: _BatchProgress,
+                        resume=False, run_default_body=False, num_samples=None, caching=False,
+                        num_workers=1, devices=None):
+    """Simulate patterns in a pool of isolated worker processes, 
+        recording the outcome of each garment as soon as it is available
+    """
+    processed = dataset_props.stats_list_set('sim', 'processed') if resume else set()
+    to_process = [name for name in pattern_names if name not in processed]
+    if num_samples is not None:
+        to_process = to_process[:num_samples]
+
+    sim_config = dataset_props['sim']['config']
+    time_budget = get_dict_default_value(sim_config, 'max_garment_time', None)
+    if time_budget is None:
+        time_budget = (get_dict_default_value(sim_config, 'max_meshgen_time', 20) 
+                       + 2 * get_dict_default_value(sim_config, 'max_sim_time', 1500))
+
+    task_base = _task_base(dataset_props, data_path, output_path, run_default_body, caching)
+    tasks = [(name, dict(task_base, pattern_name=name)) for name in to_process]
+
+    pool = WorkerPool(
+        _simulate_task, num_workers, 
+        time_budget=time_budget, 
+        devices=devices, 
+        initializer=_init_sim_worker)
+    # NOTE: Garments are journaled as started when sent to a worker, as in the pipelined processing
+    for pattern_name, status, result in pool.run(tasks, on_submit=progress.start):
+        if status == 'done':
+            progress.finish(pattern_name, result)
+        elif status == 'timeout':
+            print(f'\n***{pattern_name} exceeded time budget of {time_budget}s. Worker is replaced***')
+            _drop_checkpoint(output_path, pattern_name)
+            progress.fail(pattern_name, 'garment_timeout')
+        elif status == 'error':
+            # NOTE: The worker caught the exception and stays in the pool
+            print(f'\n***{pattern_name} failed with an exception: {result}***')
+            _drop_checkpoint(output_path, pattern_name)
+            progress.fail(pattern_name, 'crashes')
+        else:
+            print(f'\n***{pattern_name} crashed the worker ({status}). Worker is replaced***')
+            _drop_checkpoint(output_path, pattern_name)
+            progress.fail(pattern_name, 'crashes')
+
+    if pool.replaced_workers:
+        print(f'Replaced {pool.replaced_workers} simulation workers')
+
+
+def _batch_sim_pipelined(pattern_names, data_path, output_path, dataset_props, progress: _BatchProgress,
+                         resume=False, run_default_body=False, num_samples=None, caching=False,
+                         stage_workers=None, queue_size=None, devices=None):
+    """Process patterns in three pipelined stages -- box mesh generation, simulation, rendering -- 
+        each with its own pool of worker processes. 
+        
+        Stages are connected by queues bounded by queue_size: meshgen workers stop when enough box meshes 
+        are waiting for simulation, and simulation workers stop when enough garments are waiting for rendering 
+    """
+    sim_stats = dataset_props['sim']['stats']
+    processed = dataset_props.stats_list_set('sim', 'processed') if resume else set()
+    to_process = deque(name for name in pattern_names if name not in processed)
+    if num_samples is not None:
+        to_process = deque(list(to_process)[:num_samples])
+    if queue_size is None:
+        queue_size = 2 * stage_workers['sim']
+
+    sim_config = dataset_props['sim']['config']
+    meshgen_budget = 2 * get_dict_default_value(sim_config, 'max_meshgen_time', 20) 
+    sim_budget = get_dict_default_value(sim_config, 'max_garment_time', None) 
+    if sim_budget is None:
+        sim_budget = 2 * get_dict_default_value(sim_config, 'max_sim_time', 1500)
+
+    pools = {
+        'meshgen': WorkerPool(_meshgen_task, stage_workers['meshgen'], time_budget=meshgen_budget),
+        'sim': WorkerPool(_sim_task, stage_workers['sim'], time_budget=sim_budget, 
+                          devices=devices, initializer=_init_sim_worker),
+        'render': WorkerPool(_render_task, stage_workers['render']),
+    }
+    meshed, simulated = deque(), deque()   # (pattern_name, garment_name) waiting for the next stage
+    task_base = _task_base(dataset_props, data_path, output_path, run_default_body, caching)
+
+    stage_stats = {}   # stats of the garments collected from the stages finished so far
+
+    def finish(pattern_name, garment_stats=None):
+        stats = stage_stats.pop(pattern_name, [])
+        if garment_stats is not None:
+            stats.append(garment_stats)
+        progress.finish(pattern_name, _combine_garment_stats(stats))
+
+    start_time = time.time()
+    sim_starved_time = 0.   # Worker-seconds of idle sim workers while no box meshes were ready
+    for pool in pools.values():
+        pool.start()
+    try:
+        while (to_process or meshed or simulated 
+                or any(pool.busy_count() for pool in pools.values())):
+            # Dispatch with back-pressure
+            while (to_process and pools['meshgen'].idle_count() 
+                    and len(meshed) + pools['meshgen'].busy_count() < queue_size):
+                name = to_process.popleft()
+                progress.start(name)
+                pools['meshgen'].submit(name, dict(task_base, pattern_name=name))
+            while meshed and pools['sim'].idle_count() and len(simulated) < queue_size:
+                name, garment_name = meshed.popleft()
+                pools['sim'].submit(name, dict(task_base, pattern_name=name, garment_name=garment_name))
+            while simulated and pools['render'].idle_count():
+                name, garment_name = simulated.popleft()
+                pools['render'].submit(name, dict(
+                    task_base, pattern_name=name, garment_name=garment_name, 
+                    prev_stats=_combine_garment_stats(stage_stats[name])))
+
+            poll_start = time.time()
+            results = {stage: pool.poll(timeout=0.1) for stage, pool in pools.items()}
+            if not meshed:
+                sim_starved_time += pools['sim'].idle_count() * (time.time() - poll_start)
+
+            # Route the results to the next stages
+            for stage, stage_results in results.items():
+                for pattern_name, status, result in stage_results:
+                    if status != 'done':
+                        print(f'\n***{pattern_name} failed at {stage} stage ({status})***')
+                        fail_type = 'garment_timeout' if status == 'timeout' else 'crashes'
+                        _drop_checkpoint(output_path, pattern_name)
+                        finish(pattern_name, {'sim': {'fails': {fail_type: [pattern_name]}}})
+                        continue
+
+                    if stage == 'meshgen' and result['garment_name'] is not None:
+                        stage_stats[pattern_name] = [result['stats']]
+                        meshed.append((pattern_name, result['garment_name']))
+                    elif stage == 'sim':
+                        stage_stats[pattern_name].append(result['stats'])
+                        simulated.append((pattern_name, result['garment_name']))
+                    else:   # Failed meshgen or fully processed
+                        finish(pattern_name, result['stats'])
+    finally:
+        for pool in pools.values():
+            pool.close()
+
+    # Throughput stats
+    elapsed = time.time() - start_time
+    pipeline_stats = {'elapsed': str(timedelta(seconds=elapsed)), 'sim_starved_time': sim_starved_time}
+    for stage, pool in pools.items():
+        pipeline_stats[stage] = {
+            'workers': pool.num_workers,
+            'completed': pool.completed,
+            'failed': pool.failed,
+            'per_minute': pool.completed / elapsed * 60 if elapsed else 0.,
+            'utilization': pool.busy_time / (elapsed * pool.num_workers) if elapsed else 0.,
+            'replaced_workers': pool.replaced_workers,
+        }
+    sim_stats['pipeline'] = pipeline_stats
+    print(f'\nPipeline stats: {pipeline_stats}')
+
+
+def _task_base(dataset_props, data_path, output_path, run_default_body, caching):
+    """Common info for the worker tasks. Workers only need the configuration -- 
+        stats are collected per garment
+    """
+    config_props = Properties()
+    config_props.properties = copy.deepcopy(dataset_props.properties)
+    config_props.clean_stats(config_props.properties)
+
+    return dict(
+        data_path=data_path,
+        output_path=output_path,
+        props=config_props.properties,
+        run_default_body=run_default_body,
+        caching=caching)
+
+
+def _init_sim_worker(device):
+    if device is not None:
+        wp.set_device(device)
+
+
+def _task_props_paths(task):
+    """Fresh properties and paths of the garment for a worker task. 
+        Paths are None if the garment files are not available
+    """
+    pattern_name = task['pattern_name']
+    props = Properties()
+    props.properties = copy.deepcopy(task['props'])
+    init_sim_props(props)   # Fresh stats
+
+    try:
+        paths = PathCofig(
+            in_element_path=task['data_path'] / pattern_name,
+            out_path=task['output_path'],
+            in_name=pattern_name,
+            body_name=props['body_default'],
+            samples_name=props['body_samples'],
+            default_body=task['run_default_body']
+        )
+    except BaseException as e: 
+        # Not all files available
+        print("***Pattern loading failed (paths)***")
+        props.add_fail('sim', 'crashes', pattern_name)
+        paths = None
+
+    return props, paths
+
+
+def _garment_stats(props):
+    return {section: props[section]['stats'] for section in ['sim', 'render']}
+
+
+def _simulate_task(task):
+    """Simulate one pattern in the worker process. 
+        Returns the stats collected for this garment
+    """
+    props, paths = _task_props_paths(task)
+    if paths is not None:
+        template_simulation(paths, props, caching=task['caching'])
+
+    return _garment_stats(props)
+
+
+def _meshgen_task(task):
+    """Pipeline stage: box mesh generation"""
+    props, paths = _task_props_paths(task)
+    garment_name = None
+    if paths is not None and not _restore_cached_result(paths, props, caching=task['caching']):
+        garment_name = template_meshgen(paths, props)
+
+    # NOTE: garment_name is None for garments restored from cache or failed -- no further processing
+    return dict(garment_name=garment_name, stats=_garment_stats(props))
+
+
+def _sim_task(task):
+    """Pipeline stage: simulation"""
+    props, paths = _task_props_paths(task)
+    sim_config = props['sim']['config']
+    run_sim(
+        task['garment_name'], 
+        props, 
+        paths,
+        save_v_norms=get_dict_default_value(sim_config['options'], 'store_vertex_normals', False),
+        store_usd=task['caching'],
+        verbose=False,
+        render=False
+    )
+    return dict(garment_name=task['garment_name'], stats=_garment_stats(props))
+
+
+def _render_task(task):
+    """Pipeline stage: rendering and storage optimization"""
+    props, paths = _task_props_paths(task)
+    # NOTE: Same body settings as in simulation stage to re-use the preprocessed body
+    body = Cloth.load_body(paths, SimConfig(props['sim']['config']))
+    render_garment(
+        task['garment_name'], props, paths, 
+        body.vertices, body.faces, 
+        optimize_storage=props['sim']['config']['optimize_storage'])
+    stats = copy.deepcopy(_garment_stats(props))
+
+    # Cache the results with the stats of all the stages
+    _merge_garment_stats(props, task['prev_stats'])
+    _store_cached_result(paths, props, task['garment_name'], caching=task['caching'])
+
+    return dict(garment_name=task['garment_name'], stats=stats)
+
+
+def _merge_garment_stats(dataset_props, garment_stats):
+    """Add the stats of one garment to the dataset stats"""
+    for section, stats in garment_stats.items():
+        if section not in dataset_props:
+            dataset_props.set_section_stats(section)
+        for key, value in stats.items():
+            if key == 'fails':
+                for fail_type, names in value.items():
+                    for name in names:
+                        dataset_props.add_fail(section, fail_type, name)
+            elif isinstance(value, dict):
+                if key not in dataset_props[section]['stats']:
+                    dataset_props[section]['stats'][key] = {}
+                dataset_props[section]['stats'][key].update(value)
+
+
+def _combine_garment_stats(stats_list):
+    """Combine stats of one garment collected in different processing stages"""
+    combined = {}
+    for garment_stats in stats_list:
+        for section, stats in garment_stats.items():
+            section_stats = combined.setdefault(section, {})
+            for key, value in stats.items():
+                if key == 'fails':
+                    fails = section_stats.setdefault('fails', {})
+                    for fail_type, names in value.items():
+                        fails.setdefault(fail_type, []).extend(names)
+                elif isinstance(value, dict):
+                    section_stats.setdefault(key, {}).update(value)
+    return combined
+
+
 def resim_fails(data_path, output_path, dataset_props,
-              run_default_body=False, caching=False):
+              run_default_body=False, caching=False, 
+              num_workers=None, devices=None, stage_workers=None, shard=None):
     """Resimulate failure cases -- maybe some of them would get fixed"""
 
     print('************** RESIMULATING FAILS ****************')
@@ -128,12 +588,14 @@ def resim_fails(data_path, output_path, dataset_props,
         return dataset_props['frozen'] if 'frozen' in dataset_props else False
     
     if 'processed' not in sim_stats:
-        sim_stats['processed'] = _get_pattern_names(data_path)
+        sim_stats['processed'] = _get_pattern_names(data_path, shard)
     dataset_props['frozen'] = False
 
     # Remove fails from processed to trigger re-simulation
-    for sample in to_resim:
-        sim_stats['processed'].remove(sample)
+    dataset_props.remove_from_stats_list('sim', 'processed', to_resim)
+    # Re-simulate from scratch
+    for name in to_resim:
+        _drop_checkpoint(output_path, name)
 
     # Start simulation again
     finished = batch_sim(
@@ -141,16 +603,23 @@ def resim_fails(data_path, output_path, dataset_props,
         run_default_body=run_default_body, 
         num_samples=len(to_resim)+1, 
         caching=caching, 
-        force_restart=False
+        force_restart=False,
+        num_workers=num_workers,
+        devices=devices,
+        stage_workers=stage_workers,
+        shard=shard
     )
 
     return finished
 
 # ------- Utils -------
-def init_sim_props(props, batch_run=False, force_restart=False):
+def init_sim_props(props, batch_run=False, force_restart=False, detect_crash=True):
     """
         Add default config values if not given in props & clean-up stats if not resuming previous processing
         Returns a flag whether current simulation is a resumed last one
+
+        * detect_crash -- on resume, guess the crashed example from the last processed one. 
+            Only needed for datasets processed without the journal
     """
     if 'sim' not in props:
         props.set_section_config(
@@ -235,22 +704,27 @@ def init_sim_props(props, batch_run=False, force_restart=False):
 
     if batch_run and 'processed' in props['sim']['stats'] and not force_restart:
         # resuming existing batch processing -- do not clean stats
+        if not detect_crash or not props['sim']['stats']['processed']:
+            return True
+
         # Assuming the last example processed example caused the failure
         last_processed = props['sim']['stats']['processed'][-1]
 
-        if not any([(name in last_processed) or (last_processed in name) for name in
-                    props['render']['stats']['render_time']]):
+        # NOTE: Exact match is checked first to avoid scanning all the rendered names
+        render_time = props['render']['stats']['render_time']
+        if last_processed not in render_time and not any(
+                [(name in last_processed) or (last_processed in name) for name in render_time]):
             # crash detected -- the last example does not appear in the stats
-            if last_processed not in props['sim']['stats']['fails']['crashes']:
+            if not props.has_fail('sim', 'crashes', last_processed):
                 # add to simulation failures
                 # Remove last from processed if it did not crash
-                if last_processed not in props['sim']['stats']['stop_over']:   
-                    props['sim']['stats']['processed'].pop()
+                if not props.in_stats_list('sim', 'stop_over', last_processed):   
+                    props.pop_from_stats_list('sim', 'processed')
                 else:
                     # Already passed here once -> add as crash
-                    props['sim']['stats']['fails']['crashes'].append(last_processed)
+                    props.add_fail('sim', 'crashes', last_processed)
 
-        props['sim']['stats']['stop_over'].append(last_processed)  # indicate resuming dataset simulation
+        props.add_to_stats_list('sim', 'stop_over', last_processed)  # indicate resuming dataset simulation
 
 
         return True
@@ -291,6 +765,69 @@ def template_simulation(paths: PathCofig, props, caching=False):
         Simulate given template within given scene & save log files
     """
     sim_props = props['sim']
+    if _restore_cached_result(paths, props, caching=caching):
+        return
+
+    garment_name = template_meshgen(paths, props)
+    if garment_name is None:
+        return
+
+    run_sim(
+        garment_name,  
+        props, 
+        paths,
+        save_v_norms=get_dict_default_value(sim_props['config']['options'], 'store_vertex_normals', False),
+        store_usd=caching,  # NOTE: False for fast simulation!, 
+        optimize_storage=sim_props['config']['optimize_storage'],
+        verbose=False
+    )
+    _store_cached_result(paths, props, garment_name, caching=caching)
+
+
+def _result_cache(props, caching=False):
+    """Simulation result cache if enabled in the sim config options.
+        Not used with USD caching (debug mode) since the USD files are not cached
+    """
+    options = props['sim']['config']['options']
+    cache_path = get_dict_default_value(options, 'result_cache_path', None)
+    if cache_path is None or caching:
+        return None
+    return SimResultCache(
+        cache_path, max_size_gb=get_dict_default_value(options, 'result_cache_max_gb', None))
+
+
+def _restore_cached_result(paths: PathCofig, props, caching=False):
+    """Restore the results of the garment from the result cache if available"""
+    cache = _result_cache(props, caching)
+    if cache is None:
+        return False
+    garment_name = BasicPattern.name_from_path(paths.in_g_spec)
+    try:
+        restored = cache.restore(cache.key(paths, props), paths, props, garment_name)
+    except OSError as e:  # Missing input files
+        print(f'SimResultCache::WARNING::{garment_name}::Cache lookup failed: {e}')
+        return False
+    if restored:
+        print(f'\nRestored {garment_name} from result cache')
+    return restored
+
+
+def _store_cached_result(paths: PathCofig, props, garment_name, caching=False):
+    cache = _result_cache(props, caching)
+    if cache is None:
+        return
+    try:
+        cache.store(cache.key(paths, props), paths, props, garment_name)
+    except OSError as e:
+        print(f'SimResultCache::WARNING::{garment_name}::Failed to store the result: {e}')
+
+
+def template_meshgen(paths: PathCofig, props):
+    """
+        Generate and save the box mesh of the given template. 
+        Returns the garment name on success, None otherwise (the failure is recorded in props)
+    """
+    sim_props = props['sim']
     res = sim_props['config']['resolution_scale']
 
     garment = BoxMesh(paths.in_g_spec, res)
@@ -347,16 +884,9 @@ def template_simulation(paths: PathCofig, props, caching=False):
             store_panels=store_panels,
             uv_config=props['render']['config']['uv_texture']
         )
+        return garment.name
 
-        run_sim(
-            garment.name,  
-            props, 
-            paths,
-            save_v_norms=vertex_normals,
-            store_usd=caching,  # NOTE: False for fast simulation!, 
-            optimize_storage=sim_props['config']['optimize_storage'],
-            verbose=False
-        )
+    return None
 
 def _load_boxmesh_timeout(garment, timeout_after):
     if platform.system() == "Windows":
@@ -392,6 +922,13 @@ def _load_boxmesh_timeout(garment, timeout_after):
             signal.alarm(0)
 
 
+def _drop_checkpoint(output_path, pattern_name):
+    """Remove the simulation checkpoint of the garment (PathCofig.g_sim_checkpoint)
+        s.t. its next simulation starts from scratch
+    """
+    (Path(output_path) / pattern_name / f'{pattern_name}_sim_checkpoint.npz').unlink(missing_ok=True)
+
+
 def get_dict_default_value(props, name, default_value):
     if name in props:
         return props[name]
@@ -403,11 +940,24 @@ def _serialize_props_with_sim_stats(dataset_props, filename):
     dataset_props.serialize(filename)
 
 
-def _get_pattern_names(data_path: Path):
-    names = []
-    to_ignore = ['renders']  # special dirs not to include in the pattern list
-    for el in data_path.iterdir():
-        if el.is_dir() and el.stem not in to_ignore:
-            names.append(el.stem)
+def _get_pattern_names(data_path: Path, shard=None):
+    """Names of the patterns in the dataset, 
+        or only in the given shard=(shard_id, num_shards) of the dataset
+    """
+    # NOTE: Datasets sampled with the manifest are listed without traversing the data folder
+    manifest = DatasetManifest(data_path.parent)
+    if manifest.exists():
+        names = manifest.names(status='ok')
+    else:
+        names = []
+        to_ignore = ['renders']  # special dirs not to include in the pattern list
+        for el in data_path.iterdir():
+            if el.is_dir() and el.stem not in to_ignore:
+                names.append(el.stem)
+
+    if shard is not None:
+        # NOTE: Assignment only depends on the name -- stable across nodes and restarts
+        shard_id, num_shards = shard
+        names = [name for name in names if zlib.crc32(name.encode()) % num_shards == shard_id]
 
     return names
\ No newline at end of file
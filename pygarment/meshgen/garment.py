@@ -1,5 +1,8 @@
 import igl
 import json
+import os
+import time
+from pathlib import Path
 import pickle
 import numpy as np
 import yaml
@@ -7,16 +10,77 @@ import yaml
 import warp as wp
 
 import warp.sim.render
-from warp.sim.utils import implicit_laplacian_smoothing
 import warp.collision.panel_assignment as assign
 from warp.sim.collide import count_self_intersections, count_body_cloth_intersections
 from warp.sim.integrator_xpbd import replace_mesh_points
 
 # Custom
 from pygarment.meshgen.sim_config import PathCofig, SimConfig
+import pygarment.meshgen.body_cache as body_cache
+import pygarment.meshgen.sim_telemetry as sim_telemetry
 from pygarment.pattern.core import BasicPattern
 
+class VertexConnectivity:
+    """Vertex adjacency in CSR form: neighbours of vertex v are 
+        indices[indptr[v]:indptr[v + 1]], in the order of the faces they come from.
+        Neighbours shared by several faces are listed once per face. 
+        Every incident face adds two neighbours, so the faces incident to vertex v are 
+        face_ids[indptr[v] // 2:indptr[v + 1] // 2]
+
+        Supports indexing by vertex id as a list of neighbour lists
+    """
+    def __init__(self, indptr, indices, face_ids):
+        self.indptr = indptr
+        self.indices = indices
+        self.face_ids = face_ids
+
+    @classmethod
+    def from_faces(cls, num_vertices, faces):
+        faces = np.asarray(faces, dtype=np.int64)
+
+        # Both directions of every face edge
+        src = faces[:, [0, 0, 1, 1, 2, 2]].ravel()
+        dst = faces[:, [1, 2, 0, 2, 0, 1]].ravel()
+
+        # NOTE: Stable sort keeps the face order within the neighbours of each vertex,
+        # and the two neighbours from the same face next to each other
+        order = np.argsort(src, kind='stable')
+
+        indptr = np.zeros(num_vertices + 1, dtype=np.int64)
+        np.cumsum(np.bincount(src, minlength=num_vertices), out=indptr[1:])
+
+        return cls(indptr, dst[order], order[::2] // 6)
+
+    def __len__(self):
+        return len(self.indptr) - 1
+
+    def __getitem__(self, v):
+        return self.indices[self.indptr[v]:self.indptr[v + 1]].tolist()
+
+    def __iter__(self):
+        return (self[v] for v in range(len(self)))
+
+    def degrees(self):
+        return np.diff(self.indptr)
+
+    def face_average(self, face_values):
+        """Per-vertex average of the values given for every face over the faces incident to the vertex"""
+        face_values = np.asarray(face_values)
+        face_indptr = self.indptr // 2
+        counts = np.diff(face_indptr)
+        sums = np.zeros((len(self), *face_values.shape[1:]))
+        # NOTE: reduceat() needs non-empty segments
+        nonempty = counts > 0
+        if nonempty.any():
+            sums[nonempty] = np.add.reduceat(face_values[self.face_ids], face_indptr[:-1][nonempty])
+        with np.errstate(invalid='ignore', divide='ignore'):
+            return sums / counts.reshape(-1, *[1] * (face_values.ndim - 1))
+
+
 class Cloth:
+    c_scale = 1.0
+    b_scale = 100.0
+
     def __init__(self, 
                  name, config: SimConfig, paths: PathCofig, 
                  caching=False):
@@ -35,8 +99,6 @@ class Cloth:
         self.device = wp.get_device() if wp.get_device().is_cuda else 'cpu' 
         self.frame = -1
 
-        self.c_scale = 1.0
-        self.b_scale = 100.0
         self.body_path = paths.in_body_obj
         
         # collision resolution options
@@ -92,18 +154,35 @@ class Cloth:
         self.last_verts = None
         self.current_verts = wp.array.numpy(self.state_0.particle_q)
 
+        self.telemetry = sim_telemetry.SimTelemetry(len(self.current_verts)) if config.telemetry else None
+
+    @classmethod
+    def load_body(cls, paths: PathCofig, config: SimConfig):
+        """Preprocessed body with the smoothing settings of the simulation config
+            NOTE: Preprocessed body is shared between garments simulated on the same body
+            and with the processing stages that use the same config
+        """
+        smoothing_step_size, smoothing_num_steps = None, 0
+        if config.enable_body_smoothing:
+            smoothing_num_steps = config.smoothing_num_steps
+            smoothing_step_size = config.smoothing_total_smoothing_factor / smoothing_num_steps
+        return body_cache.load_body(
+            paths.in_body_obj, cls.b_scale, 
+            smoothing_step_size=smoothing_step_size, 
+            smoothing_num_steps=smoothing_num_steps,
+            cache_path=config.body_cache_path,
+            max_bodies=config.body_cache_size
+        )
+
     def build_stage(self, config):
 
         builder = wp.sim.ModelBuilder(gravity=0.0)
         # --------------- Load body info -----------------
-        body_vertices, body_indices, body_faces = self.load_obj(self.paths.in_body_obj)
-        body_seg = self.read_json(self.paths.body_seg) 
+        body = self.load_body(self.paths, config)
+        body_seg = body_cache.load_segmentation(self.paths.body_seg)
 
-        body_vertices = body_vertices * self.b_scale
-        self.shift_y = self.get_shift_param(body_vertices)
-
-        if self.shift_y:
-            body_vertices[:, 1] = body_vertices[:, 1] + self.shift_y
+        body_vertices, body_indices, body_faces = body.vertices.copy(), body.indices, body.faces
+        self.shift_y = body.shift_y
 
         self.v_body = body_vertices
         self.f_body = body_faces
@@ -120,6 +199,7 @@ class Cloth:
             cloth_vertices[:, 1] = cloth_vertices[:, 1] + self.shift_y
         self.v_cloth_init = cloth_vertices
         self.f_cloth = cloth_faces
+        self.vert_connectivity = self._build_vert_connectivity(cloth_vertices, cloth_indices)
 
         #Load ground truth stitching lengths
         if not self.paths.g_orig_edge_len.exists():
@@ -159,23 +239,19 @@ class Cloth:
         # ------------ Add a body -----------      
         if self.enable_body_smoothing:
             # Starts sim from smoothed-out body and slowly restores original details
-            smoothing_total_smoothing_factor = config.smoothing_total_smoothing_factor
-            smoothing_num_steps = config.smoothing_num_steps
             smoothing_recover_start_frame = config.smoothing_recover_start_frame
             smoothing_frame_gap_between_steps = config.smoothing_frame_gap_between_steps
-            smoothing_step_size = smoothing_total_smoothing_factor / smoothing_num_steps
             self.body_smoothing_frames = [smoothing_recover_start_frame + smoothing_frame_gap_between_steps*i for i in range(smoothing_num_steps + 1)]
-            self.body_smoothing_vertices_list = []
-            self.body_smoothing_vertices_list = implicit_laplacian_smoothing(body_vertices, body_indices.reshape(-1, 3), 
-                                                                             step_size=smoothing_step_size, 
-                                                                             iters=smoothing_num_steps)
+            self.body_smoothing_vertices_list = body.smoothing_list()
             body_vertices = self.body_smoothing_vertices_list.pop()
             self.body_smoothing_frames.pop()
             self.body_indices = body_indices
             self.body_vertices_device_buffer = wp.array(body_vertices, dtype=wp.vec3, device=self.device)
             self.v_body = body_vertices
-        
-        self.body_mesh = wp.sim.Mesh(body_vertices, body_indices)
+            # Body mesh is updated during simulation -- cannot be shared
+            self.body_mesh = wp.sim.Mesh(body_vertices, body_indices)
+        else:
+            self.body_mesh = body.collider_mesh()
         
         body_pos = wp.vec3(0.0, 0, 0.0)
         body_rot = wp.quat_from_axis_angle(wp.vec3(0.0, 1.0, 0.0), wp.degrees(0.0))
@@ -194,7 +270,6 @@ class Cloth:
         
         face_filters, particle_filter = [], []
         if config.enable_body_collision_filters:
-            v_connectivity = self._build_vert_connectivity(cloth_vertices, cloth_indices)
             # Arm filter for the skirts
             face_filters.append(assign.create_face_filter(
                 body_vertices, body_indices, body_seg, ['left_arm', 'right_arm', 'arms'], smpl_body=self.paths.use_smpl_seg))
@@ -202,7 +277,7 @@ class Cloth:
                 cloth_reference_labels, 
                 ['left_leg', 'right_leg', 'legs'],
                 filter_id=0,
-                vert_connectivity=v_connectivity
+                vert_connectivity=self.vert_connectivity
             )
 
             # Overall filter that ignored internal geometry
@@ -212,7 +287,7 @@ class Cloth:
                 cloth_reference_labels, 
                 ['body'],
                 filter_id=1,   
-                vert_connectivity=v_connectivity,
+                vert_connectivity=self.vert_connectivity,
                 current_vertex_filter=particle_filter
             )
 
@@ -346,11 +421,15 @@ class Cloth:
 
     def _sim_frame_with_substeps(self):
         """Basic scheme for simulating a frame update"""
-        
+        self._collide()
+        self._integrate_substeps()
+
+    def _collide(self):
         wp.sim.collide(self.model, self.state_0, self.sim_dt * self.sim_substeps)  # Generates contact points for the particles and rigid bodies
         # in the model, to be used in the contact dynamics kernel of the integrator
         # launches kernels
 
+    def _integrate_substeps(self):
         for s in range(self.sim_substeps):
             self.state_0.clear_forces()  # set particle and body forces to 0s
             self.integrator.simulate(self.model, self.state_0, self.state_1,
@@ -370,27 +449,40 @@ class Cloth:
 
     def update(self, frame):
         with wp.ScopedTimer("simulate", print=False, active=True):
+            start_time = time.perf_counter()
+            collide_time = integrate_time = np.nan
+            recapture = False
+
             if self.model.enable_particle_particle_collisions:
                 # FIXME: Produces cuda errors when activated together with "enable_cloth_reference_drag"
                 # Reason is unknown. Or not?
                 self.model.particle_grid.build(self.state_0.particle_q, self.model.particle_max_radius * 2.0)
             if frame == self.zero_gravity_steps:
                 self.model.gravity = np.array((0.0, -9.81, 0.0))
-                if self.sim_use_graph:
-                    self.create_graph()
+                recapture = True
             if self.enable_body_smoothing and frame in self.body_smoothing_frames:
                 self.update_smooth_body_shape()
-                if self.sim_use_graph:
-                    self.create_graph()
+                recapture = True
             if (self.model.attachment_constraint 
                     and frame >= self.config.attachment_frames):  
                 self.model.attachment_constraint = False
-                if self.sim_use_graph:
-                    self.create_graph()
+                recapture = True
+            if recapture and self.sim_use_graph:
+                self.create_graph()
             
             if self.sim_use_graph: #GPU
                 wp.capture_launch(self.graph)
 
+            elif self.telemetry is not None:  # CPU, with separate timing of simulation steps
+                wp.synchronize()
+                collide_start = time.perf_counter()
+                self._collide()
+                wp.synchronize()
+                collide_time = time.perf_counter() - collide_start
+                self._integrate_substeps()
+                wp.synchronize()
+                integrate_time = time.perf_counter() - collide_start - collide_time
+
             else: #CPU: launch kernels without graph
                 self._sim_frame_with_substeps()
 
@@ -398,6 +490,38 @@ class Cloth:
             self.last_verts = self.current_verts
             # NOTE Makes a copy if particle_q device is not CPU
             self.current_verts = wp.array.numpy(self.state_0.particle_q)  
+
+            if self.telemetry is not None:
+                self._record_telemetry(
+                    frame, 
+                    frame_time=time.perf_counter() - start_time,
+                    collide_time=collide_time,
+                    integrate_time=integrate_time,
+                    recapture=recapture and self.sim_use_graph
+                )
+
+    def _sim_phase(self, frame):
+        """Current phase of the frame schedule (see sim_telemetry.PHASES)"""
+        if frame < self.zero_gravity_steps:
+            return 'zero_gravity'
+        if self.model.attachment_constraint:
+            return 'attachment'
+        if self.enable_body_smoothing and self.body_smoothing_vertices_list:
+            return 'body_smoothing'
+        return 'free'
+
+    def _record_telemetry(self, frame, frame_time, collide_time, integrate_time, recapture):
+        velocities = wp.array.numpy(self.state_0.particle_qd)
+        self.telemetry.record(
+            frame=frame,
+            phase=sim_telemetry.PHASES.index(self._sim_phase(frame)),
+            frame_time=frame_time,
+            collide_time=collide_time,
+            integrate_time=integrate_time,
+            non_static=self._non_static_count(),
+            max_velocity=np.sqrt((velocities ** 2).sum(axis=1).max()) if len(velocities) else 0.,
+            recapture=recapture
+        )
             
     def update_smooth_body_shape(self):
         body_vertices = self.body_smoothing_vertices_list.pop()
@@ -424,6 +548,83 @@ class Cloth:
                             is_template=True,
                         )
 
+    # ------- Checkpoints -------
+    def save_checkpoint(self, path, sim_time=0., fingerprint=''):
+        """Store lightweight state of the simulation to allow resuming it later:
+            particle positions and velocities and the state of the frame schedule
+            * fingerprint -- identifier of the simulation inputs the state belongs to
+        """
+        path = Path(path)
+        smoothing_left = len(self.body_smoothing_vertices_list) if self.enable_body_smoothing else 0
+
+        # Write to a temporary file first s.t. the latest checkpoint is never broken by interruption
+        tmp_path = path.with_suffix('.tmp.npz')
+        np.savez(
+            tmp_path, 
+            particle_q=wp.array.numpy(self.state_0.particle_q),
+            particle_qd=wp.array.numpy(self.state_0.particle_qd),
+            frame=self.frame,
+            gravity=self.frame >= self.zero_gravity_steps,
+            attachment=self.model.attachment_constraint,
+            smoothing_left=smoothing_left,
+            usd_frame_time=self.usd_frame_time,
+            sim_time=sim_time,
+            fingerprint=fingerprint,
+            # Telemetry continues from the checkpoint on resume
+            **(self.telemetry.arrays(prefix='telemetry_') if self.telemetry is not None else {})
+        )
+        os.replace(tmp_path, path)
+
+    def load_checkpoint(self, path, fingerprint=None):
+        """Restore the simulation state from the checkpoint.
+            Returns the simulation time spent before the checkpoint, 
+            or None if the checkpoint does not match current garment
+            * fingerprint -- if given, the checkpoint is only resumed if it was stored 
+                with the same fingerprint of the simulation inputs
+        """
+        with np.load(path) as data:
+            if fingerprint is not None and str(data.get('fingerprint', '')) != fingerprint:
+                print(f'{self.name}::WARNING::Checkpoint {path} was created for different simulation inputs '
+                      '(pattern, box mesh, body or config). Ignored')
+                return None
+            particle_q = data['particle_q']
+            if len(particle_q) != len(self.current_verts):
+                print(f'{self.name}::WARNING::Checkpoint {path} does not match the garment '
+                      f'({len(particle_q)} vs {len(self.current_verts)} vertices). Ignored')
+                return None
+
+            for state in [self.state_0, self.state_1]:
+                wp.copy(state.particle_q, 
+                        wp.array(particle_q, dtype=wp.vec3, device='cpu', copy=False))
+                wp.copy(state.particle_qd, 
+                        wp.array(data['particle_qd'], dtype=wp.vec3, device='cpu', copy=False))
+
+            # Frame schedule
+            self.frame = int(data['frame'])
+            if bool(data['gravity']):
+                self.model.gravity = np.array((0.0, -9.81, 0.0))
+            self.model.attachment_constraint = bool(data['attachment'])
+            if self.enable_body_smoothing:
+                smoothing_left = int(data['smoothing_left'])
+                if len(self.body_smoothing_vertices_list) > smoothing_left:
+                    # Skip to the smoothing step of the checkpoint
+                    del self.body_smoothing_vertices_list[smoothing_left + 1:]
+                    self.update_smooth_body_shape()
+            self.usd_frame_time = float(data['usd_frame_time'])
+            sim_time = float(data['sim_time'])
+            if self.telemetry is not None and not self.telemetry.restore(data, prefix='telemetry_'):
+                print(f'{self.name}::WARNING::Checkpoint {path} has no telemetry. '
+                      'Telemetry only covers the frames after the checkpoint')
+
+        if self.sim_use_graph:
+            self.create_graph()
+
+        self.last_verts = None
+        self.current_verts = particle_q.copy()
+
+        print(f'{self.name}::INFO::Resumed simulation from frame {self.frame + 1}')
+        return sim_time
+
     def render_usd_frame(self, is_live=False):
         with wp.ScopedTimer("render", print=False, active=True):
             start_time = 0.0 if is_live else self.usd_frame_time
@@ -452,13 +653,6 @@ class Cloth:
         v, f = igl.read_triangle_mesh(str(path))
         return v, f.flatten(), f
 
-    def get_shift_param(self,body_vertices):
-        v_body_arr = np.array(body_vertices)
-        min_y = (min(v_body_arr[:, 1]))
-        if min_y < 0:
-            return abs(min_y)
-        return 0.0
-
     def calc_norm(self, a, b, c):
         """
         This function calculates the norm based on the three points a, b, and c.
@@ -481,73 +675,121 @@ class Cloth:
         return n_normalized
 
     def calc_vertex_norms(self):
-        vertex_normals = np.zeros((len(self.v_cloth_init), 4))
-        for face in self.f_cloth:
-            v0, v1, v2 = np.array(self.current_verts)[face]
-            face_norm = list(self.calc_norm(v0, v1, v2))
-            temp_update = face_norm + [1]
-            vertex_normals[face] += temp_update
+        """Vertex normals as averages of the unit normals of adjacent faces"""
+        verts = np.asarray(self.current_verts)
+        faces = np.asarray(self.f_cloth)
+        v0, v1, v2 = verts[faces[:, 0]], verts[faces[:, 1]], verts[faces[:, 2]]
+
+        face_norms = np.cross(v1 - v0, v2 - v0)
+        face_norms /= np.linalg.norm(face_norms, axis=1)[:, np.newaxis]
 
-        vertex_normals = vertex_normals[:, :3] / (vertex_normals[:, 3][:, np.newaxis])
-        return vertex_normals
+        return self.vert_connectivity.face_average(face_norms)
+
+    def _load_obj_template(self):
+        """Parse boxmesh obj once into the blocks re-used for every saved frame: 
+            raw bytes of everything except vertices and vertex normals (e.g. textures and faces), 
+            and the position of vertex and vertex normal blocks
+        """
+        # Sequence of (kind, content): ('raw', bytes) or ('v' / 'vn', (first_id, count))
+        template = []
+        counts = {'v': 0, 'vn': 0}
+        with open(self.paths.g_box_mesh, 'rb') as obj_file:
+            for line in obj_file:
+                if line.startswith(b'v '):
+                    kind = 'v'
+                elif line.startswith(b'vn '):
+                    kind = 'vn'
+                else:
+                    kind = 'raw'
 
-    def save_frame(self, save_v_norms=False): 
+                if not template or template[-1][0] != kind:
+                    template.append((kind, [] if kind == 'raw' else [counts[kind], 0]))
+                if kind == 'raw':
+                    template[-1][1].append(line)
+                else:
+                    template[-1][1][1] += 1
+                    counts[kind] += 1
+
+        self._obj_template = [
+            (kind, b''.join(content) if kind == 'raw' else tuple(content)) 
+            for kind, content in template]
+
+    @staticmethod
+    def _format_obj_block(tag, values):
+        """Text block of obj lines with given tag for each row of values"""
+        if not len(values):
+            return b''
+        # NOTE: 9 significant digits round-trip float32 values of simulated vertices
+        line = tag + ' %.9g %.9g %.9g\n'
+        return ((line * len(values)) % tuple(np.asarray(values, dtype=float).ravel())).encode()
+
+    def save_frame(self, save_v_norms=False, ply_path=None): 
         """Save current garment state as an obj file, 
         re-using all the information from boxmesh 
         except for vertices and vertex normals (e.g. textures and faces)
+
+        * ply_path -- if given, the garment geometry is also stored there as a binary ply
         """
-        
         # NOTE: igl routine is not used here because it cannot write any extra info (e.g. texture coords) into obj
+        if getattr(self, '_obj_template', None) is None:
+            self._load_obj_template()
 
         # stores v, f, vf and vn
         # Save cloth with texture and normals
-        if save_v_norms:
-            vertex_normals = self.calc_vertex_norms()
+        vertex_normals = self.calc_vertex_norms() if save_v_norms else None
 
         v_cloth_sim = self.current_verts
-        # Store simulated cloth mesh
-        # Read the boxmesh file
-        with open(self.paths.g_box_mesh, 'r') as obj_file:
-            lines = obj_file.readlines()
-
-        # Modify the vertex positions and normals, if required
-        with open(self.paths.g_sim, 'w') as obj_file:
-            v_idx = 0
-            vn_idx = 0
-            for line in lines:
-                if line.startswith('v '):
-                    new_vertex = v_cloth_sim[v_idx]
-                    obj_file.write(f'v {new_vertex[0]} {new_vertex[1]} {new_vertex[2]}\n')
-                    v_idx += 1
-                elif line.startswith('vn '):
-                    if save_v_norms:
-                        new_vertex = vertex_normals[vn_idx]
-                        obj_file.write(f'vn {new_vertex[0]} {new_vertex[1]} {new_vertex[2]}\n')
-                        vn_idx += 1
-                else:
-                    obj_file.write(line)
+        chunks = []
+        for kind, content in self._obj_template:
+            if kind == 'raw':
+                chunks.append(content)
+            elif kind == 'v':
+                start, count = content
+                chunks.append(self._format_obj_block('v', v_cloth_sim[start:start + count]))
+            elif kind == 'vn' and save_v_norms:
+                start, count = content
+                chunks.append(self._format_obj_block('vn', vertex_normals[start:start + count]))
+
+        with open(self.paths.g_sim, 'wb') as obj_file:
+            obj_file.write(b''.join(chunks))
+
+        if ply_path is not None:
+            self.save_frame_ply(ply_path)
+
+    def save_frame_ply(self, path):
+        """Save current garment geometry (vertices and faces) as a binary ply file"""
+        verts = np.asarray(self.current_verts, dtype='<f4')
+        faces = np.empty(len(self.f_cloth), dtype=[('count', 'u1'), ('ids', '<i4', (3,))])
+        faces['count'] = 3
+        faces['ids'] = self.f_cloth
+
+        header = (
+            'ply\n'
+            'format binary_little_endian 1.0\n'
+            f'element vertex {len(verts)}\n'
+            'property float x\n'
+            'property float y\n'
+            'property float z\n'
+            f'element face {len(faces)}\n'
+            'property list uchar int vertex_indices\n'
+            'end_header\n'
+        ).encode()
+        with open(path, 'wb') as ply_file:
+            ply_file.write(header + verts.tobytes() + faces.tobytes())
 
     def is_static(self):
         """
             Checks whether garment is in the static equilibrium
             Compares current state with the last recorded state
         """
-        threshold = self.config.static_threshold
         non_static_percent = self.config.non_static_percent
 
         curr_verts_arr = self.current_verts
-        last_verts_arr = self.last_verts
 
         if self.last_verts is None:  # first iteration
             return False, len(curr_verts_arr)
 
-        # Compare L1 norm per vertex
-        # Checking vertices change is the same as checking if velocity is zero
-        diff = np.abs(curr_verts_arr - last_verts_arr)
-        diff_L1 = np.sum(diff, axis=1)
-
-        non_static_len = len(
-            diff_L1[diff_L1 > threshold])  # compare vertex-wise to allow accurate control over outliers
+        non_static_len = self._non_static_count()
 
         if non_static_len == 0 or (non_static_len < len(curr_verts_arr) * 0.01 * non_static_percent):
             print('\nStatic with {} non-static vertices out of {}'.format(non_static_len, len(curr_verts_arr)))
@@ -556,6 +798,19 @@ class Cloth:
         else:
             return False, non_static_len
 
+    def _non_static_count(self):
+        """Number of vertices that moved more than static threshold since the last frame"""
+        if self.last_verts is None:
+            return len(self.current_verts)
+
+        # Compare L1 norm per vertex
+        # Checking vertices change is the same as checking if velocity is zero
+        diff = np.abs(self.current_verts - self.last_verts)
+        diff_L1 = np.sum(diff, axis=1)
+
+        # compare vertex-wise to allow accurate control over outliers
+        return int(np.count_nonzero(diff_L1 > self.config.static_threshold))
+
     def count_self_intersections(self):
         model = self.model
 
@@ -601,18 +856,5 @@ class Cloth:
             return 0 
         
     def _build_vert_connectivity(self, vertices, indices):
-        vert_connectivity = [[] for _ in range(len(vertices))]
-
-        for face_id in range(int(len(indices) / 3)):
-            v1, v2, v3 = indices[face_id*3 + 0], indices[face_id*3 + 1], indices[face_id*3 + 2]
-            
-            vert_connectivity[v1].append(v2)
-            vert_connectivity[v1].append(v3)
-
-            vert_connectivity[v2].append(v1)
-            vert_connectivity[v2].append(v3)
-
-            vert_connectivity[v3].append(v1)
-            vert_connectivity[v3].append(v2)
-
-        return vert_connectivity
+        """Vertex adjacency of the mesh in CSR form"""
+        return VertexConnectivity.from_faces(len(vertices), np.asarray(indices).reshape(-1, 3))
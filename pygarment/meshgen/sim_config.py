@@ -89,7 +89,11 @@ class PathCofig:
         self.g_sim = self.out_el / f'{self.sim_tag}_sim.obj'
         self.g_sim_glb = self.out_el / f'{self.sim_tag}_sim.glb'
         self.g_sim_compressed = self.out_el / f'{self.sim_tag}_sim.ply'
+        self.g_sim_ply = self.out_el / f'{self.sim_tag}_sim_geometry.ply'
         self.usd = self.out_el / f'{self.sim_tag}_simulation.usd'
+        self.g_sim_checkpoint = self.out_el / f'{self.sim_tag}_sim_checkpoint.npz'
+        # NOTE: Dataset-level folder: telemetry is not moved with the garment folder into shards
+        self.g_sim_telemetry = Path(self.out) / 'sim_telemetry' / f'{self.sim_tag}_sim_telemetry.npz'
 
 
     def render_path(self, camera_name=''):
@@ -122,6 +126,13 @@ class SimConfig:
             self.max_frame_time = int(self.max_frame_time)
         self.max_sim_time = int(self.get_sim_props_value(sim_props, 'max_sim_time', 25 * 60))
         self.non_static_percent = self.get_sim_props_value(sim_props, 'non_static_percent', 5)
+        # Resuming
+        # Store simulation state every given number of frames (disabled if not set)
+        self.checkpoint_frames = self.get_sim_props_value(sim_props, 'checkpoint_frames', None)
+        # Per-frame statistics recording (see sim_telemetry.py)
+        self.telemetry = self.get_sim_props_value(sim_props, 'telemetry', False)
+        # Additionally store the final frame as binary ply with vertices and faces only
+        self.save_ply = self.get_sim_props_value(sim_props, 'save_ply', False)
         # Quality filter
         self.max_body_collisions = self.get_sim_props_value(sim_props, 'max_body_collisions', 0)
         self.max_self_collisions = self.get_sim_props_value(sim_props, 'max_self_collisions', 0)
@@ -215,6 +226,13 @@ class SimConfig:
         if self.smoothing_num_steps == 0:
             self.enable_body_smoothing = False
 
+        # Folder to store preprocessed bodies between runs (in-memory caching only if not set)
+        self.body_cache_path = self.get_sim_props_value(
+            sim_props_option, 'body_cache_path', None)
+        # Number of preprocessed bodies (with their collision meshes) kept in memory per process
+        self.body_cache_size = self.get_sim_props_value(
+            sim_props_option, 'body_cache_size', 4)
+
         # ----- Fabric material properties ----- 
         # Bending 
         self.garment_edge_ke = self.get_sim_props_value(
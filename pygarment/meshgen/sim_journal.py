@@ -0,0 +1,84 @@
+"""Append-only journal of dataset simulation progress
+
+    Every garment produces a 'start' event before its processing and a 'finish' event
+    with its stats afterwards. Appending a line is O(1) and cannot corrupt previously
+    written events, unlike re-writing the full dataset properties file
+"""
+
+import json
+from pathlib import Path
+
+
+def _to_json(value):
+    """Fallback serialization for numpy scalars"""
+    try:
+        return value.item()
+    except AttributeError:
+        raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+class SimJournal:
+    """JSON-lines journal of per-garment processing events"""
+    def __init__(self, path):
+        self.path = Path(path)
+        self._num_lines = 0
+        if self.path.exists():
+            with open(self.path, 'rb') as f:
+                content = f.read()
+            self._num_lines = content.count(b'\n')
+            if content and not content.endswith(b'\n'):
+                # Terminate the line partially written on crash s.t. it does not break the next event
+                with open(self.path, 'a') as f:
+                    f.write('\n')
+                self._num_lines += 1
+
+    def __len__(self):
+        return self._num_lines
+
+    def exists(self):
+        return self.path.exists() and self._num_lines > 0
+
+    def clear(self):
+        self.path.unlink(missing_ok=True)
+        self._num_lines = 0
+
+    def start(self, name):
+        self._append({'event': 'start', 'name': name})
+
+    def finish(self, name, stats):
+        """Record the end of garment processing with the garment stats:
+            {section: {stats_key: {garment_name: value}, 'fails': {fail_type: [names]}}}
+        """
+        self._append({'event': 'finish', 'name': name, 'stats': stats})
+
+    def read(self, offset=0):
+        """Iterate over the events starting from the given line number.
+            Unreadable lines (e.g. partially written on crash) are skipped
+        """
+        if not self.path.exists():
+            return
+        with open(self.path, 'r') as f:
+            for i, line in enumerate(f):
+                if i < offset:
+                    continue
+                try:
+                    yield json.loads(line)
+                except json.JSONDecodeError:
+                    print(f'{self.__class__.__name__}::WARNING::Skipped broken line {i} in {self.path}')
+
+    def in_progress(self):
+        """Garments that were started but not finished, with the number
+            of starts since their last finish
+        """
+        starts = {}
+        for record in self.read():
+            if record['event'] == 'start':
+                starts[record['name']] = starts.get(record['name'], 0) + 1
+            else:
+                starts.pop(record['name'], None)
+        return starts
+
+    def _append(self, record):
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(record, default=_to_json) + '\n')
+        self._num_lines += 1
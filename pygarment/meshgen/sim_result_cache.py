@@ -0,0 +1,303 @@
+"""Content-addressed cache of garment simulation results
+
+    Re-generation of datasets (replication, re-simulation of fails, config sweeps)
+    often simulates exactly the same pattern on the same body with the same settings.
+    The cache stores the produced files (box mesh, simulated mesh, renders, etc.)
+    and the garment stats under the hash of all the simulation inputs,
+    s.t. such garments are restored from the cache instead of being simulated again.
+
+    The cache directory can be shared by parallel workers: entries are written to
+    a temporary folder and renamed in place, and the least recently used entries
+    are evicted when the cache exceeds its size limit.
+    The garment name is not part of the key: when the results are restored under
+    a different name, the file references in the meshes and materials
+    (mtllib, map_Kd) and the name in the specification copy are updated to the new name.
+    NOTE: The size of the cache is only checked every EVICT_EVERY stores of the process 
+    since it requires reading all the entries. The cache may exceed the limit by 
+    about EVICT_EVERY entries per worker in between
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+import shutil
+import time
+import uuid
+
+import pygarment.meshgen.body_cache as body_cache
+from pygarment.meshgen.sim_config import PathCofig
+
+# NOTE: Bump when the simulation pipeline changes s.t. old results are not re-used
+CACHE_VERSION = 2
+
+# Config values that do not affect the simulation results
+IGNORED_CONFIG_KEYS = [
+    'body_cache_path', 'body_cache_size', 'result_cache_path', 'result_cache_max_gb',
+    'checkpoint_frames', 'telemetry', 'journal_compact_every', 'max_garment_time',
+]
+
+# Fails that are reproduced on re-simulation (the rest may be caused by the environment)
+DETERMINISTIC_FAILS = ['cloth_body_intersection', 'cloth_self_intersection']
+
+# Number of stores between the checks of the cache size (per process)
+EVICT_EVERY = 20
+
+_TAG = '{tag}'   # Placeholder of the garment name in the stored file names and stats
+_META_FILE = 'entry.json'
+_REF_LINES = ('mtllib ', 'map_')   # OBJ and MTL lines referencing other files of the garment
+
+_stores = {}   # Number of stores of the current process per cache directory
+
+
+def spec_hash(spec_file):
+    """Hash of the pattern specification contents. 
+        The name of the pattern, if stored in the specification, is ignored, 
+        s.t. identical designs with different names share the cache entries
+    """
+    with open(spec_file, 'r') as f:
+        spec = json.load(f)
+    spec.pop('name', None)
+    if isinstance(spec.get('properties'), dict):
+        spec['properties'].pop('name', None)
+    return hashlib.sha1(json.dumps(spec, sort_keys=True).encode()).hexdigest()
+
+
+def _clean_config(config):
+    if not isinstance(config, dict):
+        return config
+    return {key: _clean_config(value) for key, value in config.items()
+            if key not in IGNORED_CONFIG_KEYS}
+
+
+class SimResultCache:
+    """Directory of cached garment simulation results
+
+        * root -- cache directory
+        * max_size_gb -- size limit of the cache. Unlimited if None
+    """
+    def __init__(self, root, max_size_gb=None):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_size = max_size_gb * 1024 ** 3 if max_size_gb else None
+
+    def key(self, paths: PathCofig, props):
+        """Hash of the simulation inputs: pattern, body,
+            simulation (incl. mesh resolution, material, options) and render configs
+        """
+        inputs = {
+            'version': CACHE_VERSION,
+            'spec': spec_hash(paths.in_g_spec),
+            'body': body_cache.file_hash(paths.in_body_obj),
+            'body_measurements': body_cache.file_hash(paths.in_body_mes),
+            'body_segmentation': body_cache.file_hash(paths.body_seg),
+            'sim': _clean_config(props['sim']['config']),
+            'render': props['render']['config'],
+        }
+        inputs = json.dumps(inputs, sort_keys=True, default=str)
+        return hashlib.sha1(inputs.encode()).hexdigest()
+
+    def restore(self, key, paths: PathCofig, props, garment_name):
+        """Link the cached results into the garment output folder and add
+            the cached stats to props.
+            Returns False on cache miss
+        """
+        entry = self.root / key
+        try:
+            with open(entry / _META_FILE, 'r') as f:
+                meta = json.load(f)
+            for file in meta['files']:
+                dst = paths.out_el / file.replace(_TAG, paths.sim_tag, 1)
+                if meta['tag'] != paths.sim_tag and file.endswith(('.obj', '.mtl')):
+                    _copy_renamed_refs(entry / file, dst, meta['tag'], paths.sim_tag)
+                elif meta['tag'] != paths.sim_tag and file.endswith('_specification.json'):
+                    _copy_renamed_spec(entry / file, dst, meta['tag'], paths.sim_tag)
+                else:
+                    _link(entry / file, dst)
+        except (OSError, ValueError, KeyError) as e:
+            # Missing, partially evicted or broken entry
+            if entry.exists():
+                print(f'{self.__class__.__name__}::WARNING::Failed to restore {key}: {e}')
+            return False
+
+        _copy_input_files(paths)
+        os.utime(entry)   # Mark as recently used
+        _add_stats(props, _rename_stats(meta['stats'], _TAG, garment_name))
+        return True
+
+    def store(self, key, paths: PathCofig, props, garment_name):
+        """Store the results of the garment simulation.
+            Garments with non-deterministic failures (crashes, timeouts) are not stored
+        """
+        stats = _garment_stats(props, garment_name)
+        fails = stats.get('sim', {}).get('fails', {})
+        if any(fail_type not in DETERMINISTIC_FAILS for fail_type in fails):
+            return False
+
+        entry = self.root / key
+        if entry.exists():
+            return True
+
+        # NOTE: Input copies may differ between garments with the same pattern
+        skip = [paths.design_params.name, paths.body_mes.name]
+        tmp_entry = self.root / f'.tmp_{key}_{uuid.uuid4().hex[:8]}'
+        files, size = [], 0
+        try:
+            tmp_entry.mkdir()
+            for file in sorted(paths.out_el.rglob('*')):
+                if not file.is_file() or file.name in skip:
+                    continue
+                rel_path = file.relative_to(paths.out_el).as_posix()
+                if rel_path.startswith(paths.sim_tag):
+                    rel_path = _TAG + rel_path[len(paths.sim_tag):]
+                (tmp_entry / rel_path).parent.mkdir(parents=True, exist_ok=True)
+                shutil.copy2(file, tmp_entry / rel_path)
+                files.append(rel_path)
+                size += file.stat().st_size
+
+            with open(tmp_entry / _META_FILE, 'w') as f:
+                json.dump({
+                    'tag': paths.sim_tag,
+                    'files': files,
+                    'size': size,
+                    'stats': _rename_stats(stats, garment_name, _TAG)
+                }, f, default=str)
+            os.rename(tmp_entry, entry)
+        except OSError as e:
+            # Including concurrent storage of the same entry
+            shutil.rmtree(tmp_entry, ignore_errors=True)
+            if not entry.exists():
+                print(f'{self.__class__.__name__}::WARNING::Failed to store {key}: {e}')
+                return False
+            return True
+
+        # Size check requires reading all the entries -- only done once in a while
+        num_stores = _stores.get(self.root, 0)
+        _stores[self.root] = num_stores + 1
+        if num_stores % EVICT_EVERY == 0:
+            self.evict()
+        return True
+
+    def evict(self):
+        """Remove least recently used entries until the cache fits the size limit"""
+        if self.max_size is None:
+            return
+
+        entries = []
+        for entry in self.root.iterdir():
+            try:
+                with open(entry / _META_FILE, 'r') as f:
+                    size = json.load(f)['size']
+                entries.append((entry.stat().st_mtime, size, entry))
+            except (OSError, ValueError, KeyError):
+                # Temporary or broken entry -- clean-up if abandoned
+                if entry.name.startswith('.tmp_') and _age(entry) > 3600:
+                    shutil.rmtree(entry, ignore_errors=True)
+
+        total = sum(size for _, size, _ in entries)
+        for _, size, entry in sorted(entries, key=lambda e: e[0]):
+            if total <= self.max_size:
+                break
+            shutil.rmtree(entry, ignore_errors=True)
+            total -= size
+
+
+# ---- Utils ----
+def _link(src, dst):
+    """Hard-link the file (copy if not possible)
+
+        NOTE: Linked files share the contents with the cache, do not modify them in place
+    """
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    dst.unlink(missing_ok=True)
+    try:
+        os.link(src, dst)
+    except OSError:
+        shutil.copy2(src, dst)
+
+
+def _copy_renamed_refs(src, dst, old_tag, new_tag):
+    """Copy OBJ or MTL file pointing the references to the files of the old garment 
+        (e.g. mtllib old_material.mtl) to the files of the new one
+    """
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    dst.unlink(missing_ok=True)
+    with open(src, 'r') as f_in, open(dst, 'w') as f_out:
+        for line in f_in:
+            if line.startswith(_REF_LINES):
+                keyword, ref = line.split(' ', 1)
+                if ref.startswith(old_tag):
+                    line = f'{keyword} {new_tag}{ref[len(old_tag):]}'
+            f_out.write(line)
+
+
+def _copy_renamed_spec(src, dst, old_tag, new_tag):
+    """Copy the specification replacing the old garment name, if stored"""
+    with open(src, 'r') as f:
+        spec = json.load(f)
+    if spec.get('name') == old_tag:
+        spec['name'] = new_tag
+    if isinstance(spec.get('properties'), dict) and spec['properties'].get('name') == old_tag:
+        spec['properties']['name'] = new_tag
+
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    dst.unlink(missing_ok=True)
+    with open(dst, 'w') as f:
+        json.dump(spec, f, indent=2)
+
+
+def _copy_input_files(paths: PathCofig):
+    if paths.in_design_params.exists():
+        shutil.copy(paths.in_design_params, paths.design_params)
+    if paths.in_body_mes.exists():
+        shutil.copy(paths.in_body_mes, paths.body_mes)
+
+
+def _age(path):
+    try:
+        return time.time() - path.stat().st_mtime
+    except OSError:
+        return 0
+
+
+def _garment_stats(props, garment_name):
+    """Stats of the given garment in the sim and render sections"""
+    stats = {}
+    for section in ['sim', 'render']:
+        section_stats = {}
+        for key, value in props[section]['stats'].items():
+            if key == 'fails':
+                fails = [fail_type for fail_type, names in value.items() if garment_name in names]
+                if fails:
+                    section_stats['fails'] = {fail_type: [garment_name] for fail_type in fails}
+            elif isinstance(value, dict) and garment_name in value:
+                section_stats[key] = {garment_name: value[garment_name]}
+        stats[section] = section_stats
+    return stats
+
+
+def _rename_stats(stats, old_name, new_name):
+    renamed = {}
+    for section, section_stats in stats.items():
+        renamed[section] = {}
+        for key, value in section_stats.items():
+            if key == 'fails':
+                renamed[section][key] = {
+                    fail_type: [new_name if n == old_name else n for n in names]
+                    for fail_type, names in value.items()}
+            else:
+                renamed[section][key] = {new_name if n == old_name else n: v for n, v in value.items()}
+    return renamed
+
+
+def _add_stats(props, stats):
+    for section, section_stats in stats.items():
+        for key, value in section_stats.items():
+            if key == 'fails':
+                for fail_type, names in value.items():
+                    for name in names:
+                        props.add_fail(section, fail_type, name)
+            else:
+                if key not in props[section]['stats']:
+                    props[section]['stats'][key] = {}
+                props[section]['stats'][key].update(value)
@@ -0,0 +1,144 @@
+"""Per-frame simulation telemetry
+
+    Opt-in recording of frame timings and garment state during simulation
+    (enabled with `telemetry: true` in simulation config).
+    Every garment gets a compact columnar .npz file in the `sim_telemetry` folder
+    of the dataset (next to the dataset journal and manifest), and the files of a dataset 
+    can be summarized with `summarize()` to find the simulation phases that take the most time.
+
+    NOTE: The files are kept out of garment folders s.t. they stay in place when 
+    the garment folders are packed into shards
+"""
+
+from pathlib import Path
+import numpy as np
+
+# Simulation phases in the order of the frame schedule
+PHASES = ['zero_gravity', 'attachment', 'body_smoothing', 'free']
+
+COLUMNS = {
+    'frame': np.int32,
+    'phase': np.int8,         # index in PHASES
+    'frame_time': np.float32,      # seconds
+    'collide_time': np.float32,    # seconds, NaN when not measurable (CUDA graph launches)
+    'integrate_time': np.float32,  # seconds, NaN when not measurable (CUDA graph launches)
+    'non_static': np.int32,   # number of vertices that moved more than static_threshold
+    'max_velocity': np.float32,
+    'recapture': np.bool_,    # CUDA graph was re-captured on this frame
+}
+
+
+class SimTelemetry:
+    """Column-wise record of per-frame simulation statistics of one garment"""
+    def __init__(self, num_vertices=0):
+        self.num_vertices = num_vertices
+        self.columns = {key: [] for key in COLUMNS}
+
+    def __len__(self):
+        return len(self.columns['frame'])
+
+    def record(self, **values):
+        """Add a frame record. All the COLUMNS values are expected"""
+        for key in COLUMNS:
+            self.columns[key].append(values[key])
+
+    def arrays(self, prefix=''):
+        """Columns as typed numpy arrays, with optional prefix added to the keys"""
+        return {prefix + key: np.asarray(self.columns[key], dtype=dtype) for key, dtype in COLUMNS.items()}
+
+    def restore(self, data, prefix=''):
+        """Continue recording after the records stored with arrays(prefix) (e.g. in a simulation checkpoint).
+            Returns False if the data has no records
+        """
+        if prefix + 'frame' not in data:
+            return False
+        self.columns = {key: data[prefix + key].tolist() for key in COLUMNS}
+        return True
+
+    def save(self, path):
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(
+            path,
+            num_vertices=self.num_vertices,
+            phase_names=np.array(PHASES),
+            **self.arrays()
+        )
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            telemetry = cls(int(data['num_vertices']))
+            for key in COLUMNS:
+                telemetry.columns[key] = data[key]
+        return telemetry
+
+
+def summarize(data_path, pattern='sim_telemetry/*_sim_telemetry.npz'):
+    """Aggregate telemetry of all the garments found in data_path
+        into per-phase statistics.
+
+        For each phase, reports the share of the total simulation time,
+        frame time statistics, the number of frames garments spend in it,
+        and the state of the garments at the end of the phase
+        (fraction of non-static vertices, max velocity)
+    """
+    files = sorted(Path(data_path).glob(pattern))
+
+    frame_times = {phase: [] for phase in PHASES}
+    phase_frames = {phase: [] for phase in PHASES}
+    end_non_static = {phase: [] for phase in PHASES}
+    end_velocity = {phase: [] for phase in PHASES}
+    collide_times, integrate_times = [], []
+    recaptures = 0
+    for file in files:
+        telemetry = SimTelemetry.load(file)
+        if not len(telemetry):
+            continue
+        cols = telemetry.columns
+        recaptures += int(cols['recapture'].sum())
+        collide_times.append(cols['collide_time'])
+        integrate_times.append(cols['integrate_time'])
+
+        for i, phase in enumerate(PHASES):
+            mask = cols['phase'] == i
+            if not mask.any():
+                continue
+            frame_times[phase].append(cols['frame_time'][mask])
+            phase_frames[phase].append(int(mask.sum()))
+
+            last = np.flatnonzero(mask)[-1]
+            end_non_static[phase].append(
+                cols['non_static'][last] / max(telemetry.num_vertices, 1))
+            end_velocity[phase].append(cols['max_velocity'][last])
+
+    total_time = sum(float(np.sum(t)) for times in frame_times.values() for t in times)
+    summary = {
+        'garments': len(files),
+        'total_time': total_time,
+        'graph_recaptures': recaptures,
+        'phases': {}
+    }
+    for phase in PHASES:
+        if not frame_times[phase]:
+            continue
+        times = np.concatenate(frame_times[phase])
+        summary['phases'][phase] = {
+            'time_share': float(times.sum() / total_time) if total_time else 0.,
+            'frame_time_avg': float(times.mean()),
+            'frame_time_p95': float(np.percentile(times, 95)),
+            'frames_avg': float(np.mean(phase_frames[phase])),
+            'frames_max': int(np.max(phase_frames[phase])),
+            'end_non_static_percent_avg': float(np.mean(end_non_static[phase]) * 100),
+            'end_max_velocity_avg': float(np.mean(end_velocity[phase])),
+        }
+
+    if collide_times:
+        collide_times = np.concatenate(collide_times)
+        integrate_times = np.concatenate(integrate_times)
+        measured = ~np.isnan(collide_times)
+        if measured.any():
+            summary['collide_time_avg'] = float(collide_times[measured].mean())
+            summary['integrate_time_avg'] = float(integrate_times[measured].mean())
+
+    return summary
@@ -13,6 +13,8 @@
 #
 ###########################################################################
 
+import hashlib
+import json
 import sys
 import time
 import traceback
@@ -27,6 +29,7 @@ import warp as wp
 # Custom code
 from pygarment.meshgen.render.pythonrender import render_images
 from pygarment.meshgen.garment import Cloth
+import pygarment.meshgen.body_cache as body_cache
 from pygarment.meshgen.sim_config import SimConfig, PathCofig
 
 wp.init()
@@ -115,14 +118,36 @@ def _run_frame_with_timeout(garment, frame_timeout, frame_num):
     except TimeoutError as e:
         raise FrameTimeOutError
 
-def sim_frame_sequence(garment, config, store_usd=False, verbose=False):
+def checkpoint_fingerprint(paths: PathCofig, sim_config):
+    """Hash of the inputs the simulation state depends on: 
+        pattern specification, box mesh, body and simulation config.
+        Checkpoints with a different fingerprint are not resumed
+    """
+    inputs = {
+        'spec': body_cache.file_hash(paths.in_g_spec),
+        'box_mesh': body_cache.file_hash(paths.g_box_mesh),
+        'body': body_cache.file_hash(paths.in_body_obj),
+        'sim': sim_config,
+    }
+    return hashlib.sha1(json.dumps(inputs, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def sim_frame_sequence(garment, config, store_usd=False, verbose=False, 
+                       start_frame=0, prev_sim_time=0., checkpoint_path=None, fingerprint=''):
+    """Simulate frames until static equilibrium is reached or limits are exceeded
+
+        * start_frame, prev_sim_time -- allow continuing from a restored checkpoint 
+        * checkpoint_path -- if given, the simulation state is stored there 
+            every config.checkpoint_frames frames
+        * fingerprint -- checkpoint_fingerprint() of the simulation inputs stored with the checkpoints
+    """
 
     # Save initial state
-    if store_usd:
+    if store_usd and start_frame == 0:
         garment.render_usd_frame()
 
-    start_time = time.time()
-    for frame in range(0, config.max_sim_steps):
+    start_time = time.time() - prev_sim_time
+    for frame in range(start_frame, config.max_sim_steps):
         
         if verbose:
             print(f'\n------ Frame {frame + 1} ------')
@@ -158,28 +183,57 @@ def sim_frame_sequence(garment, config, store_usd=False, verbose=False):
         runtime = time.time() - start_time
         if runtime > config.max_sim_time:
             raise SimTimeOutError
+
+        if checkpoint_path is not None and (frame + 1) % config.checkpoint_frames == 0:
+            garment.save_checkpoint(checkpoint_path, sim_time=runtime, fingerprint=fingerprint)
         
 
 def run_sim(
         cloth_name, props, paths: PathCofig, 
         save_v_norms=False, store_usd=False, 
         optimize_storage=False,
-        verbose=False): 
+        verbose=False,
+        render=True): 
     """Initialize and run the simulation
     !! Important !! 
         'store_usd' parameter slows down the simulation to CPU rates because of required CPU-GPU copies and file writes. Use only for debugging
+
+        * render -- render the simulated garment and optimize the storage right away. 
+            If False, both are left to a separate call of render_garment()
     """
     sim_props = props['sim']
-    render_props = props['render']
 
     start_time = time.time()
 
     config = SimConfig(sim_props['config'])   # Why separate class at all? 
     garment = Cloth(cloth_name, config, paths, caching=store_usd)
 
+    # Resume from the latest checkpoint if available
+    # NOTE: Checkpoints are only kept while the simulation is in progress, 
+    # s.t. they are only resumed after the simulation process itself was interrupted
+    checkpoint_path = paths.g_sim_checkpoint if config.checkpoint_frames else None
+    fingerprint = checkpoint_fingerprint(paths, sim_props['config']) if checkpoint_path is not None else ''
+    start_frame, prev_sim_time = 0, 0.
+    if checkpoint_path is not None and checkpoint_path.exists():
+        try:
+            prev_sim_time = garment.load_checkpoint(checkpoint_path, fingerprint=fingerprint)
+        except BaseException as e:
+            print(f'Sim::{cloth_name}::WARNING::Failed to load checkpoint: {e}')
+            prev_sim_time = None
+        if prev_sim_time is not None:
+            start_frame = garment.frame + 1
+            start_time -= prev_sim_time
+        else:
+            # Start from scratch
+            garment = Cloth(cloth_name, config, paths, caching=store_usd)
+            prev_sim_time = 0.
+
     try:
         print("Simulation..")
-        sim_frame_sequence(garment, config, store_usd, verbose=verbose)
+        sim_frame_sequence(
+            garment, config, store_usd, verbose=verbose, 
+            start_frame=start_frame, prev_sim_time=prev_sim_time,
+            checkpoint_path=checkpoint_path, fingerprint=fingerprint)
     
     except FrameTimeOutError:
         print(f"FrameTimeOutError at frame {garment.frame}")
@@ -231,6 +285,11 @@ def run_sim(
         else:
             print('Not self-intersecting!!!')
 
+    # Simulation finished (successfully or not) -- checkpoint is no longer needed.
+    # NOTE: Resuming a timed out simulation would inherit the spent time and fail again right away
+    if checkpoint_path is not None:
+        checkpoint_path.unlink(missing_ok=True)
+
     # ---- Postprocessing ----
     # NOTE: Attempt even on failures for accurate picture and post-analysis
     frame = garment.frame
@@ -240,19 +299,32 @@ def run_sim(
     sim_props['stats']['spf'][cloth_name] = sim_time / frame if frame else sim_time
     sim_props['stats']['fin_frame'][cloth_name] = frame
 
-    garment.save_frame(save_v_norms=save_v_norms) #saving after stats
+    garment.save_frame(
+        save_v_norms=save_v_norms, 
+        ply_path=paths.g_sim_ply if config.save_ply else None) #saving after stats
+    if garment.telemetry is not None:
+        garment.telemetry.save(paths.g_sim_telemetry)
+
+    if render:
+        render_garment(
+            cloth_name, props, paths, garment.v_body, garment.f_body, 
+            optimize_storage=optimize_storage)
+
+    # Final info output
+    sec = round(time.time() - start_time, 3)
+    min = int(sec / 60)
+    print(f"\nSimulation pipeline took: {min} m {sec - min * 60} s")
+
+
+def render_garment(cloth_name, props, paths: PathCofig, body_v, body_f, optimize_storage=False):
+    """Render the simulated garment on the body & optionally optimize the storage of the results"""
+    render_props = props['render']
 
-    # Render images
     s_time = time.time()
-    render_images(paths, garment.v_body, garment.f_body, render_props['config'])
+    render_images(paths, body_v, body_f, render_props['config'])
     render_image_time = time.time() - s_time
     render_props['stats']['render_time'][cloth_name] = render_image_time  
     print(f"Rendering {cloth_name} took {render_image_time}s")
 
     if optimize_storage:
         optimize_garment_storage(paths)
-
-    # Final info output
-    sec = round(time.time() - start_time, 3)
-    min = int(sec / 60)
-    print(f"\nSimulation pipeline took: {min} m {sec - min * 60} s")
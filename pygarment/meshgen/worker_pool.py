@@ -0,0 +1,218 @@
+"""Pool of isolated worker processes for batch processing of garments
+
+    Unlike signal-based timeouts, the time budget of every task is enforced by the
+    parent process, so it works for any task and in any thread.
+    Workers that crash or exceed the budget are killed and replaced,
+    while the rest of the pool continues processing
+"""
+
+import atexit
+from collections import deque
+import multiprocessing
+from multiprocessing.connection import wait
+import time
+import traceback
+
+
+class _Worker:
+    """Parent-side handle of a worker process"""
+    def __init__(self, process, conn, device=None):
+        self.process = process
+        self.conn = conn
+        self.device = device
+        self.task_id = None
+        self.start_time = None
+
+    @property
+    def busy(self):
+        return self.task_id is not None
+
+
+def _worker_loop(task_fn, conn, initializer, device):
+    """Main loop of the worker process"""
+    if initializer is not None:
+        initializer(device)
+
+    while True:
+        try:
+            task = conn.recv()
+        except (EOFError, KeyboardInterrupt):
+            return
+        if task is None:  # Stop signal
+            return
+        task_id, payload = task
+        try:
+            result = task_fn(payload)
+            status = 'done'
+        except KeyboardInterrupt:
+            return
+        except BaseException as e:
+            traceback.print_exc()
+            result = repr(e)
+            status = 'error'
+        conn.send((task_id, status, result))
+
+
+class WorkerPool:
+    """Processes tasks in a pool of worker processes
+
+        * task_fn -- picklable (module-level) function processing a task payload.
+            Its return value is sent back to the parent
+        * num_workers -- number of worker processes
+        * time_budget -- hard wall-clock limit (in seconds) on processing of a task.
+            Worker exceeding it is killed and replaced
+        * devices -- optional list of devices (e.g. ['cuda:0', 'cuda:1']) to distribute
+            between workers. Worker i gets devices[i % len(devices)]
+        * initializer -- optional picklable function called in every new worker as initializer(device)
+
+        NOTE: Every worker communicates through its own pipe, 
+        s.t. killed or crashed workers cannot break the communication with the others
+        NOTE: Workers are not daemonic s.t. tasks can start their own processes
+        (e.g. timeouts of box mesh generation on Windows). They are stopped and joined 
+        explicitly by close(), which is also called on interpreter exit
+    """
+    def __init__(self, task_fn, num_workers, time_budget=None, devices=None, initializer=None,
+                 poll_interval=0.5):
+        self.task_fn = task_fn
+        self.num_workers = num_workers
+        self.time_budget = time_budget
+        self.devices = devices
+        self.initializer = initializer
+        self.poll_interval = poll_interval
+
+        # NOTE: spawn is required for safe use of CUDA in workers
+        self._context = multiprocessing.get_context('spawn')
+        self._workers = []
+
+        # Stats
+        self.replaced_workers = 0
+        self.completed = 0   # tasks finished with 'done' status
+        self.failed = 0      # tasks finished with 'error', 'timeout' or 'crash' status
+        self.busy_time = 0.   # total time workers spent on tasks
+
+    def run(self, tasks, on_submit=None):
+        """Process tasks given as (task_id, payload) pairs.
+            Yields (task_id, status, result) as tasks are completed, in completion order.
+            * on_submit -- optional callback on_submit(task_id), called when the task is sent to a worker
+            Status is one of:
+            * 'done' -- result is the return value of task_fn
+            * 'error' -- task_fn raised an exception, result is its description
+            * 'timeout' -- task exceeded time budget, worker was killed
+            * 'crash' -- worker process died while processing the task
+        """
+        pending = deque(tasks)
+        self.start()
+        try:
+            while pending or self.busy_count():
+                while pending and self.idle_count():
+                    task_id, payload = pending.popleft()
+                    if on_submit is not None:
+                        on_submit(task_id)
+                    self.submit(task_id, payload)
+                for result in self.poll(timeout=self.poll_interval):
+                    yield result
+        finally:
+            self.close()
+
+    # ---- Incremental processing ----
+    def start(self):
+        """Start worker processes"""
+        self._workers = [self._start_worker(i) for i in range(self.num_workers)]
+        atexit.register(self.close)
+
+    def idle_count(self):
+        return sum(not w.busy for w in self._workers)
+
+    def busy_count(self):
+        return sum(w.busy for w in self._workers)
+
+    def submit(self, task_id, payload):
+        """Send the task to an idle worker"""
+        for worker in self._workers:
+            if not worker.busy:
+                worker.task_id, worker.start_time = task_id, time.time()
+                worker.conn.send((task_id, payload))
+                return
+        raise RuntimeError(f'{self.__class__.__name__}::ERROR::No idle workers to submit {task_id}')
+
+    def poll(self, timeout=0.):
+        """Wait up to timeout seconds for the results of the submitted tasks. 
+            Returns the list of (task_id, status, result) of completed tasks, 
+            including crashed and timed out ones (see run())
+        """
+        results = []
+
+        # Collect results or detect dead workers
+        busy = {w.conn: i for i, w in enumerate(self._workers) if w.busy}
+        for conn in wait(list(busy.keys()), timeout=timeout) if busy else []:
+            i = busy[conn]
+            worker = self._workers[i]
+            try:
+                task_id, status, result = conn.recv()
+            except (EOFError, OSError):
+                results.append((worker.task_id, 'crash', None))
+                self._task_finished(worker, 'crash')
+                self._replace_worker(i)
+            else:
+                results.append((task_id, status, result))
+                self._task_finished(worker, status)
+        if not busy and timeout:
+            time.sleep(timeout)
+
+        # Time budget
+        for i, worker in enumerate(self._workers):
+            if (worker.busy and self.time_budget is not None
+                    and time.time() - worker.start_time > self.time_budget):
+                results.append((worker.task_id, 'timeout', None))
+                self._task_finished(worker, 'timeout')
+                self._replace_worker(i)
+
+        return results
+
+    def close(self):
+        """Stop all the workers"""
+        for worker in self._workers:
+            if not worker.busy and worker.process.is_alive():
+                try:
+                    worker.conn.send(None)
+                except (BrokenPipeError, OSError):
+                    pass
+        for worker in self._workers:
+            worker.process.join(timeout=5 if not worker.busy else 0)
+            if worker.process.is_alive():
+                worker.process.terminate()
+                worker.process.join()
+            worker.conn.close()
+        self._workers = []
+        atexit.unregister(self.close)
+
+    # ---- Private utils ----
+    def _start_worker(self, worker_idx):
+        device = self.devices[worker_idx % len(self.devices)] if self.devices else None
+        parent_conn, child_conn = self._context.Pipe()
+        process = self._context.Process(
+            target=_worker_loop,
+            args=(self.task_fn, child_conn, self.initializer, device),
+            name=f'Worker-{worker_idx}',
+            daemon=False
+        )
+        process.start()
+        child_conn.close()   # Only the worker keeps it open: allows detecting worker exit
+        return _Worker(process, parent_conn, device)
+
+    def _task_finished(self, worker, status):
+        if status == 'done':
+            self.completed += 1
+        else:
+            self.failed += 1
+        self.busy_time += time.time() - worker.start_time
+        worker.task_id, worker.start_time = None, None
+
+    def _replace_worker(self, worker_idx):
+        worker = self._workers[worker_idx]
+        if worker.process.is_alive():
+            worker.process.kill()
+        worker.process.join()
+        worker.conn.close()
+        self._workers[worker_idx] = self._start_worker(worker_idx)
+        self.replaced_workers += 1
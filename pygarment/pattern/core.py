@@ -13,6 +13,10 @@ import svgpathtools as svgpath
 # My
 from . import rotation as rotation_tools
 from . import utils
+from . import intersections
+
+# Max number of edges with cached svgpath segments per pattern (the cache is reset when exceeded)
+SEGMENTS_CACHE_SIZE = 10000
 
 standard_filenames = [
     'specification',  # e.g. used by dataset generation
@@ -65,6 +69,7 @@ class BasicPattern(object):
     def __init__(self, pattern_file=None):
         
         self.spec_file = pattern_file
+        self._segments_cache = {}  # Edge geometry -> svgpath segments
         
         if pattern_file is not None: # load pattern from file
             self.path = os.path.dirname(pattern_file)
@@ -491,46 +496,68 @@ class BasicPattern(object):
         """returns True if any of the pattern panels are self-intersecting"""
         return any(map(self._is_panel_self_intersecting, self.pattern['panels']))
 
+    def self_intersections(self, n_vert_approximation=10):
+        """Pairs of intersecting edges (edge ids) per self-intersecting panel: 
+            {panel_name: [(edge_id1, edge_id2), ...]}
+        """
+        panel_pairs = {}
+        for panel_name in self.pattern['panels']:
+            pairs = self._panel_self_intersections(panel_name, n_vert_approximation)
+            if pairs:
+                panel_pairs[panel_name] = pairs
+        return panel_pairs
+
     def _is_panel_self_intersecting(self, panel_name, n_vert_approximation=10):
         """Checks whatever a given panel contains intersecting edges
         """
+        return bool(self._panel_self_intersections(panel_name, n_vert_approximation, first_only=True))
+
+    def _panel_self_intersections(self, panel_name, n_vert_approximation=10, first_only=False):
+        """Pairs of intersecting edges (edge ids) of a given panel
+            * first_only -- stop at the first intersecting pair found
+        """
         panel = self.pattern['panels'][panel_name]
         vertices = np.array(panel['vertices'])
 
-        edge_curves = []  
-        for e in panel['edges']:
-            curve = self._edge_as_curve(vertices, e)
-
-            if isinstance(curve, svgpath.Arc):
-                # NOTE: Intersections for Arcs (Circle edge) fails in svgpathtools:
-                # They are not well implemented in svgpathtools, see
-                # https://github.com/mathandy/svgpathtools/issues/121
-                # https://github.com/mathandy/svgpathtools/blob/fcb648b9bb9591d925876d3b51649fa175b40524/svgpathtools/path.py#L1960
-                # Hence using linear approximation for robustness:
-                n = n_vert_approximation + 1
-                tvals = np.linspace(0, 1, n, endpoint=False)[1:]
-                edge_verts = [curve.point(t) for t in tvals]
-                edge_curves += [svgpath.Line(edge_verts[i], edge_verts[i + 1]) for i in range(n-2)]
-            else:
-                edge_curves.append(curve)
+        edge_curves, edge_ids = [], []
+        for i, e in enumerate(panel['edges']):
+            segments = self._edge_segments(vertices, e, n_vert_approximation)
+            edge_curves += segments
+            edge_ids += [i] * len(segments)
 
-        # NOTE: simple pairwise checks of edges
-        for i1 in range(0, len(edge_curves)):
-           for i2 in range(i1 + 1, len(edge_curves)):
-                intersect_t = edge_curves[i1].intersect(edge_curves[i2])
-                
-                # Check exceptions -- intersection at the vertex
-                for i in range(len(intersect_t)): 
-                    t1, t2 = intersect_t[i]
-                    if t2 < t1:
-                        t1, t2 = t2, t1
-                    if utils.close_enough(t1, 0) and utils.close_enough(t2, 1):
-                        intersect_t[i] = None
-                intersect_t = [el for el in intersect_t if el is not None]
-
-                if intersect_t:  # Any other case of intersections
-                    return True      
-        return False 
+        # NOTE: only the segments with overlapping bounding boxes are checked
+        pairs = intersections.self_intersections(edge_curves, first_only=first_only)
+        return sorted(set((edge_ids[i1], edge_ids[i2]) for i1, i2 in pairs))
+
+    def _edge_segments(self, vertices, edge, n_vert_approximation=10):
+        """Edge as a list of svgpath segments for intersection checks
+            
+            NOTE: The segments are cached by the edge geometry, 
+            so they are only re-evaluated for the edges that have changed
+        """
+        if len(self._segments_cache) > SEGMENTS_CACHE_SIZE:
+            self._segments_cache = {}
+        key = (*vertices[edge['endpoints'][0]], *vertices[edge['endpoints'][1]], 
+               repr(edge.get('curvature')), n_vert_approximation)
+        if key in self._segments_cache:
+            return self._segments_cache[key]
+
+        curve = self._edge_as_curve(vertices, edge)
+        if isinstance(curve, svgpath.Arc):
+            # NOTE: Intersections for Arcs (Circle edge) fails in svgpathtools:
+            # They are not well implemented in svgpathtools, see
+            # https://github.com/mathandy/svgpathtools/issues/121
+            # https://github.com/mathandy/svgpathtools/blob/fcb648b9bb9591d925876d3b51649fa175b40524/svgpathtools/path.py#L1960
+            # Hence using linear approximation for robustness:
+            n = n_vert_approximation + 1
+            tvals = np.linspace(0, 1, n, endpoint=False)[1:]
+            edge_verts = [curve.point(t) for t in tvals]
+            segments = [svgpath.Line(edge_verts[i], edge_verts[i + 1]) for i in range(n-2)]
+        else:
+            segments = [curve]
+
+        self._segments_cache[key] = segments
+        return segments
 
 # NOTE: Deprecated. Preserved for backward compatibility 
 # with the first dataset of 3D garments and sewing patterns
@@ -0,0 +1,137 @@
+"""Intersections of the panel edges
+
+    Pairs of svgpath segments with overlapping bounding boxes are found with sweep-and-prune,
+    intersections of straight segments are evaluated for all such pairs at once,
+    and only the pairs involving Bezier curves are checked by svgpath one by one.
+
+    NOTE: The bounding box of the control points is used for pruning, the same as in the svgpath
+    intersect() routines, so the results are the same as with the pairwise svgpath checks.
+    Zero-length and identical straight segments with overlapping boxes raise AssertionError, 
+    as svgpath Line.intersect() does
+"""
+
+import numpy as np
+import svgpathtools as svgpath
+
+from pygarment.pattern.utils import close_enough
+
+
+def segment_bboxes(curves):
+    """Bounding boxes of the control points of the svgpath segments: n x 4 array
+        of [min_x, max_x, min_y, max_y]
+        NOTE: Arcs are not bounded by their control points -- infinite boxes are used for them
+    """
+    bboxes = np.empty((len(curves), 4))
+    for i, curve in enumerate(curves):
+        if isinstance(curve, (svgpath.Line, svgpath.QuadraticBezier, svgpath.CubicBezier)):
+            pts = curve.bpoints()
+            xs, ys = [p.real for p in pts], [p.imag for p in pts]
+            bboxes[i] = min(xs), max(xs), min(ys), max(ys)
+        else:
+            bboxes[i] = -np.inf, np.inf, -np.inf, np.inf
+    return bboxes
+
+
+def overlapping_pairs(bboxes):
+    """Pairs (i1, i2), i1 < i2, of the (closed) bounding boxes that overlap:
+        sweep-and-prune along X axis
+    """
+    order = np.argsort(bboxes[:, 0], kind='stable')
+    sorted_min_x = bboxes[order, 0]
+    # Boxes starting before the end of each box in the sorted order
+    ends = np.searchsorted(sorted_min_x, bboxes[order, 1], side='right')
+
+    pairs = []
+    for k, i in enumerate(order):
+        others = order[k + 1:ends[k]]
+        others = others[(bboxes[others, 2] <= bboxes[i, 3]) & (bboxes[others, 3] >= bboxes[i, 2])]
+        pairs += [(i, j) if i < j else (j, i) for j in others]
+    return sorted(pairs)
+
+
+def line_intersections(starts1, ends1, starts2, ends2):
+    """Parameters (t1, t2) of the intersections of the pairs of straight segments,
+        given as n x 2 arrays of their end points.
+        NaN for the pairs that do not intersect
+
+        NOTE: Vectorized version of svgpath.Line.intersect(),
+        (nearly) parallel segments are not intersecting
+    """
+    a = (starts1[:, 0], ends1[:, 0])
+    b = (starts1[:, 1], ends1[:, 1])
+    c = (starts2[:, 0], ends2[:, 0])
+    d = (starts2[:, 1], ends2[:, 1])
+    denom = ((a[1] - a[0])*(d[0] - d[1]) -
+             (b[1] - b[0])*(c[0] - c[1]))
+    parallel = np.isclose(denom, 0)
+    denom = np.where(parallel, 1., denom)
+    t1 = (c[0]*(b[0] - d[1]) -
+          c[1]*(b[0] - d[0]) -
+          a[0]*(d[0] - d[1]))/denom
+    t2 = -(a[1]*(b[0] - d[0]) -
+           a[0]*(b[1] - d[0]) -
+           c[0]*(b[0] - b[1]))/denom
+    hit = ~parallel & (0 <= t1) & (t1 <= 1) & (0 <= t2) & (t2 <= 1)
+    return np.where(hit, t1, np.nan), np.where(hit, t2, np.nan)
+
+
+def _check_line_pairs(ends, i1, i2):
+    """Fail on the pairs of straight segments that svgpath Line.intersect() does not accept:
+        zero-length segments and identical segments
+    """
+    zero_length = np.all(ends[:, 0] == ends[:, 1], axis=-1)
+    degenerate = zero_length[i1] | zero_length[i2]
+    identical = np.all(ends[i1] == ends[i2], axis=(1, 2))
+    if degenerate.any() or identical.any():
+        k = np.flatnonzero(degenerate | identical)[0]
+        raise AssertionError(
+            f'Intersections::ERROR::Cannot intersect segments {i1[k]} and {i2[k]}: '
+            f'{"zero-length segment" if degenerate[k] else "identical segments"}')
+
+
+def _is_vertex_contact(t1, t2):
+    """Intersection at the vertex shared by two segments (end of one is the start of the other)"""
+    if t2 < t1:
+        t1, t2 = t2, t1
+    return close_enough(t1, 0) and close_enough(t2, 1)
+
+
+def self_intersections(curves, first_only=False):
+    """Pairs (i1, i2), i1 < i2, of the intersecting segments from the list of svgpath segments,
+        excluding the contacts at the shared vertices
+        * first_only -- stop at the first intersecting pair found
+    """
+    if len(curves) < 2:
+        return []
+    pairs = overlapping_pairs(segment_bboxes(curves))
+    if not pairs:
+        return []
+
+    is_line = np.array([isinstance(c, svgpath.Line) for c in curves])
+    pairs = np.array(pairs)
+    line_pairs = is_line[pairs[:, 0]] & is_line[pairs[:, 1]]
+
+    # Straight segments
+    found = []
+    if line_pairs.any():
+        ends = np.array([[[c.start.real, c.start.imag], [c.end.real, c.end.imag]]
+                         if is_line[i] else np.zeros((2, 2)) for i, c in enumerate(curves)])
+        i1, i2 = pairs[line_pairs, 0], pairs[line_pairs, 1]
+        _check_line_pairs(ends, i1, i2)
+        t1, t2 = line_intersections(ends[i1, 0], ends[i1, 1], ends[i2, 0], ends[i2, 1])
+        hits = ~np.isnan(t1)
+        for k in np.flatnonzero(hits):
+            if not _is_vertex_contact(t1[k], t2[k]):
+                found.append((int(i1[k]), int(i2[k])))
+                if first_only:
+                    return found
+
+    # Curves
+    for i1, i2 in pairs[~line_pairs]:
+        intersect_t = curves[i1].intersect(curves[i2])
+        if any(not _is_vertex_contact(t1, t2) for t1, t2 in intersect_t):
+            found.append((int(i1), int(i2)))
+            if first_only:
+                return found
+
+    return sorted(found)
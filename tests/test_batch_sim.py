@@ -0,0 +1,97 @@
+"""Parallel batch simulation loop (pygarment.meshgen.datasim_utils._batch_sim_parallel)"""
+import pytest
+
+pytest.importorskip('igl')
+pytest.importorskip('warp.sim')
+from pygarment.data_config import Properties
+import pygarment.meshgen.datasim_utils as datasim_utils
+from pygarment.meshgen.datasim_utils import _BatchProgress, _batch_sim_parallel, init_sim_props
+from pygarment.meshgen.sim_journal import SimJournal
+
+
+def _stats(name):
+    return {'sim': {'sim_time': {name: 1.}, 'fails': {}}}
+
+
+class Interrupted(BaseException):
+    """Stands for the interruption of the batch processing (e.g. killed job)"""
+
+
+class FakePool:
+    """Returns the pre-defined outcomes of the tasks instead of running them"""
+    outcomes = {}
+    interrupt_at = []
+
+    def __init__(self, task_fn, num_workers, **kwargs):
+        self.replaced_workers = 0
+
+    def run(self, tasks, on_submit=None):
+        for name, _ in tasks:
+            if on_submit is not None:
+                on_submit(name)
+            if name in self.interrupt_at:
+                raise Interrupted
+            status, result = self.outcomes.get(name, ('done', _stats(name)))
+            yield name, status, result
+
+
+@pytest.fixture
+def batch(tmp_path, monkeypatch):
+    monkeypatch.setattr(datasim_utils, 'WorkerPool', FakePool)
+    props_file = tmp_path / 'props.yaml'
+    journal_path = tmp_path / 'journal.jsonl'
+
+    def run(names, outcomes=None, interrupt_at=None):
+        """(Re-)start batch processing of the given garments"""
+        FakePool.outcomes = outcomes or {}
+        FakePool.interrupt_at = interrupt_at or []
+        props = Properties(props_file) if props_file.exists() else Properties()
+        resume = init_sim_props(props, batch_run=True, detect_crash=False)
+        progress = _BatchProgress(props, props_file, SimJournal(journal_path), compact_every=100)
+        if resume:
+            progress.replay()
+        else:
+            progress.compact()
+        _batch_sim_parallel(names, tmp_path, tmp_path / 'out', props, progress, resume=resume, num_workers=2)
+        return props, SimJournal(journal_path)
+
+    return run
+
+
+def test_failure_logs(batch, capsys):
+    props, _ = batch(['a', 'b', 'c', 'd'], outcomes={
+        'b': ('error', "ValueError('bad pattern')"),
+        'c': ('crash', None),
+        'd': ('timeout', None),
+    })
+    out = capsys.readouterr().out
+
+    assert "b failed with an exception: ValueError('bad pattern')" in out
+    assert 'b crashed the worker' not in out
+    assert 'c crashed the worker (crash). Worker is replaced' in out
+    assert 'd exceeded time budget' in out
+
+    assert props['sim']['stats']['processed'] == ['a', 'b', 'c', 'd']
+    assert props.has_fail('sim', 'crashes', 'b') and props.has_fail('sim', 'crashes', 'c')
+    assert props.has_fail('sim', 'garment_timeout', 'd')
+    assert not props.has_fail('sim', 'crashes', 'a')
+
+
+def test_only_dispatched_garments_are_journaled(batch, tmp_path):
+    names = ['a', 'b', 'c', 'd']
+    # The run is interrupted while processing b, c and d are never sent to workers
+    for _ in range(2):
+        with pytest.raises(Interrupted):
+            batch(names, interrupt_at=['b'])
+
+    with pytest.raises(Interrupted):
+        batch(names, interrupt_at=['c'])
+    assert SimJournal(tmp_path / 'journal.jsonl').in_progress() == {'c': 1}
+
+    props, journal = batch(names)
+    assert props['sim']['stats']['processed'] == ['a', 'b', 'c', 'd']
+    # b was sent to workers twice without finishing, c only once
+    assert props.has_fail('sim', 'crashes', 'b')
+    assert not props.has_fail('sim', 'crashes', 'c')
+    assert not props.has_fail('sim', 'crashes', 'd')
+    assert journal.in_progress() == {}
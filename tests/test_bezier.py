@@ -0,0 +1,87 @@
+"""Closed-form cubic Bezier evaluation (pygarment.garmentcode.bezier)"""
+import numpy as np
+import pytest
+import svgpathtools as svgpath
+
+from pygarment.garmentcode import bezier
+
+
+def _random_curves(n=20, seed=0):
+    """Arbitrary curves, including loops and near-cusps"""
+    rng = np.random.default_rng(seed)
+    return [rng.uniform(-50, 50, size=(4, 2)) for _ in range(n)]
+
+
+def _seam_curves(n=20, seed=0):
+    """Smooth curves like the armholes and hoods fitted in curve_match_tangents"""
+    rng = np.random.default_rng(seed)
+    curves = []
+    for _ in range(n):
+        x = np.sort(rng.uniform(0, 1, 2)) * 30
+        cps = np.array([[0, 0], [x[0], rng.uniform(-10, 10)], [x[1], rng.uniform(-10, 10)], [30, 0]], dtype=float)
+        curves.append(cps)
+    return curves
+
+
+def _svg_curve(cps):
+    return svgpath.CubicBezier(*(cps[:, 0] + 1j*cps[:, 1]))
+
+
+def _numeric_grad(fun, cps, eps=1e-6):
+    grad = np.zeros_like(cps)
+    for idx in np.ndindex(cps.shape):
+        shift = np.zeros_like(cps)
+        shift[idx] = eps
+        grad[idx] = (fun(cps + shift) - fun(cps - shift)) / (2*eps)
+    return grad
+
+
+@pytest.mark.parametrize('cps', _random_curves())
+def test_evaluation_matches_svgpath(cps):
+    curve = _svg_curve(cps)
+    t = np.linspace(0, 1, 11)
+
+    pts = bezier.points(cps, t)
+    np.testing.assert_allclose(pts[:, 0] + 1j*pts[:, 1], [curve.point(v) for v in t], atol=1e-9)
+    d1 = bezier.derivative(cps, t)
+    np.testing.assert_allclose(d1[:, 0] + 1j*d1[:, 1], [curve.derivative(v) for v in t], atol=1e-9)
+    d2 = bezier.derivative(cps, t, n=2)
+    np.testing.assert_allclose(d2[:, 0] + 1j*d2[:, 1], [curve.derivative(v, n=2) for v in t], atol=1e-9)
+    tan = bezier.unit_tangent(cps, t)
+    np.testing.assert_allclose(tan[:, 0] + 1j*tan[:, 1], [curve.unit_tangent(v) for v in t], atol=1e-9)
+    np.testing.assert_allclose(bezier.curvature(cps, t), [curve.curvature(v) for v in t], rtol=1e-7)
+
+
+@pytest.mark.parametrize('cps', _seam_curves())
+def test_length_matches_svgpath(cps):
+    # NOTE: default quadrature loses some accuracy on the curves turning sharply at the ends
+    assert bezier.length(cps) == pytest.approx(_svg_curve(cps).length(), rel=1e-5)
+
+
+@pytest.mark.parametrize('cps', _random_curves(seed=2))
+def test_length_converges_on_loops(cps):
+    assert bezier.length(cps, segments=64) == pytest.approx(_svg_curve(cps).length(), rel=1e-6)
+
+
+@pytest.mark.parametrize('cps', _random_curves(seed=1))
+def test_gradients_match_finite_differences(cps):
+    length, grad = bezier.length_grad(cps)
+    assert length == pytest.approx(bezier.length(cps))
+    np.testing.assert_allclose(grad, _numeric_grad(bezier.length, cps), rtol=1e-5, atol=1e-6)
+
+    target = np.array([np.cos(0.3), np.sin(0.3)])
+    for t in [0., 0.37, 1.]:
+        value, grad = bezier.unit_tangent_grad(cps, t, target)
+        fun = lambda c: np.sum((bezier.unit_tangent(c, t)[0] - target)**2)
+        assert value == pytest.approx(fun(cps))
+        np.testing.assert_allclose(grad, _numeric_grad(fun, cps), rtol=1e-5, atol=1e-7)
+
+        value, grad = bezier.curvature_sq_grad(cps, t)
+        fun = lambda c: bezier.curvature(c, t)[0]**2
+        assert value == pytest.approx(fun(cps))
+        np.testing.assert_allclose(grad, _numeric_grad(fun, cps), rtol=1e-4, atol=1e-9)
+
+
+def test_unsupported_derivative_order():
+    with pytest.raises(NotImplementedError):
+        bezier.derivative(_random_curves(1)[0], 0.5, n=3)
@@ -0,0 +1,98 @@
+"""Process cache of the preprocessed bodies (pygarment.meshgen.body_cache)"""
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+pytest.importorskip('igl')
+pytest.importorskip('warp.sim')
+import pygarment.meshgen.body_cache as body_cache
+
+
+def _write_body(path, min_y=-1.0):
+    path.write_text(
+        f'v 0 {min_y} 0\nv 1 {min_y} 0\nv 0 {min_y + 2} 0\nv 0 {min_y} 1\n'
+        'f 1 2 3\nf 1 3 4\nf 1 4 2\nf 2 4 3\n')
+    return path
+
+
+@pytest.fixture(autouse=True)
+def clean_cache():
+    body_cache.clear()
+    yield
+    body_cache.clear()
+
+
+def test_floor_shift():
+    assert body_cache.floor_shift([[0, -2.5, 0], [0, 1, 0]]) == 2.5
+    assert body_cache.floor_shift([[0, 0.5, 0], [0, 1, 0]]) == 0.0
+
+
+def test_from_obj_places_body_on_floor(tmp_path):
+    body = body_cache.BodyData.from_obj(_write_body(tmp_path / 'body.obj', min_y=-1.5), scale=2.)
+    assert body.shift_y == pytest.approx(3.)
+    assert body.vertices[:, 1].min() == pytest.approx(0.)
+
+
+def test_process_cache_reuses_bodies(tmp_path):
+    path = _write_body(tmp_path / 'body.obj')
+    body = body_cache.load_body(path)
+    assert body_cache.load_body(path) is body
+    assert body_cache.load_body(path, scale=2.) is not body
+
+
+def test_key_depends_on_settings_and_contents(tmp_path):
+    path = _write_body(tmp_path / 'body.obj')
+    key = body_cache.body_key(path)
+    assert body_cache.body_key(path, smoothing_step_size=0.1, smoothing_num_steps=10) != key
+
+    _write_body(path, min_y=-3.)
+    assert body_cache.body_key(path) != key
+
+
+def test_lru_eviction_releases_colliders(tmp_path):
+    paths = [_write_body(tmp_path / f'body_{i}.obj', min_y=-i) for i in range(3)]
+    first = body_cache.load_body(paths[0], max_bodies=2)
+    collider = SimpleNamespace(mesh='warp mesh')
+    first._collider_mesh = collider
+
+    body_cache.load_body(paths[1], max_bodies=2)
+    body_cache.load_body(paths[0], max_bodies=2)   # Most recently used again
+    body_cache.load_body(paths[2], max_bodies=2)   # Evicts paths[1]
+    assert len(body_cache._bodies) == 2
+    assert body_cache.load_body(paths[0], max_bodies=2) is first
+
+    body_cache.load_body(paths[1], max_bodies=1)
+    assert list(body_cache._bodies.values()) != [first]
+    assert first._collider_mesh is None and collider.mesh is None
+
+
+def test_disk_cache_roundtrip(tmp_path):
+    path = _write_body(tmp_path / 'body.obj')
+    body = body_cache.load_body(path, cache_path=tmp_path / 'cache')
+    assert len(list((tmp_path / 'cache').glob('*.npz'))) == 1
+
+    body_cache.clear()
+    restored = body_cache.load_body(path, cache_path=tmp_path / 'cache')
+    assert restored is not body
+    np.testing.assert_array_equal(restored.vertices, body.vertices)
+    np.testing.assert_array_equal(restored.faces, body.faces)
+    assert restored.shift_y == body.shift_y
+
+
+def test_cloth_body_uses_sim_smoothing_settings(monkeypatch, tmp_path):
+    from pygarment.meshgen.garment import Cloth
+    from pygarment.meshgen.sim_config import SimConfig
+
+    calls = []
+    monkeypatch.setattr(body_cache, 'load_body', lambda *args, **kwargs: calls.append((args, kwargs)))
+    paths = SimpleNamespace(in_body_obj=tmp_path / 'body.obj')
+
+    config = SimConfig(dict(options=dict(enable_body_smoothing=True, smoothing_num_steps=10), material={}))
+    Cloth.load_body(paths, config)
+    assert calls[-1][1]['smoothing_num_steps'] == 10
+    assert calls[-1][1]['smoothing_step_size'] == pytest.approx(0.1)
+
+    config = SimConfig(dict(options=dict(enable_body_smoothing=False), material={}))
+    Cloth.load_body(paths, config)
+    assert calls[-1][1]['smoothing_num_steps'] == 0
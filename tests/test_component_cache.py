@@ -0,0 +1,54 @@
+"""Memoized construction of garment components (pygarment.garmentcode.component_cache)"""
+from copy import deepcopy
+import json
+import random
+
+import pytest
+
+import pygarment as pyg
+from assets.bodies.body_params import BodyParameters
+from assets.garment_programs.meta_garment import MetaGarment
+
+BODIES = ['mean_all', 'mean_female', 'f_smpl_average_A40']
+
+
+@pytest.fixture
+def component_cache():
+    pyg.component_cache.clear()
+    yield pyg.component_cache
+    pyg.component_cache.disable()
+    pyg.component_cache.clear()
+
+
+def _build(design, body):
+    """Serialized pattern of the garment (or the error it raised) and the design parameters it read"""
+    tracker = pyg.DesignUsageTracker(deepcopy(design))
+    try:
+        spec = MetaGarment('garment', body, tracker).assembly().pattern
+        spec['stitches'] = sorted(json.dumps(stitch, sort_keys=True, default=str) for stitch in spec['stitches'])
+        result = json.dumps(spec, sort_keys=True, default=str)
+    except BaseException as e:
+        result = f'{type(e).__name__}: {e}'
+    return result, pyg.canonical_design(design, tracker.used)
+
+
+@pytest.mark.parametrize('seed', [0, 1])
+def test_cached_assembly_matches_uncached(seed, component_cache):
+    rng = random.Random(seed)
+    bodies = [BodyParameters(f'./assets/bodies/{name}.yaml') for name in BODIES]
+    # Slightly different body to refit the designs to
+    bodies.append(BodyParameters(f'./assets/bodies/{BODIES[0]}.yaml'))
+    bodies[-1]['waist'] *= 1 + rng.uniform(-0.1, 0.1)
+
+    sampler = pyg.DesignSampler('./assets/design_params/default.yaml')
+    random.seed(seed)
+    designs = [sampler.randomize() for _ in range(4)]
+    jobs = [(design, body) for design in designs for body in bodies]
+    rng.shuffle(jobs)
+
+    expected = [_build(design, body) for design, body in jobs]
+    component_cache.enable()
+    assert [_build(design, body) for design, body in jobs] == expected
+    # Warm cache: every component is restored
+    assert [_build(design, body) for design, body in jobs] == expected
+    assert component_cache.hits > 0
@@ -0,0 +1,75 @@
+"""Indexed stats lists of dataset properties (pygarment.data_config.Properties)"""
+from pygarment.data_config import Properties
+
+
+def _props():
+    props = Properties()
+    props.set_section_stats('sim', processed=['a', 'b'])
+    return props
+
+
+def test_indexed_updates():
+    props = _props()
+    assert props.in_stats_list('sim', 'processed', 'a')
+    props.add_to_stats_list('sim', 'processed', 'c')
+    assert props.stats_list_set('sim', 'processed') == {'a', 'b', 'c'}
+
+    assert props.pop_from_stats_list('sim', 'processed') == 'c'
+    assert not props.in_stats_list('sim', 'processed', 'c')
+    props.remove_from_stats_list('sim', 'processed', ['a'])
+    assert props.stats_list_set('sim', 'processed') == {'b'}
+    assert not props.in_stats_list('sim', 'missing', 'a')
+
+
+def test_index_is_updated_in_place():
+    props = _props()
+    index = props.stats_list_set('sim', 'processed')
+    for value in 'cde':
+        props.add_to_stats_list('sim', 'processed', value)
+    assert props.pop_from_stats_list('sim', 'processed') == 'e'
+    props.remove_from_stats_list('sim', 'processed', ['a'])
+    props.add_fail('sim', 'crashes', 'c')
+    assert props.has_fail('sim', 'crashes', 'c')
+
+    # Updates do not re-build the index
+    assert props.stats_list_set('sim', 'processed') == {'b', 'c', 'd'}
+    assert props.stats_list_set('sim', 'processed') is props._indexes[('sim', 'processed')][2]
+    assert props.stats_list_set('sim', 'processed') is not index   # Replaced list of remove()
+    index = props.stats_list_set('sim', 'processed')
+    props.add_to_stats_list('sim', 'processed', 'f')
+    assert props.stats_list_set('sim', 'processed') is index
+
+
+def test_pop_repeated_value():
+    props = _props()
+    props.add_to_stats_list('sim', 'processed', 'a')
+    assert props.pop_from_stats_list('sim', 'processed') == 'a'
+    assert props.in_stats_list('sim', 'processed', 'a')
+    assert props.pop_from_stats_list('sim', 'processed') == 'b'
+    assert props.stats_list_set('sim', 'processed') == {'a'}
+
+
+def test_index_follows_direct_edits():
+    props = _props()
+    processed = props['sim']['stats']['processed']
+    assert props.in_stats_list('sim', 'processed', 'b')
+
+    # Edits changing the list length
+    processed.append('x')
+    assert props.in_stats_list('sim', 'processed', 'x')
+    processed.remove('b')
+    assert props.stats_list_set('sim', 'processed') == {'a', 'x'}
+
+    # Replaced list
+    props['sim']['stats']['processed'] = ['z']
+    assert props.stats_list_set('sim', 'processed') == {'z'}
+
+
+def test_fails_index():
+    props = _props()
+    props.add_fail('sim', 'crashes', 'a')
+    assert props.has_fail('sim', 'crashes', 'a')
+    assert props.is_fail('a') and not props.is_fail('b')
+
+    props['sim']['stats']['fails']['crashes'] = ['b']
+    assert props.has_fail('sim', 'crashes', 'b') and not props.has_fail('sim', 'crashes', 'a')
@@ -0,0 +1,52 @@
+"""Incrementally written dataset manifests (pygarment.data_manifest)"""
+import numpy as np
+
+from pygarment.data_manifest import DatasetManifest
+
+
+def _element(root, name):
+    folder = root / name
+    folder.mkdir(parents=True)
+    (folder / f'{name}_pattern.png').write_text(name)
+    (folder / f'{name}_specification.json').write_text('{}')
+    return folder
+
+
+def test_latest_entry_wins_and_survives_reload(tmp_path):
+    manifest = DatasetManifest(tmp_path)
+    assert not manifest.exists()
+    manifest.add_folder('a', _element(tmp_path, 'a'), stats={'time': np.float32(1.5)})
+    manifest.add('b', status='crashes')
+    manifest.add('b', status='ok')
+    with open(manifest.path, 'a') as f:
+        f.write('{"name": "c", "sta')   # Partially written on crash
+
+    reloaded = DatasetManifest(tmp_path)
+    assert reloaded.names() == ['a', 'b']
+    assert reloaded.names(status='ok') == ['a', 'b']
+    entry = reloaded.entries()['a']
+    assert entry['folder'] == 'a'
+    assert entry['files'] == ['a_pattern.png', 'a_specification.json']
+    assert entry['stats'] == {'time': 1.5}
+
+    # Loaded entries are kept up to date
+    reloaded.add('a', status='self_intersection')
+    assert reloaded.names(status='ok') == ['b']
+
+    # Entries added after the partially written line are not lost
+    assert DatasetManifest(tmp_path).entries()['a']['status'] == 'self_intersection'
+
+
+def test_files_and_gallery(tmp_path):
+    manifest = DatasetManifest(tmp_path / 'data')
+    for name in ['a', 'b']:
+        manifest.add_folder(name, _element(tmp_path / 'data', name))
+    manifest.add('c', status='crashes')
+
+    pngs = manifest.files(lambda f: f.endswith('.png'))
+    assert sorted(p.name for p in pngs) == ['a_pattern.png', 'b_pattern.png']
+
+    for mode in ['copy', 'hardlink', 'symlink']:
+        out = manifest.gallery(tmp_path / mode, lambda f: f.endswith('.png'), mode=mode)
+        assert sorted(p.name for p in out.iterdir()) == ['a_pattern.png', 'b_pattern.png']
+        assert (out / 'a_pattern.png').read_text() == 'a'
@@ -0,0 +1,71 @@
+"""Sharded storage of the simulated dataset (pygarment.meshgen.dataset_shards)"""
+import tarfile
+
+from pygarment.meshgen.dataset_shards import INDEX_FILE, ShardReader, ShardWriter, shard_file_name
+
+
+def _garment(root, name, size=100):
+    folder = root / 'out' / name
+    (folder / 'sub').mkdir(parents=True)
+    (folder / f'{name}_sim.obj').write_bytes(name.encode() * size)
+    (folder / 'sub' / 'render.png').write_bytes(bytes(range(256)) * 3)
+    (folder / 'empty.txt').write_bytes(b'')
+    return folder
+
+
+def _tar_members(path):
+    with tarfile.open(path) as tar:
+        return {m.name: tar.extractfile(m).read() for m in tar.getmembers()}
+
+
+def test_offsets_point_to_file_contents(tmp_path):
+    writer = ShardWriter(tmp_path / 'shards')
+    for name in ['a', 'b']:
+        writer.add(name, _garment(tmp_path, name))
+
+    with ShardReader(tmp_path / 'shards') as reader:
+        assert reader.names() == ['a', 'b']
+        assert sorted(reader.files('a')) == ['a_sim.obj', 'empty.txt', 'sub/render.png']
+        assert reader.read('b', 'b_sim.obj') == b'b' * 100
+        assert reader.read('a', 'sub/render.png') == bytes(range(256)) * 3
+        assert reader.read('a', 'empty.txt') == b''
+        assert [name for name, _ in reader.stream(files=['.obj'])] == ['a', 'b']
+
+    # Shards are regular tar archives
+    members = _tar_members(tmp_path / 'shards' / shard_file_name(0))
+    assert members['b/b_sim.obj'] == b'b' * 100
+    assert len(members) == 6
+
+
+def test_interrupted_write_is_truncated(tmp_path):
+    writer = ShardWriter(tmp_path / 'shards')
+    writer.add('a', _garment(tmp_path, 'a'))
+    shard = tmp_path / 'shards' / shard_file_name(0)
+
+    # Data of a garment written without its index entry, and a partially written index line
+    with open(shard, 'ab') as f:
+        f.write(b'x' * 5000)
+    with open(tmp_path / 'shards' / INDEX_FILE, 'a') as f:
+        f.write('{"name": "c", "sha')
+
+    writer = ShardWriter(tmp_path / 'shards')
+    writer.add('b', _garment(tmp_path, 'b'))
+
+    assert set(_tar_members(shard)) == {
+        'a/a_sim.obj', 'a/empty.txt', 'a/sub/render.png', 'b/b_sim.obj', 'b/empty.txt', 'b/sub/render.png'}
+    with ShardReader(tmp_path / 'shards') as reader:
+        assert reader.names() == ['a', 'b']
+        assert reader.read('a', 'a_sim.obj') == b'a' * 100
+
+
+def test_new_shard_after_size_limit(tmp_path):
+    writer = ShardWriter(tmp_path / 'shards', shard_size_mb=2000 / 1024 ** 2)
+    for name in ['a', 'b', 'c']:
+        writer.add(name, _garment(tmp_path, name, size=3000))
+
+    with ShardReader(tmp_path / 'shards') as reader:
+        assert [reader.entries[n]['shard'] for n in ['a', 'b', 'c']] == [0, 1, 2]
+        assert reader.read('c', 'c_sim.obj') == b'c' * 3000
+
+        reader.extract('b', tmp_path / 'extracted')
+    assert (tmp_path / 'extracted' / 'b' / 'sub' / 'render.png').read_bytes() == bytes(range(256)) * 3
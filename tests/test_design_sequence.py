@@ -0,0 +1,41 @@
+"""Low-discrepancy design sequences (pygarment.garmentcode.params.DesignSequence)"""
+import numpy as np
+import pytest
+
+from pygarment.garmentcode.params import DesignBatchSampler, DesignSequence
+
+PARAMS = {
+    'length': {'v': 0.5, 'type': 'float', 'range': [0., 1.]},
+    'width': {'v': 0.2, 'type': 'float', 'range': [0., 1.]},
+    'style': {'v': 'a', 'type': 'select', 'range': ['a', 'b', 'c']},
+}
+SIZE = 16
+
+
+def _strata(points):
+    """Number of distinct strata of the size of the points block per dimension"""
+    return [len(np.unique(np.floor(points[:, d] * len(points)))) for d in range(points.shape[1])]
+
+
+@pytest.mark.parametrize('method', ['sobol', 'lhs'])
+def test_retries_continue_the_sequence(method):
+    sequence = DesignSequence(DesignBatchSampler(PARAMS), method, size=SIZE, seed=3)
+    assert sequence.index(5) == 5 and sequence.index(5, attempt=2) == 5 + 2 * SIZE
+
+    # Every block of re-tries covers the space as evenly as the first attempts
+    for attempt in range(3):
+        block = np.array([sequence.point(sequence.index(i, attempt)) for i in range(SIZE)])
+        assert _strata(block) == [SIZE] * block.shape[1]
+
+    # Different points for different attempts, reproducible in any access order
+    fresh = DesignSequence(DesignBatchSampler(PARAMS), method, size=SIZE, seed=3)
+    retry = fresh.design(7, attempt=1)
+    assert retry == sequence.design(7, attempt=1)
+    assert retry != sequence.design(7)
+
+
+def test_retries_require_size():
+    sequence = DesignSequence(DesignBatchSampler(PARAMS), 'sobol', seed=3)
+    sequence.design(3)
+    with pytest.raises(ValueError):
+        sequence.design(3, attempt=1)
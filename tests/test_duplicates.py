@@ -0,0 +1,54 @@
+"""Detection of duplicated designs (pygarment.garmentcode.params, datasim_utils._skip_duplicates)"""
+from copy import deepcopy
+
+import pytest
+
+from pygarment.garmentcode.params import DesignUsageTracker, canonical_design, design_hash
+
+DESIGN = {
+    'skirt': {'length': {'v': 0.5}, 'flare': {'v': 0.1}},
+    'collar': {'depth': {'v': 0.2}},
+}
+
+
+def _program(design):
+    """Reads a subset of the design and extends its copy, 
+        which is copied again by a sub-component (like bodice.py does with strapless depths)
+    """
+    design = deepcopy(design)
+    design['collar']['strapless_depth'] = {'v': design['collar']['depth']['v']}
+    component_design = deepcopy(design)
+    return design['skirt']['length']['v'] + component_design['collar']['strapless_depth']['v']
+
+
+def test_canonical_design_skips_params_added_by_program():
+    tracker = DesignUsageTracker(DESIGN)
+    _program(tracker)
+    assert ('collar', 'strapless_depth') in tracker.used
+
+    canonical = canonical_design(DESIGN, tracker.used)
+    assert canonical == {'skirt': {'length': 0.5}, 'collar': {'depth': 0.2}}
+
+    # Unused parameters do not affect the hash
+    other = deepcopy(DESIGN)
+    other['skirt']['flare']['v'] = 0.3
+    assert design_hash(canonical_design(other, tracker.used)) == design_hash(canonical)
+
+
+def test_skipped_duplicates_have_own_section(tmp_path):
+    pytest.importorskip('igl')
+    pytest.importorskip('warp.sim')
+    from pygarment.data_config import Properties
+    from pygarment.meshgen.datasim_utils import _BatchProgress, _skip_duplicates, init_sim_props
+    from pygarment.meshgen.sim_journal import SimJournal
+
+    props = Properties()
+    props.set_section_stats('generator', duplicates={'b': 'a', 'c': 'missing'})
+    init_sim_props(props, batch_run=True)
+    progress = _BatchProgress(props, tmp_path / 'props.yaml', SimJournal(tmp_path / 'journal.jsonl'))
+
+    assert _skip_duplicates(props, ['a', 'b', 'c'], progress) == ['a', 'c']
+    assert props['duplicates']['stats']['duplicate_of'] == {'b': 'a'}
+    assert 'duplicate_of' not in props['sim']['stats']
+    assert props.in_stats_list('sim', 'processed', 'b')
+    props.stats_summary()
@@ -0,0 +1,37 @@
+"""Quadratic curve fitting in pygarment.garmentcode.edge_factory"""
+import numpy as np
+import pytest
+
+import pygarment.garmentcode.edge_factory as edge_factory
+from pygarment.garmentcode.edge_factory import CurveEdgeFactory
+
+
+def _unit(angle):
+    return np.array([np.cos(angle), np.sin(angle)])
+
+
+@pytest.mark.parametrize('angles', [(0.3, -0.4), (-0.2, 0.5), (0.8, -0.1), (-1., 1.2)])
+def test_two_tangents_match_optimization(angles):
+    tan0, tan1 = _unit(angles[0]), _unit(angles[1])
+    cp = edge_factory._solve_tangents(tan0, tan1)
+    assert cp is not None
+    np.testing.assert_allclose(cp, edge_factory._optimize_tangents(tan0, tan1), atol=1e-4)
+
+
+@pytest.mark.parametrize('tangents', [
+    (_unit(0.2), _unit(0.2)),     # parallel
+    (_unit(0.3), _unit(0.4)),     # diverging
+    (_unit(0.3), None),           # single tangent
+    (None, _unit(-0.5)),
+])
+def test_optimization_fallback(tangents):
+    assert edge_factory._solve_tangents(*tangents) is None
+
+
+@pytest.mark.parametrize('initial_guess', [None, [0.3, 0.1], [0.7, -0.2]])
+def test_single_tangent_keeps_optimized_curve(initial_guess):
+    start, end = [0, 0], [40, 10]
+    edge = CurveEdgeFactory.curve_from_tangents(start, end, target_tan0=[1, 1], initial_guess=initial_guess)
+    rel_tan0 = edge_factory.abs_to_rel_2d(start, end, [1, 1], as_vector=True)
+    expected = edge_factory._optimize_tangents(rel_tan0 / np.linalg.norm(rel_tan0), None, initial_guess)
+    np.testing.assert_allclose(edge.control_points[0], expected)
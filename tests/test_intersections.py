@@ -0,0 +1,136 @@
+"""Self-intersections of the panel edges (pygarment.pattern.intersections)"""
+import numpy as np
+import pytest
+import svgpathtools as svgpath
+
+from pygarment.pattern import core, intersections
+from pygarment.pattern.wrappers import VisPattern
+
+
+def _pairwise_intersections(curves):
+    """Reference: svgpath checks of all the pairs"""
+    found = []
+    for i1 in range(len(curves)):
+        for i2 in range(i1 + 1, len(curves)):
+            intersect_t = curves[i1].intersect(curves[i2])
+            if any(not intersections._is_vertex_contact(t1, t2) for t1, t2 in intersect_t):
+                found.append((i1, i2))
+    return found
+
+
+def _random_loop(rng, n_edges, curved=0.3):
+    """Closed loop of random straight and curved edges"""
+    vertices = rng.uniform(0, 100, n_edges) + 1j*rng.uniform(0, 100, n_edges)
+    curves = []
+    for start, end in zip(vertices, np.roll(vertices, -1)):
+        if rng.uniform() < curved:
+            cps = rng.uniform(0, 100, 2) + 1j*rng.uniform(0, 100, 2)
+            curves.append(svgpath.CubicBezier(start, *cps, end))
+        else:
+            curves.append(svgpath.Line(start, end))
+    return curves
+
+
+@pytest.mark.parametrize('seed', range(10))
+def test_matches_pairwise_svgpath(seed):
+    rng = np.random.default_rng(seed)
+    curves = _random_loop(rng, n_edges=rng.integers(3, 30))
+    expected = _pairwise_intersections(curves)
+
+    assert intersections.self_intersections(curves) == expected
+    first = intersections.self_intersections(curves, first_only=True)
+    assert len(first) == min(1, len(expected)) and set(first) <= set(expected)
+
+
+def test_simple_polygon():
+    square = [0, 10, 10 + 10j, 10j]
+    curves = [svgpath.Line(s, e) for s, e in zip(square, np.roll(square, -1))]
+    assert intersections.self_intersections(curves) == []
+
+    bowtie = [0, 10 + 10j, 10, 10j]
+    curves = [svgpath.Line(s, e) for s, e in zip(bowtie, np.roll(bowtie, -1))]
+    assert intersections.self_intersections(curves) == [(0, 2)]
+
+
+def test_overlapping_pairs():
+    bboxes = np.array([
+        [0, 1, 0, 1],
+        [1, 2, 1, 2],     # Touches the first one at a corner
+        [0.5, 3, 5, 6],   # Overlaps in X only
+        [5, 6, 5, 6],
+    ])
+    expected = [(i1, i2) for i1 in range(len(bboxes)) for i2 in range(i1 + 1, len(bboxes))
+                if (bboxes[i1, 0] <= bboxes[i2, 1] and bboxes[i2, 0] <= bboxes[i1, 1]
+                    and bboxes[i1, 2] <= bboxes[i2, 3] and bboxes[i2, 2] <= bboxes[i1, 3])]
+    assert intersections.overlapping_pairs(bboxes) == expected == [(0, 1)]
+
+
+def test_line_intersections_match_svgpath():
+    rng = np.random.default_rng(0)
+    starts1, ends1, starts2, ends2 = rng.uniform(0, 10, size=(4, 200, 2))
+    t1, t2 = intersections.line_intersections(starts1, ends1, starts2, ends2)
+    for k in range(200):
+        line1 = svgpath.Line(complex(*starts1[k]), complex(*ends1[k]))
+        line2 = svgpath.Line(complex(*starts2[k]), complex(*ends2[k]))
+        expected = line1.intersect(line2)
+        if expected:
+            assert (t1[k], t2[k]) == pytest.approx(expected[0])
+        else:
+            assert np.isnan(t1[k]) and np.isnan(t2[k])
+
+
+@pytest.mark.parametrize('curves', [
+    [svgpath.Line(0, 10), svgpath.Line(10, 10 + 10j), svgpath.Line(5, 5)],   # Zero-length edge
+    [svgpath.Line(0, 10), svgpath.Line(10, 10 + 10j), svgpath.Line(0, 10)],  # Repeated edge
+])
+def test_degenerate_segments(curves):
+    with pytest.raises(AssertionError):
+        _pairwise_intersections(curves)
+    with pytest.raises(AssertionError):
+        intersections.self_intersections(curves)
+
+
+# ---- Patterns ----
+def _pattern(vertices, curvature=None):
+    pattern = VisPattern()
+    edges = [{'endpoints': [i, (i + 1) % len(vertices)]} for i in range(len(vertices))]
+    if curvature is not None:
+        edges[0]['curvature'] = curvature
+    pattern.pattern['panels']['panel'] = {
+        'vertices': vertices, 'edges': edges,
+        'translation': [0, 0, 0], 'rotation': [0, 0, 0]}
+    return pattern
+
+
+def test_pattern_self_intersections():
+    pattern = _pattern([[0, 0], [10, 0], [10, 10], [0, 10]])
+    assert not pattern.is_self_intersecting()
+    assert pattern.self_intersections() == {}
+
+    # Moving a vertex makes the panel a bow-tie
+    pattern.pattern['panels']['panel']['vertices'][1] = [10, 10]
+    pattern.pattern['panels']['panel']['vertices'][2] = [10, 0]
+    assert pattern.is_self_intersecting()
+    assert pattern.self_intersections() == {'panel': [(0, 2)]}
+
+    # Curved edge crossing the opposite one
+    pattern = _pattern([[0, 0], [10, 0], [10, 10], [0, 10]], curvature=[0.5, -2.5])
+    assert pattern.self_intersections() == {'panel': [(0, 2)]}
+
+
+def test_segments_cache_reset(monkeypatch):
+    monkeypatch.setattr(core, 'SEGMENTS_CACHE_SIZE', 5)
+    pattern = _pattern([[0, 0], [10, 0], [10, 10], [0, 10]])
+    assert pattern._segments_cache == {}
+
+    pattern.is_self_intersecting()
+    assert len(pattern._segments_cache) == 4
+    pattern.is_self_intersecting()   # Re-used
+    assert len(pattern._segments_cache) == 4
+
+    # Two edges changed: cache exceeds the limit and is reset
+    pattern.pattern['panels']['panel']['vertices'][2] = [12, 12]
+    for _ in range(3):
+        assert not pattern.is_self_intersecting()
+        assert len(pattern._segments_cache) <= core.SEGMENTS_CACHE_SIZE + 1
+    assert (10, 0, 10, 10, 'None', 10) not in pattern._segments_cache
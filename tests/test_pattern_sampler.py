@@ -0,0 +1,41 @@
+"""Parallel sample generation of pattern_sampler.py"""
+import os
+from pathlib import Path
+
+import pytest
+
+pattern_sampler = pytest.importorskip('pattern_sampler')
+
+
+def _flaky_sample(task):
+    """Crashes the worker on the first task['crashes'] tries of the sample"""
+    tries = Path(task['folder']) / f'{task["sample_id"]}.tries'
+    count = int(tries.read_text()) if tries.exists() else 0
+    tries.write_text(str(count + 1))
+    if count < task['crashes']:
+        os._exit(1)
+    return dict(name=f'sample_{task["sample_id"]}', attempts=[dict(name='x', check='ok', time=1.)])
+
+
+def test_failed_workers_are_retried_and_recorded(tmp_path):
+    crashes = {0: 0, 1: 1, 2: 5, 3: 0}
+    tasks = [(i, dict(sample_id=i, folder=str(tmp_path), crashes=c)) for i, c in crashes.items()]
+
+    results = list(pattern_sampler._sample_results(tasks, 2, task_fn=_flaky_sample, max_retries=2))
+
+    assert [sample_id for sample_id, _ in results] == [0, 1, 2, 3]
+    results = dict(results)
+    assert results[0]['name'] == 'sample_0' and len(results[0]['attempts']) == 1
+
+    # Re-tried after the crash
+    assert results[1]['name'] == 'sample_1'
+    assert [r['check'] for r in results[1]['attempts']] == ['crash', 'ok']
+
+    # Permanent failure is reported in the attempts
+    assert results[2]['name'] is None
+    assert [r['check'] for r in results[2]['attempts']] == ['crash'] * 3
+    assert (tmp_path / '2.tries').read_text() == '3'
+
+    gen_stats = {}
+    pattern_sampler.add_attempt_stats(gen_stats, results[2]['attempts'])
+    assert gen_stats['attempts']['rejected']['crash']['count'] == 3
@@ -0,0 +1,74 @@
+"""Writing simulated frames over the box mesh obj (pygarment.meshgen.garment.Cloth.save_frame)"""
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+import trimesh
+
+pytest.importorskip('igl')
+pytest.importorskip('warp.sim')
+from pygarment.meshgen.garment import Cloth, VertexConnectivity
+
+BOXMESH = '''mtllib material.mtl
+v 0 0 0
+v 1 0 0
+v 0 1 0
+v 1 1 0
+vt 0 0
+vt 1 1
+vn 0 0 1
+vn 0 0 1
+vn 0 0 1
+vn 0 0 1
+usemtl fabric
+f 1/1/1 2/2/2 3/1/3
+f 2/1/2 4/2/4 3/2/3
+'''
+
+
+def _cloth(tmp_path, verts):
+    (tmp_path / 'boxmesh.obj').write_text(BOXMESH)
+    cloth = Cloth.__new__(Cloth)
+    cloth.paths = SimpleNamespace(g_box_mesh=tmp_path / 'boxmesh.obj', g_sim=tmp_path / 'sim.obj')
+    cloth.current_verts = verts
+    cloth.v_cloth_init = verts
+    cloth.f_cloth = np.array([[0, 1, 2], [1, 3, 2]])
+    cloth.vert_connectivity = VertexConnectivity.from_faces(len(verts), cloth.f_cloth)
+    return cloth
+
+
+def test_save_frame_round_trips_vertices(tmp_path):
+    verts = (np.random.default_rng(0).normal(size=(4, 3)) * 100).astype(np.float32)
+    cloth = _cloth(tmp_path, verts)
+    cloth.save_frame(save_v_norms=True)
+
+    lines = (tmp_path / 'sim.obj').read_text().splitlines()
+    saved = np.array([line.split()[1:] for line in lines if line.startswith('v ')], dtype=np.float32)
+    assert np.array_equal(saved, verts)
+
+    # Everything except vertices and normals is kept as is
+    keep = [line for line in BOXMESH.splitlines() if not line.startswith(('v ', 'vn '))]
+    assert [line for line in lines if not line.startswith(('v ', 'vn '))] == keep
+    assert sum(line.startswith('vn ') for line in lines) == 4
+
+
+def test_save_frame_ply(tmp_path):
+    verts = (np.random.default_rng(1).normal(size=(4, 3)) * 100).astype(np.float32)
+    cloth = _cloth(tmp_path, verts)
+    cloth.save_frame(ply_path=tmp_path / 'sim.ply')
+    assert (tmp_path / 'sim.obj').exists()
+
+    data = (tmp_path / 'sim.ply').read_bytes()
+    header, body = data.split(b'end_header\n', 1)
+    assert b'format binary_little_endian 1.0' in header
+    assert b'element vertex 4' in header and b'element face 2' in header
+
+    saved_verts = np.frombuffer(body[:4 * 3 * 4], dtype='<f4').reshape(-1, 3)
+    assert np.array_equal(saved_verts, verts)
+    faces = np.frombuffer(body[4 * 3 * 4:], dtype=[('count', 'u1'), ('ids', '<i4', (3,))])
+    assert (faces['count'] == 3).all()
+    assert np.array_equal(faces['ids'], cloth.f_cloth)
+
+    # Readable by standard tools
+    mesh = trimesh.load(tmp_path / 'sim.ply', process=False)
+    assert np.array_equal(mesh.vertices, verts) and np.array_equal(mesh.faces, cloth.f_cloth)
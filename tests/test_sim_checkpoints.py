@@ -0,0 +1,95 @@
+"""Resuming of the simulation from checkpoints (pygarment.meshgen.simulation.run_sim)"""
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+pytest.importorskip('warp.sim')
+import pygarment.meshgen.simulation as simulation
+from pygarment.meshgen.garment import Cloth
+from pygarment.data_config import Properties
+
+
+@pytest.fixture
+def paths(tmp_path):
+    files = {}
+    for name in ['spec.json', 'box_mesh.obj', 'body.obj']:
+        files[name] = tmp_path / name
+        files[name].write_text(name)
+    return SimpleNamespace(
+        in_g_spec=files['spec.json'], g_box_mesh=files['box_mesh.obj'], in_body_obj=files['body.obj'],
+        g_sim_checkpoint=tmp_path / 'g_sim_checkpoint.npz',
+        g_sim_telemetry=tmp_path / 'g_sim_telemetry.npz')
+
+
+def _props(**config):
+    props = Properties()
+    props.properties = {'sim': {
+        'config': dict(dict(options={}, material={}, checkpoint_frames=10), **config),
+        'stats': {'sim_time': {}, 'spf': {}, 'fin_frame': {}}}}
+    return props
+
+
+class FakeCloth:
+    """Records the checkpoint calls instead of simulating"""
+    def __init__(self, name, config, paths, caching=False):
+        self.name, self.frame, self.telemetry = name, 0, None
+        self.loaded_with = None
+
+    def load_checkpoint(self, path, fingerprint=None):
+        self.loaded_with = fingerprint
+        self.frame = 41
+        return 100.
+
+    def save_frame(self, save_v_norms=False, ply_path=None):
+        pass
+
+
+@pytest.fixture
+def fake_sim(monkeypatch):
+    calls = []
+
+    def timeout(garment, config, store_usd=False, verbose=False, **kwargs):
+        calls.append(dict(kwargs, garment=garment))
+        raise simulation.SimTimeOutError
+
+    monkeypatch.setattr(simulation, 'Cloth', FakeCloth)
+    monkeypatch.setattr(simulation, 'sim_frame_sequence', timeout)
+    return calls
+
+
+def test_fingerprint_tracks_inputs(paths):
+    config = _props()['sim']['config']
+    fingerprint = simulation.checkpoint_fingerprint(paths, config)
+    assert simulation.checkpoint_fingerprint(paths, config) == fingerprint
+    assert simulation.checkpoint_fingerprint(paths, dict(config, max_sim_time=10)) != fingerprint
+
+    paths.g_box_mesh.write_text('regenerated box mesh')
+    assert simulation.checkpoint_fingerprint(paths, config) != fingerprint
+
+
+def test_resume_and_drop_after_timeout(paths, fake_sim):
+    paths.g_sim_checkpoint.write_bytes(b'checkpoint')
+    props = _props()
+    simulation.run_sim('g', props, paths, render=False)
+
+    call = fake_sim[0]
+    assert call['start_frame'] == 42 and call['prev_sim_time'] == 100.
+    assert call['garment'].loaded_with == call['fingerprint']
+    assert call['fingerprint'] == simulation.checkpoint_fingerprint(paths, props['sim']['config'])
+
+    # Timed out simulation is not resumed with the spent time on the next run
+    assert props['sim']['stats']['fails']['simulation_timeout'] == ['g']
+    assert not paths.g_sim_checkpoint.exists()
+
+
+def test_no_checkpoints_when_disabled(paths, fake_sim):
+    simulation.run_sim('g', _props(checkpoint_frames=None), paths, render=False)
+    assert fake_sim[0]['checkpoint_path'] is None and fake_sim[0]['start_frame'] == 0
+
+
+def test_checkpoint_of_other_inputs_is_ignored(tmp_path):
+    path = tmp_path / 'checkpoint.npz'
+    np.savez(path, particle_q=np.zeros((3, 3)), fingerprint='old inputs')
+    garment = SimpleNamespace(name='g', current_verts=np.zeros((3, 3)))
+    assert Cloth.load_checkpoint(garment, path, fingerprint='new inputs') is None
@@ -0,0 +1,77 @@
+"""Append-only journal of dataset simulation progress (pygarment.meshgen.sim_journal)"""
+import pytest
+
+from pygarment.meshgen.sim_journal import SimJournal
+
+
+def _stats(name, sim_time=1.):
+    return {'sim': {'sim_time': {name: sim_time}, 'fails': {}}}
+
+
+def test_events_and_offsets(tmp_path):
+    journal = SimJournal(tmp_path / 'journal.jsonl')
+    assert not journal.exists()
+    journal.start('a')
+    journal.finish('a', _stats('a'))
+    journal.start('b')
+    assert len(journal) == 3
+
+    events = [(r['event'], r['name']) for r in journal.read()]
+    assert events == [('start', 'a'), ('finish', 'a'), ('start', 'b')]
+    assert [r['name'] for r in journal.read(offset=2)] == ['b']
+    assert journal.in_progress() == {'b': 1}
+
+    # Re-opened journal continues counting
+    journal = SimJournal(tmp_path / 'journal.jsonl')
+    journal.start('b')
+    assert len(journal) == 4
+    assert journal.in_progress() == {'b': 2}
+
+
+def test_partially_written_line_is_skipped(tmp_path):
+    path = tmp_path / 'journal.jsonl'
+    journal = SimJournal(path)
+    journal.finish('a', _stats('a'))
+    with open(path, 'a') as f:
+        f.write('{"event": "fin')   # Interrupted write
+
+    journal = SimJournal(path)
+    assert len(journal) == 2
+    journal.start('b')
+    assert [r['name'] for r in journal.read()] == ['a', 'b']
+
+
+def test_replay_restores_stats_and_detects_crashes(tmp_path):
+    pytest.importorskip('igl')
+    pytest.importorskip('warp.sim')
+    from pygarment.data_config import Properties
+    from pygarment.meshgen.datasim_utils import _BatchProgress, init_sim_props
+
+    props_file = tmp_path / 'props.yaml'
+    journal = SimJournal(tmp_path / 'journal.jsonl')
+
+    def restart():
+        props = Properties(props_file) if props_file.exists() else Properties()
+        resume = init_sim_props(props, batch_run=True, detect_crash=False)
+        progress = _BatchProgress(props, props_file, SimJournal(journal.path), compact_every=100)
+        if resume:
+            progress.replay()
+        else:
+            progress.compact()
+        return props, progress
+
+    props, progress = restart()
+    progress.start('a')
+    progress.finish('a', _stats('a', 2.))
+    progress.start('b')   # Interrupted: not compacted, b not finished
+
+    props, progress = restart()
+    assert props['sim']['stats']['processed'] == ['a']
+    assert props['sim']['stats']['sim_time']['a'] == 2.
+    assert not props.has_fail('sim', 'crashes', 'b')   # First interruption -- b is re-tried
+
+    progress.start('b')   # Interrupted again
+
+    props, progress = restart()
+    assert props.has_fail('sim', 'crashes', 'b')
+    assert props['sim']['stats']['processed'] == ['a', 'b']
@@ -0,0 +1,128 @@
+"""Content-addressed cache of simulation results (pygarment.meshgen.sim_result_cache)"""
+import json
+import os
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip('igl')
+pytest.importorskip('warp.sim')
+from pygarment.data_config import Properties
+import pygarment.meshgen.sim_result_cache as sim_result_cache
+from pygarment.meshgen.sim_result_cache import SimResultCache
+
+SPEC = {'pattern': {'panels': {'front': {'vertices': [[0, 0], [1, 0], [0, 1]]}}}, 'properties': {'units_in_meter': 100}}
+
+
+def _paths(root, name, spec=SPEC, indent=None):
+    inputs = root / 'in' / name
+    inputs.mkdir(parents=True, exist_ok=True)
+    (inputs / f'{name}_specification.json').write_text(json.dumps(spec, indent=indent))
+    for file in ['body.obj', 'body.yaml', 'seg.json']:
+        if not (root / file).exists():
+            (root / file).write_text(file)
+    out = root / 'out' / name
+    out.mkdir(parents=True, exist_ok=True)
+    return SimpleNamespace(
+        in_g_spec=inputs / f'{name}_specification.json',
+        in_body_obj=root / 'body.obj', in_body_mes=root / 'body.yaml', body_seg=root / 'seg.json',
+        in_design_params=inputs / 'design_params.yaml',
+        out_el=out, sim_tag=name,
+        design_params=out / f'{name}_design_params.yaml', body_mes=out / f'{name}_body_measurements.yaml')
+
+
+def _props(**options):
+    props = Properties()
+    props.set_section_config('sim', options=dict(options), material={})
+    props.set_section_stats('sim', sim_time={}, fails={})
+    props.set_section_config('render', resolution=[10, 10])
+    props.set_section_stats('render', render_time={})
+    return props
+
+
+@pytest.fixture(autouse=True)
+def clean_counters():
+    sim_result_cache._stores.clear()
+
+
+def test_key_ignores_name_formatting_and_runtime_options(tmp_path):
+    cache = SimResultCache(tmp_path / 'cache')
+    key = cache.key(_paths(tmp_path, 'a'), _props())
+
+    assert cache.key(_paths(tmp_path, 'b', indent=2), _props()) == key
+    assert cache.key(_paths(tmp_path, 'c', spec=dict(SPEC, name='c')), _props()) == key
+    assert cache.key(_paths(tmp_path, 'a'), _props(checkpoint_frames=10, telemetry=True)) == key
+
+    assert cache.key(_paths(tmp_path, 'a'), _props(resolution_scale=2.)) != key
+    other = dict(SPEC, pattern={'panels': {}})
+    assert cache.key(_paths(tmp_path, 'd', spec=other), _props()) != key
+
+
+def test_store_and_restore_under_new_name(tmp_path):
+    cache = SimResultCache(tmp_path / 'cache')
+    paths, props = _paths(tmp_path, 'a'), _props()
+    (paths.out_el / 'a_sim.obj').write_text('v 0 0 0')
+    props['sim']['stats']['sim_time']['a'] = 3.
+    props.add_fail('sim', 'cloth_self_intersection', 'a')
+    key = cache.key(paths, props)
+    assert cache.store(key, paths, props, 'a')
+
+    new_paths, new_props = _paths(tmp_path, 'b'), _props()
+    assert cache.restore(key, new_paths, new_props, 'b')
+    assert (new_paths.out_el / 'b_sim.obj').read_text() == 'v 0 0 0'
+    assert new_props['sim']['stats']['sim_time'] == {'b': 3.}
+    assert new_props.has_fail('sim', 'cloth_self_intersection', 'b')
+
+    assert not cache.restore('missing', new_paths, new_props, 'b')
+
+
+def test_restore_renames_file_references(tmp_path):
+    cache = SimResultCache(tmp_path / 'cache')
+    paths, props = _paths(tmp_path, 'a'), _props()
+    (paths.out_el / 'a_sim.obj').write_text('mtllib a_material.mtl\nv 0 0 0\nusemtl uv_texture\n')
+    (paths.out_el / 'a_material.mtl').write_text('newmtl uv_texture\nmap_Kd a_texture.png\n')
+    (paths.out_el / 'a_texture.png').write_bytes(b'png')
+    (paths.out_el / 'a_specification.json').write_text(json.dumps(dict(SPEC, name='a')))
+    key = cache.key(paths, props)
+    assert cache.store(key, paths, props, 'a')
+
+    new_paths = _paths(tmp_path, 'b')
+    assert cache.restore(key, new_paths, _props(), 'b')
+    assert (new_paths.out_el / 'b_sim.obj').read_text() == 'mtllib b_material.mtl\nv 0 0 0\nusemtl uv_texture\n'
+    assert (new_paths.out_el / 'b_material.mtl').read_text() == 'newmtl uv_texture\nmap_Kd b_texture.png\n'
+    assert (new_paths.out_el / 'b_texture.png').read_bytes() == b'png'
+    assert json.loads((new_paths.out_el / 'b_specification.json').read_text())['name'] == 'b'
+
+    # Cached files are not modified
+    assert (cache.root / key / '{tag}_sim.obj').read_text().startswith('mtllib a_material.mtl')
+    assert cache.restore(key, paths, _props(), 'a')
+    assert (paths.out_el / 'a_material.mtl').read_text() == 'newmtl uv_texture\nmap_Kd a_texture.png\n'
+
+
+def test_crashes_are_not_stored(tmp_path):
+    cache = SimResultCache(tmp_path / 'cache')
+    paths, props = _paths(tmp_path, 'a'), _props()
+    props.add_fail('sim', 'crashes', 'a')
+    assert not cache.store(cache.key(paths, props), paths, props, 'a')
+    assert not any(cache.root.iterdir())
+
+
+def test_eviction_is_amortized_and_lru(tmp_path, monkeypatch):
+    monkeypatch.setattr(sim_result_cache, 'EVICT_EVERY', 3)
+    evictions = []
+    evict = SimResultCache.evict
+    monkeypatch.setattr(SimResultCache, 'evict', lambda self: evictions.append(1) or evict(self))
+
+    # Room for two entries
+    cache = SimResultCache(tmp_path / 'cache', max_size_gb=2500 / 1024 ** 3)
+    keys = []
+    for i in range(7):
+        paths, props = _paths(tmp_path, f'g{i}'), _props()
+        (paths.out_el / f'g{i}_sim.obj').write_text('v' * 1000)
+        keys.append(f'key{i}')
+        cache.store(keys[-1], paths, props, f'g{i}')
+        # Earlier entries are less recently used
+        os.utime(cache.root / keys[-1], (1000 + i, 1000 + i))
+
+    assert len(evictions) == 3   # 1st, 4th and 7th store
+    assert sorted(e.name for e in cache.root.iterdir()) == ['key5', 'key6']
@@ -0,0 +1,47 @@
+"""Per-frame simulation telemetry (pygarment.meshgen.sim_telemetry)"""
+import numpy as np
+import pytest
+
+from pygarment.meshgen import sim_telemetry
+
+
+def _record(telemetry, frames, phase=0, frame_time=0.1):
+    for frame in frames:
+        telemetry.record(
+            frame=frame, phase=phase, frame_time=frame_time,
+            collide_time=np.nan, integrate_time=np.nan,
+            non_static=5, max_velocity=1., recapture=False)
+
+
+def test_restore_continues_recording():
+    telemetry = sim_telemetry.SimTelemetry(10)
+    _record(telemetry, range(3))
+
+    # E.g. stored in the simulation checkpoint
+    data = telemetry.arrays(prefix='telemetry_')
+
+    resumed = sim_telemetry.SimTelemetry(10)
+    assert resumed.restore(data, prefix='telemetry_')
+    _record(resumed, range(3, 5), phase=3)
+    assert len(resumed) == 5
+    assert list(resumed.arrays()['frame']) == list(range(5))
+    assert not sim_telemetry.SimTelemetry(10).restore({}, prefix='telemetry_')
+
+
+def test_summarize_reads_dataset_telemetry_folder(tmp_path):
+    telemetry = sim_telemetry.SimTelemetry(10)
+    _record(telemetry, range(4), phase=0)
+    _record(telemetry, range(4, 6), phase=3, frame_time=0.3)
+    telemetry.save(tmp_path / 'sim_telemetry' / 'a_sim_telemetry.npz')
+
+    # Garment folders are not traversed
+    stray = tmp_path / 'b' / 'b_sim_telemetry.npz'
+    stray.parent.mkdir()
+    telemetry.save(stray)
+
+    summary = sim_telemetry.summarize(tmp_path)
+    assert summary['garments'] == 1
+    assert summary['total_time'] == pytest.approx(1.)
+    assert summary['phases']['zero_gravity']['frames_avg'] == 4
+    assert summary['phases']['free']['time_share'] == pytest.approx(0.6)
+    assert 'collide_time_avg' not in summary
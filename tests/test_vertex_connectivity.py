@@ -0,0 +1,57 @@
+"""Vertex adjacency of the cloth mesh (pygarment.meshgen.garment.VertexConnectivity)"""
+import numpy as np
+import pytest
+
+pytest.importorskip('igl')
+pytest.importorskip('warp.sim')
+from pygarment.meshgen.garment import VertexConnectivity
+
+
+def _neighbour_lists(num_vertices, indices):
+    """Reference: per-face appends to the neighbour lists"""
+    vert_connectivity = [[] for _ in range(num_vertices)]
+    for face_id in range(len(indices) // 3):
+        v1, v2, v3 = indices[face_id*3:face_id*3 + 3]
+        vert_connectivity[v1] += [v2, v3]
+        vert_connectivity[v2] += [v1, v3]
+        vert_connectivity[v3] += [v1, v2]
+    return vert_connectivity
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_matches_neighbour_lists(seed):
+    rng = np.random.default_rng(seed)
+    num_vertices = 50
+    # Includes unused vertices and edges shared by several faces
+    indices = rng.integers(0, num_vertices - 5, size=3 * 120).tolist()
+
+    expected = _neighbour_lists(num_vertices, indices)
+    connectivity = VertexConnectivity.from_faces(num_vertices, np.reshape(indices, (-1, 3)))
+
+    assert len(connectivity) == num_vertices
+    assert list(connectivity) == expected
+    assert [connectivity[v] for v in range(num_vertices)] == expected
+    assert all(type(n) is int for n in connectivity[0])
+    assert list(connectivity.degrees()) == [len(n) for n in expected]
+
+
+@pytest.mark.parametrize('seed', range(3))
+def test_face_average(seed):
+    rng = np.random.default_rng(seed)
+    num_vertices = 50
+    faces = rng.integers(0, num_vertices - 5, size=(120, 3))
+    face_values = rng.normal(size=(len(faces), 3))
+
+    connectivity = VertexConnectivity.from_faces(num_vertices, faces)
+    for v in range(num_vertices):
+        assert connectivity.face_ids[connectivity.indptr[v] // 2:connectivity.indptr[v + 1] // 2].tolist() == [
+            f for f, face in enumerate(faces) for corner in face if corner == v]
+
+    # Reference: scatter over face corners
+    expected = np.zeros((num_vertices, 3))
+    for i in range(3):
+        np.add.at(expected, faces[:, i], face_values)
+    with np.errstate(invalid='ignore'):
+        expected /= np.bincount(faces.ravel(), minlength=num_vertices)[:, np.newaxis]
+
+    np.testing.assert_allclose(connectivity.face_average(face_values), expected)
@@ -0,0 +1,70 @@
+"""Pool of isolated worker processes (pygarment.meshgen.worker_pool)"""
+import multiprocessing
+import os
+import time
+
+from pygarment.meshgen.worker_pool import WorkerPool
+
+
+def _child(value):
+    return value
+
+
+def _task(payload):
+    kind, value = payload
+    if kind == 'error':
+        raise ValueError(value)
+    if kind == 'crash':
+        os._exit(1)
+    if kind == 'sleep':
+        time.sleep(value)
+    if kind == 'spawn':
+        # Tasks can start their own processes (e.g. timeouts of box mesh generation on Windows)
+        process = multiprocessing.get_context('spawn').Process(target=_child, args=(value,))
+        process.start()
+        process.join()
+        return process.exitcode
+    return value * 2
+
+
+def test_results_and_failures():
+    pool = WorkerPool(_task, 2, time_budget=3, poll_interval=0.05)
+    tasks = [
+        ('a', ('ok', 1)), ('b', ('error', 'boom')), ('c', ('crash', None)),
+        ('d', ('sleep', 60)), ('e', ('ok', 5)), ('f', ('spawn', 1)),
+    ]
+    results = {task_id: (status, result) for task_id, status, result in pool.run(tasks)}
+
+    assert results['a'] == ('done', 2)
+    assert results['e'] == ('done', 10)
+    assert results['f'] == ('done', 0)
+    assert results['b'][0] == 'error' and 'boom' in results['b'][1]
+    assert results['c'] == ('crash', None)
+    assert results['d'] == ('timeout', None)
+
+    # Only successful tasks are counted as completed
+    assert pool.completed == 3
+    assert pool.failed == 3
+    assert pool.replaced_workers == 2
+
+
+def test_close_joins_workers():
+    pool = WorkerPool(_task, 2)
+    pool.start()
+    processes = [w.process for w in pool._workers]
+    assert not any(p.daemon for p in processes)
+    pool.submit('a', ('ok', 1))
+    while not pool.poll(timeout=0.1):
+        pass
+    pool.close()
+    assert not any(p.is_alive() for p in processes)
+
+
+def test_submit_callback():
+    pool = WorkerPool(_task, 1, poll_interval=0.05)
+    submitted = []
+    for task_id, status, _ in pool.run([('a', ('ok', 1)), ('b', ('ok', 2)), ('c', ('ok', 3))],
+                                       on_submit=submitted.append):
+        # Tasks are reported when sent to the (only) worker, not when queued
+        assert submitted[-1] == task_id
+    assert submitted == ['a', 'b', 'c']